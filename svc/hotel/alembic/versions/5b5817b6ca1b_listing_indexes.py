@@ -0,0 +1,37 @@
+"""listing indexes
+
+Revision ID: 5b5817b6ca1b
+Revises: a2d7cf75665b
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b5817b6ca1b'
+down_revision: Union[str, None] = 'a2d7cf75665b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # built concurrently so existing tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_hotel_owner_id_id'), 'hotel', ['owner_id', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_hotel_room_hotel_id_id'), 'hotel_room', ['hotel_id', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_hotel_review_hotel_id_date_created_id'), 'hotel_review', ['hotel_id', 'date_created', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_hotel_review_author_id_date_created_id'), 'hotel_review', ['author_id', 'date_created', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_hotel_review_author_id_date_created_id'), table_name='hotel_review', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_hotel_review_hotel_id_date_created_id'), table_name='hotel_review', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_hotel_room_hotel_id_id'), table_name='hotel_room', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_hotel_owner_id_id'), table_name='hotel', postgresql_concurrently=True)
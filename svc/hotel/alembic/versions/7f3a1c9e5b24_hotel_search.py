@@ -0,0 +1,39 @@
+"""hotel search
+
+Revision ID: 7f3a1c9e5b24
+Revises: c41e9a7d2f03
+Create Date: 2026-10-18 12:26:09.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3a1c9e5b24'
+down_revision: Union[str, None] = 'c41e9a7d2f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # a stored generated column rewrites the table once, under an exclusive lock
+    op.add_column('hotel', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('simple'::regconfig, name), 'A') || setweight(to_tsvector('simple'::regconfig, description), 'B')", persisted=True), nullable=False))
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_hotel_search_vector'), 'hotel', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index(op.f('ix_hotel_location_country_code_rating_average_id'), 'hotel', ['location_country_code', 'rating_average', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_hotel_rating_average_id'), 'hotel', ['rating_average', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_hotel_room_hotel_id_price_per_night'), 'hotel_room', ['hotel_id', 'price_per_night_currency_code', 'price_per_night'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_hotel_room_hotel_id_price_per_night'), table_name='hotel_room', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_hotel_rating_average_id'), table_name='hotel', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_hotel_location_country_code_rating_average_id'), table_name='hotel', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_hotel_search_vector'), table_name='hotel', postgresql_concurrently=True)
+    op.drop_column('hotel', 'search_vector')
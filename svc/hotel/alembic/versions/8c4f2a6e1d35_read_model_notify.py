@@ -0,0 +1,57 @@
+"""read model notify
+
+Revision ID: 8c4f2a6e1d35
+Revises: 5a1e7c3d9b62
+Create Date: 2026-10-18 20:41:07.553219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f2a6e1d35'
+down_revision: Union[str, None] = '5a1e7c3d9b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # one notification per changed row, "<table>:<id>", delivered on commit and
+    # deduplicated within a transaction; see src/inf/db/read_model.py
+    op.execute("""
+        CREATE FUNCTION read_model_notify() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                PERFORM pg_notify('read_model', TG_TABLE_NAME || ':*');
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM pg_notify('read_model', TG_TABLE_NAME || ':' || OLD.id);
+            ELSE
+                PERFORM pg_notify('read_model', TG_TABLE_NAME || ':' || NEW.id);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table in ('hotel', 'hotel_room'):
+        op.execute(f"""
+            CREATE TRIGGER {table}_read_model_notify
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION read_model_notify()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_read_model_truncate
+            AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION read_model_notify()
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('hotel', 'hotel_room'):
+        op.execute(f'DROP TRIGGER {table}_read_model_truncate ON {table}')
+        op.execute(f'DROP TRIGGER {table}_read_model_notify ON {table}')
+    op.execute('DROP FUNCTION read_model_notify()')
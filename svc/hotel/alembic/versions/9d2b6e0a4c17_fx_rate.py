@@ -0,0 +1,66 @@
+"""fx rate
+
+Revision ID: 9d2b6e0a4c17
+Revises: 7f3a1c9e5b24
+Create Date: 2026-10-18 13:48:52.671405
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2b6e0a4c17'
+down_revision: Union[str, None] = '7f3a1c9e5b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fx_rate',
+    sa.Column('currency_code', sa.String(), nullable=False),
+    sa.Column('rate', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('currency_code')
+    )
+    op.add_column('hotel_room', sa.Column('price_per_night_base', sa.Float(), nullable=True))
+
+    # every write path (ORM, COPY, upserts) gets its normalized price here;
+    # rate changes re-normalize through FxRateDao.set_rates
+    op.execute("""
+        CREATE FUNCTION hotel_room_normalize_price() RETURNS trigger AS $$
+        BEGIN
+            NEW.price_per_night_base := NEW.price_per_night * (
+                SELECT rate FROM fx_rate
+                WHERE currency_code = NEW.price_per_night_currency_code
+            );
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER hotel_room_normalize_price
+        BEFORE INSERT OR UPDATE OF price_per_night, price_per_night_currency_code
+        ON hotel_room
+        FOR EACH ROW EXECUTE FUNCTION hotel_room_normalize_price()
+    """)
+
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_hotel_room_hotel_id_price_per_night'), table_name='hotel_room', postgresql_concurrently=True)
+        op.create_index(op.f('ix_hotel_room_hotel_id_price_per_night_base'), 'hotel_room', ['hotel_id', 'price_per_night_base'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_hotel_room_price_per_night_base_id'), 'hotel_room', ['price_per_night_base', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_hotel_room_price_per_night_base_id'), table_name='hotel_room', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_hotel_room_hotel_id_price_per_night_base'), table_name='hotel_room', postgresql_concurrently=True)
+        op.create_index(op.f('ix_hotel_room_hotel_id_price_per_night'), 'hotel_room', ['hotel_id', 'price_per_night_currency_code', 'price_per_night'], unique=False, postgresql_concurrently=True)
+    op.execute('DROP TRIGGER hotel_room_normalize_price ON hotel_room')
+    op.execute('DROP FUNCTION hotel_room_normalize_price()')
+    op.drop_column('hotel_room', 'price_per_night_base')
+    op.drop_table('fx_rate')
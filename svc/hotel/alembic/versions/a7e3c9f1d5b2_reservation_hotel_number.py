@@ -0,0 +1,46 @@
+"""reservation hotel number
+
+Revision ID: a7e3c9f1d5b2
+Revises: f2c7a9d4b8e1
+Create Date: 2026-10-19 14:26:51.230417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3c9f1d5b2'
+down_revision: Union[str, None] = 'f2c7a9d4b8e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # a room number belongs to the hotel, two room types may list the same one;
+    # fails while such a number is already booked twice for a night
+    op.drop_constraint('ex_hotel_reservation_room_id_number_stay', 'hotel_reservation')
+    op.create_exclude_constraint(
+        'ex_hotel_reservation_hotel_id_number_stay',
+        'hotel_reservation',
+        (sa.column('hotel_id'), '='),
+        (sa.column('number'), '='),
+        (sa.column('stay'), '&&'),
+        using='gist',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ex_hotel_reservation_hotel_id_number_stay', 'hotel_reservation')
+    op.create_exclude_constraint(
+        'ex_hotel_reservation_room_id_number_stay',
+        'hotel_reservation',
+        (sa.column('room_id'), '='),
+        (sa.column('number'), '='),
+        (sa.column('stay'), '&&'),
+        using='gist',
+    )
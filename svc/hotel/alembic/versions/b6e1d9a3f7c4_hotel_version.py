@@ -0,0 +1,109 @@
+"""hotel version
+
+Revision ID: b6e1d9a3f7c4
+Revises: 8c4f2a6e1d35
+Create Date: 2026-10-18 22:14:52.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1d9a3f7c4'
+down_revision: Union[str, None] = '8c4f2a6e1d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'hotel',
+        sa.Column('version', sa.BigInteger(), server_default='1', nullable=False),
+    )
+
+    # every update of a hotel row bumps it, unless the update sets it itself
+    op.execute("""
+        CREATE FUNCTION hotel_version_bump() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.version = OLD.version THEN
+                NEW.version := OLD.version + 1;
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER hotel_version_bump
+        BEFORE UPDATE ON hotel
+        FOR EACH ROW EXECUTE FUNCTION hotel_version_bump()
+    """)
+
+    # room and review writes bump their hotels once per statement
+    op.execute("""
+        CREATE FUNCTION hotel_version_touch() RETURNS trigger AS $$
+        BEGIN
+            UPDATE hotel SET version = version + 1
+            WHERE id IN (SELECT hotel_id FROM changed);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    # fx rate loads rewrite price_per_night_base of every room, which no
+    # response shows, so room updates only count when a shown column changed
+    op.execute("""
+        CREATE FUNCTION hotel_room_version_touch() RETURNS trigger AS $$
+        BEGIN
+            UPDATE hotel SET version = version + 1
+            WHERE id IN (
+                SELECT unnest(ARRAY[n.hotel_id, o.hotel_id])
+                FROM changed n JOIN previous o USING (id)
+                WHERE (
+                    n.hotel_id, n.name, n.description,
+                    n.price_per_night_currency_code, n.price_per_night, n.numbers
+                ) IS DISTINCT FROM (
+                    o.hotel_id, o.name, o.description,
+                    o.price_per_night_currency_code, o.price_per_night, o.numbers
+                )
+            );
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table in ('hotel_room', 'hotel_review'):
+        op.execute(f"""
+            CREATE TRIGGER {table}_version_insert
+            AFTER INSERT ON {table} REFERENCING NEW TABLE AS changed
+            FOR EACH STATEMENT EXECUTE FUNCTION hotel_version_touch()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_version_delete
+            AFTER DELETE ON {table} REFERENCING OLD TABLE AS changed
+            FOR EACH STATEMENT EXECUTE FUNCTION hotel_version_touch()
+        """)
+    op.execute("""
+        CREATE TRIGGER hotel_room_version_update
+        AFTER UPDATE ON hotel_room
+        REFERENCING NEW TABLE AS changed OLD TABLE AS previous
+        FOR EACH STATEMENT EXECUTE FUNCTION hotel_room_version_touch()
+    """)
+    op.execute("""
+        CREATE TRIGGER hotel_review_version_update
+        AFTER UPDATE ON hotel_review REFERENCING NEW TABLE AS changed
+        FOR EACH STATEMENT EXECUTE FUNCTION hotel_version_touch()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('hotel_room', 'hotel_review'):
+        for event in ('insert', 'update', 'delete'):
+            op.execute(f'DROP TRIGGER {table}_version_{event} ON {table}')
+    op.execute('DROP FUNCTION hotel_room_version_touch()')
+    op.execute('DROP FUNCTION hotel_version_touch()')
+    op.execute('DROP TRIGGER hotel_version_bump ON hotel')
+    op.execute('DROP FUNCTION hotel_version_bump()')
+    op.drop_column('hotel', 'version')
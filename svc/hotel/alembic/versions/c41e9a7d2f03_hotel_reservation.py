@@ -0,0 +1,43 @@
+"""hotel reservation
+
+Revision ID: c41e9a7d2f03
+Revises: 5b5817b6ca1b
+Create Date: 2026-10-18 11:02:17.504923
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e9a7d2f03'
+down_revision: Union[str, None] = '5b5817b6ca1b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # gist indexes over plain uuid/int columns need btree_gist
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.create_table('hotel_reservation',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('guest_id', sa.Uuid(), nullable=False),
+    sa.Column('hotel_id', sa.Uuid(), nullable=False),
+    sa.Column('room_id', sa.Uuid(), nullable=False),
+    sa.Column('number', sa.Integer(), nullable=False),
+    sa.Column('stay', postgresql.DATERANGE(), nullable=False),
+    sa.ForeignKeyConstraint(['hotel_id'], ['hotel.id'], ),
+    sa.ForeignKeyConstraint(['room_id'], ['hotel_room.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    postgresql.ExcludeConstraint((sa.column('room_id'), '='), (sa.column('number'), '='), (sa.column('stay'), '&&'), using='gist', name='ex_hotel_reservation_room_id_number_stay')
+    )
+    op.create_index('ix_hotel_reservation_hotel_id_stay', 'hotel_reservation', ['hotel_id', 'stay'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_hotel_reservation_hotel_id_stay', table_name='hotel_reservation', postgresql_using='gist')
+    op.drop_table('hotel_reservation')
@@ -0,0 +1,137 @@
+"""hotel rating stats
+
+Revision ID: d4a8c2e6f1b9
+Revises: b6e1d9a3f7c4
+Create Date: 2026-10-18 23:41:07.519832
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8c2e6f1b9'
+down_revision: Union[str, None] = 'b6e1d9a3f7c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STARS = range(1, 6)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'hotel_rating_stats',
+        sa.Column('hotel_id', sa.Uuid(), nullable=False),
+        *(
+            sa.Column(f'stars_{n}', sa.Integer(), server_default='0', nullable=False)
+            for n in STARS
+        ),
+        sa.ForeignKeyConstraint(['hotel_id'], ['hotel.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('hotel_id'),
+    )
+    op.create_table(
+        'hotel_review_daily',
+        sa.Column('hotel_id', sa.Uuid(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('reviews', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('rating_total', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['hotel_id'], ['hotel.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('hotel_id', 'day'),
+    )
+
+    # NOT VALID keeps the migration from scanning the reviews, the stats below
+    # skip any older rating out of range
+    op.execute("""
+        ALTER TABLE hotel_review ADD CONSTRAINT ck_hotel_review_rating
+        CHECK (rating BETWEEN 1 AND 5) NOT VALID
+    """)
+
+    # every write to hotel_review adds its rows with sign 1 or takes them off
+    # with sign -1, aggregated once per statement and in its transaction; an
+    # update takes off the old rows and adds the new ones
+    op.execute("""
+        CREATE FUNCTION hotel_review_stats() RETURNS trigger AS $$
+        DECLARE
+            sign int := TG_ARGV[0]::int;
+        BEGIN
+            INSERT INTO hotel_rating_stats AS s
+                (hotel_id, stars_1, stars_2, stars_3, stars_4, stars_5)
+            SELECT
+                hotel_id,
+                sign * count(*) FILTER (WHERE rating = 1),
+                sign * count(*) FILTER (WHERE rating = 2),
+                sign * count(*) FILTER (WHERE rating = 3),
+                sign * count(*) FILTER (WHERE rating = 4),
+                sign * count(*) FILTER (WHERE rating = 5)
+            FROM changed
+            WHERE rating BETWEEN 1 AND 5
+            GROUP BY hotel_id
+            ORDER BY hotel_id
+            ON CONFLICT (hotel_id) DO UPDATE SET
+                stars_1 = s.stars_1 + excluded.stars_1,
+                stars_2 = s.stars_2 + excluded.stars_2,
+                stars_3 = s.stars_3 + excluded.stars_3,
+                stars_4 = s.stars_4 + excluded.stars_4,
+                stars_5 = s.stars_5 + excluded.stars_5;
+
+            INSERT INTO hotel_review_daily AS d
+                (hotel_id, day, reviews, rating_total)
+            SELECT hotel_id, date_created, sign * count(*), sign * sum(rating)
+            FROM changed
+            WHERE rating BETWEEN 1 AND 5
+            GROUP BY hotel_id, date_created
+            ORDER BY hotel_id, date_created
+            ON CONFLICT (hotel_id, day) DO UPDATE SET
+                reviews = d.reviews + excluded.reviews,
+                rating_total = d.rating_total + excluded.rating_total;
+
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for name, event, table, sign in (
+        ('insert', 'INSERT', 'NEW', 1),
+        ('delete', 'DELETE', 'OLD', -1),
+        ('update_new', 'UPDATE', 'NEW', 1),
+        ('update_old', 'UPDATE', 'OLD', -1),
+    ):
+        op.execute(f"""
+            CREATE TRIGGER hotel_review_stats_{name}
+            AFTER {event} ON hotel_review REFERENCING {table} TABLE AS changed
+            FOR EACH STATEMENT EXECUTE FUNCTION hotel_review_stats('{sign}')
+        """)
+
+    op.execute("""
+        INSERT INTO hotel_rating_stats
+            (hotel_id, stars_1, stars_2, stars_3, stars_4, stars_5)
+        SELECT
+            hotel_id,
+            count(*) FILTER (WHERE rating = 1),
+            count(*) FILTER (WHERE rating = 2),
+            count(*) FILTER (WHERE rating = 3),
+            count(*) FILTER (WHERE rating = 4),
+            count(*) FILTER (WHERE rating = 5)
+        FROM hotel_review
+        WHERE rating BETWEEN 1 AND 5
+        GROUP BY hotel_id
+    """)
+    op.execute("""
+        INSERT INTO hotel_review_daily (hotel_id, day, reviews, rating_total)
+        SELECT hotel_id, date_created, count(*), sum(rating)
+        FROM hotel_review
+        WHERE rating BETWEEN 1 AND 5
+        GROUP BY hotel_id, date_created
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in ('insert', 'delete', 'update_new', 'update_old'):
+        op.execute(f'DROP TRIGGER hotel_review_stats_{name} ON hotel_review')
+    op.execute('DROP FUNCTION hotel_review_stats()')
+    op.drop_constraint('ck_hotel_review_rating', 'hotel_review', type_='check')
+    op.drop_table('hotel_review_daily')
+    op.drop_table('hotel_rating_stats')
@@ -0,0 +1,119 @@
+"""review version
+
+Revision ID: f2c7a9d4b8e1
+Revises: d4a8c2e6f1b9
+Create Date: 2026-10-19 10:12:43.871205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c7a9d4b8e1'
+down_revision: Union[str, None] = 'd4a8c2e6f1b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATS_FUNCTION = """
+    CREATE OR REPLACE FUNCTION hotel_review_stats() RETURNS trigger AS $$
+    DECLARE
+        sign int := TG_ARGV[0]::int;
+    BEGIN
+        INSERT INTO hotel_rating_stats AS s
+            (hotel_id, stars_1, stars_2, stars_3, stars_4, stars_5{version_column})
+        SELECT
+            hotel_id,
+            sign * count(*) FILTER (WHERE rating = 1),
+            sign * count(*) FILTER (WHERE rating = 2),
+            sign * count(*) FILTER (WHERE rating = 3),
+            sign * count(*) FILTER (WHERE rating = 4),
+            sign * count(*) FILTER (WHERE rating = 5){version_value}
+        FROM changed
+        {stats_where}
+        GROUP BY hotel_id
+        ORDER BY hotel_id
+        ON CONFLICT (hotel_id) DO UPDATE SET
+            stars_1 = s.stars_1 + excluded.stars_1,
+            stars_2 = s.stars_2 + excluded.stars_2,
+            stars_3 = s.stars_3 + excluded.stars_3,
+            stars_4 = s.stars_4 + excluded.stars_4,
+            stars_5 = s.stars_5 + excluded.stars_5{version_update};
+
+        INSERT INTO hotel_review_daily AS d
+            (hotel_id, day, reviews, rating_total)
+        SELECT hotel_id, date_created, sign * count(*), sign * sum(rating)
+        FROM changed
+        WHERE rating BETWEEN 1 AND 5
+        GROUP BY hotel_id, date_created
+        ORDER BY hotel_id, date_created
+        ON CONFLICT (hotel_id, day) DO UPDATE SET
+            reviews = d.reviews + excluded.reviews,
+            rating_total = d.rating_total + excluded.rating_total;
+
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'hotel_rating_stats',
+        sa.Column('review_version', sa.BigInteger(), server_default='0', nullable=False),
+    )
+
+    # review writes bump the stats row they already update instead of the hotel
+    # row, which RATING_MODE=async keeps them off; a hotel's version is
+    # hotel.version + hotel_rating_stats.review_version
+    op.execute(
+        STATS_FUNCTION.format(
+            version_column=', review_version',
+            version_value=', 1',
+            stats_where='',
+            version_update=',\n            review_version = s.review_version + 1',
+        )
+    )
+    for event in ('insert', 'update', 'delete'):
+        op.execute(f'DROP TRIGGER hotel_review_version_{event} ON hotel_review')
+
+    # the read model holds hotel versions, so it hears of review versions too
+    op.execute("""
+        CREATE FUNCTION hotel_rating_stats_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('read_model', 'hotel:' || NEW.hotel_id);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER hotel_rating_stats_read_model_notify
+        AFTER INSERT OR UPDATE ON hotel_rating_stats
+        FOR EACH ROW EXECUTE FUNCTION hotel_rating_stats_notify()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        'DROP TRIGGER hotel_rating_stats_read_model_notify ON hotel_rating_stats'
+    )
+    op.execute('DROP FUNCTION hotel_rating_stats_notify()')
+    for event, table in (('insert', 'NEW'), ('delete', 'OLD'), ('update', 'NEW')):
+        op.execute(f"""
+            CREATE TRIGGER hotel_review_version_{event}
+            AFTER {event.upper()} ON hotel_review REFERENCING {table} TABLE AS changed
+            FOR EACH STATEMENT EXECUTE FUNCTION hotel_version_touch()
+        """)
+    op.execute(
+        STATS_FUNCTION.format(
+            version_column='',
+            version_value='',
+            stats_where='WHERE rating BETWEEN 1 AND 5',
+            version_update='',
+        )
+    )
+    op.drop_column('hotel_rating_stats', 'review_version')
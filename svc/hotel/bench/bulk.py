@@ -0,0 +1,91 @@
+"""Throughput of the bulk DAO paths: COPY inserts and multi-row upserts.
+
+    alembic upgrade head
+    python -m bench.bulk --hotels 50000 --rooms-per-hotel 4
+
+Everything runs in one transaction that is rolled back at the end.
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import src.app.dto as dto
+import src.inf.db.postgres.config as db_config
+from src.app.enum import CountryCode, CurrencyCode
+from src.inf.db.postgres.dao import HotelDao, HotelRoomDao
+
+
+def report(name: str, rows: int, elapsed: float) -> None:
+    print(f"{name:24} {rows:>9,} rows {rows / elapsed:>12,.0f} rows/sec")
+
+
+async def run(dsn: str, hotels: int, rooms_per_hotel: int) -> None:
+    engine = create_async_engine(dsn)
+    owner_id = uuid4()
+
+    new_hotels = [
+        dto.Hotel(
+            owner_id=owner_id,
+            name=f"Hotel {n}",
+            description="A comfortable place to stay.",
+            location=dto.Location(country_code=CountryCode.PL, address=f"{n} Main St"),
+            rating=dto.Rating(average=0, num_votes=0),
+        )
+        for n in range(hotels)
+    ]
+
+    async with AsyncSession(engine) as db:
+        start = time.perf_counter()
+        created = await HotelDao(db).add_many(new_hotels)
+        report("hotels   add_many", len(created), time.perf_counter() - start)
+
+        new_rooms = [
+            dto.HotelRoom(
+                hotel_id=h.id,
+                name=f"Room type {n}",
+                description="Double bed",
+                price_per_night=dto.Price(currency_code=CurrencyCode.EUR, amount=90),
+                numbers=[100 + n, 200 + n],
+            )
+            for h in created
+            for n in range(rooms_per_hotel)
+        ]
+
+        start = time.perf_counter()
+        rooms = await HotelRoomDao(db).add_many(new_rooms)
+        report("rooms    add_many", len(rooms), time.perf_counter() - start)
+
+        upserts = [
+            dto.HotelUpsert(id=h.id, **h.model_dump(exclude={"id", "rating"}))
+            for h in created
+        ]
+
+        start = time.perf_counter()
+        saved = await HotelDao(db).upsert_many(upserts)
+        report("hotels   upsert_many", len(saved), time.perf_counter() - start)
+
+        start = time.perf_counter()
+        saved = await HotelRoomDao(db).upsert_many(rooms)
+        report("rooms    upsert_many", len(saved), time.perf_counter() - start)
+
+        await db.rollback()
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=db_config.ALCHEMY_DB_URI)
+    parser.add_argument("--hotels", type=int, default=50_000)
+    parser.add_argument("--rooms-per-hotel", type=int, default=4)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.dsn, args.hotels, args.rooms_per_hotel))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Before/after benchmark of country and currency codes as native enums.
+
+    alembic upgrade head
+    python -m bench.codes --seed
+    python -m bench.codes --no-db
+
+Sizes: copies the seeded hotel and hotel_room tables twice inside a rolled
+back transaction, once with the code columns as varchar and once as enums,
+indexes the code column of each and compares table and index sizes.
+
+Mapping: times turning code strings into enum members the way the DAOs used
+to (calling the Enum class per row) against the SQLAlchemy enum type's lookup
+table, and validating hotel DTOs from strings against from members.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import src.inf.db.postgres.config as db_config
+from src.app.enum import CountryCode
+from src.inf.db.postgres.dao import HOTELS, hotel_values
+from src.inf.db.postgres.model import COUNTRY_CODE
+
+from .seed import Volumes, seed
+
+COPIES = {
+    "hotel": (
+        "id, owner_id, name, description, location_country_code{cast},"
+        " location_address, rating_average, rating_num_votes",
+        "location_country_code, rating_average, id",
+    ),
+    "hotel_room": (
+        "id, hotel_id, name, description, price_per_night_currency_code{cast},"
+        " price_per_night, numbers",
+        "price_per_night_currency_code, id",
+    ),
+}
+
+
+async def sizes(dsn: str, volumes: Volumes | None) -> None:
+    engine = create_async_engine(dsn)
+
+    if volumes is not None:
+        async with engine.begin() as conn:
+            await seed(conn, volumes)
+
+    async with engine.connect() as conn:
+        for table, (columns, index) in COPIES.items():
+            for kind, cast in (("varchar", "::varchar"), ("enum", "")):
+                copy = f"{table}_{kind}"
+                await conn.execute(text(f"""
+                        CREATE TEMP TABLE {copy} AS
+                        SELECT {columns.format(cast=cast)} FROM {table}
+                        """))
+                await conn.execute(text(f"CREATE INDEX ON {copy} ({index})"))
+                await conn.execute(text(f"VACUUM ANALYZE {copy}"))
+
+                row = (
+                    await conn.execute(
+                        text("""
+                            SELECT pg_table_size(:t), pg_indexes_size(:t)
+                            """),
+                        {"t": copy},
+                    )
+                ).one()
+                print(
+                    f"{copy:20} table {row[0] / 2**20:8.1f} MiB"
+                    f"  index {row[1] / 2**20:8.1f} MiB"
+                )
+
+        await conn.rollback()
+
+    await engine.dispose()
+
+
+def timed(label: str, rows: int, fn: Callable[[], object], repeat: int = 5) -> None:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+
+    print(f"{label:36} {rows / elapsed:12,.0f} rows/s")
+
+
+def mapping(rows: int) -> None:
+    values = [random.choice(list(CountryCode)).value for _ in range(rows)]
+    lookup = COUNTRY_CODE.result_processor(postgresql.asyncpg.dialect(), None)
+
+    timed("CountryCode(value) per row", rows, lambda: [CountryCode(v) for v in values])
+    timed("enum type lookup table", rows, lambda: [lookup(v) for v in values])
+
+    hotel_id = uuid.uuid4()
+    as_strings = [
+        hotel_values((hotel_id, hotel_id, "n", "d", v, "a", 4.0, 3)) for v in values
+    ]
+    as_members = [
+        hotel_values((hotel_id, hotel_id, "n", "d", lookup(v), "a", 4.0, 3))
+        for v in values
+    ]
+
+    timed(
+        "validate HotelWithID from strings",
+        rows,
+        lambda: HOTELS.validate_python(as_strings),
+    )
+    timed(
+        "validate HotelWithID from members",
+        rows,
+        lambda: HOTELS.validate_python(as_members),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=db_config.ALCHEMY_DB_URI)
+    parser.add_argument(
+        "--seed",
+        action="store_true",
+        help="truncate and reseed the database first (use a dedicated database)",
+    )
+    parser.add_argument("--no-db", action="store_true", help="only time the mapping")
+    parser.add_argument("--hotels", type=int, default=Volumes.hotels)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    mapping(args.rows)
+
+    if not args.no_db:
+        volumes = Volumes(hotels=args.hotels) if args.seed else None
+        asyncio.run(sizes(args.dsn, volumes))
+
+
+if __name__ == "__main__":
+    main()
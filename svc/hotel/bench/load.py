@@ -0,0 +1,560 @@
+"""End-to-end load benchmark of every route of the web app.
+
+    alembic upgrade head
+    python -m bench.load --seed --concurrency 1,16,64 --out load.json
+    python -m bench.load --concurrency 1,16,64 --baseline load.json
+
+Requests go through the ASGI app in process (httpx's ASGITransport), so the
+numbers cover routing, validation, serialization and the database but no
+network or server workers. Every route is driven at each concurrency level for
+a fixed number of requests, and the statements the app's engines execute are
+counted per route. Results are written as JSON; with --baseline, a route whose
+p99 grew or whose RPS dropped by more than --threshold fails the run.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from uuid import UUID, uuid4
+
+import httpx
+from fastapi.routing import APIRoute
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+import src.inf.db.postgres.config as db_config
+from src.inf.db.postgres.engine import database as app_db
+from src.inf.web.app import app
+
+from .seed import Volumes, seed
+
+USER = "x-auth-request-user"
+
+Request = tuple[str, str, dict[str, Any]]
+
+
+@dataclass
+class Fixtures:
+    hotels: list[tuple[UUID, UUID]]
+    rooms: list[tuple[UUID, UUID, UUID]]
+    # reviews and reservations created by the run, deleted by the next routes
+    reviews: list[tuple[UUID, UUID]] = field(default_factory=list)
+    reservations: list[tuple[UUID, UUID]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.by_owner: dict[UUID, list[UUID]] = defaultdict(list)
+        for hotel_id, owner_id in self.hotels:
+            self.by_owner[owner_id].append(hotel_id)
+
+        self.rooms_by_owner: dict[UUID, list[tuple[UUID, UUID, UUID]]] = defaultdict(
+            list
+        )
+        for room in self.rooms:
+            self.rooms_by_owner[room[2]].append(room)
+
+
+@dataclass
+class Scenario:
+    make: Callable[[Fixtures, random.Random], Request]
+    record: Callable[[Fixtures, dict[str, Any], Any], None] | None = None
+
+
+def _days(n: int) -> str:
+    return (datetime.date.today() + datetime.timedelta(days=n)).isoformat()
+
+
+def _location(rng: random.Random) -> dict[str, str]:
+    return {"country_code": rng.choice(["US", "DE", "PL"]), "address": "1 Bench St"}
+
+
+def _hotel(owner_id: UUID, rng: random.Random) -> dict[str, Any]:
+    return {
+        "owner_id": str(owner_id),
+        "name": f"Bench Hotel {rng.randrange(10**6)}",
+        "description": "Created by the load benchmark.",
+        "location": _location(rng),
+    }
+
+
+def _room(hotel_id: UUID, rng: random.Random) -> dict[str, Any]:
+    return {
+        "hotel_id": str(hotel_id),
+        "name": "Bench room",
+        "description": "Created by the load benchmark.",
+        "price_per_night": {"currency_code": "EUR", "amount": rng.randrange(50, 500)},
+        "numbers": [rng.randrange(1000, 2000) for _ in range(3)],
+    }
+
+
+def _hotel_id(f: Fixtures, rng: random.Random) -> UUID:
+    return rng.choice(f.hotels)[0]
+
+
+def _owned(f: Fixtures, rng: random.Random) -> tuple[UUID, list[UUID]]:
+    _, owner_id = rng.choice(f.hotels)
+    return owner_id, f.by_owner[owner_id][:10]
+
+
+def _stay(rng: random.Random) -> tuple[str, str]:
+    check_in = rng.randrange(30, 300)
+    return _days(check_in), _days(check_in + rng.randrange(1, 4))
+
+
+def _search_hotels(f: Fixtures, rng: random.Random) -> Request:
+    params = rng.choice(
+        [
+            {"q": "seaside"},
+            {"q": "grand plaza", "country_code": "DE"},
+            {"country_code": "US", "min_rating": 3},
+            {
+                "country_code": "PL",
+                "currency_code": "EUR",
+                "min_price": 100,
+                "max_price": 150,
+            },
+        ]
+    )
+    return "GET", "/hotels/search", {"params": params}
+
+
+def _availability(f: Fixtures, rng: random.Random) -> Request:
+    check_in, check_out = _stay(rng)
+    return (
+        "GET",
+        f"/hotels/{_hotel_id(f, rng)}/availability",
+        {"params": {"from": check_in, "to": check_out}},
+    )
+
+
+def _some(ids: list[tuple], rng: random.Random, n: int = 20) -> list[str]:
+    return [str(i[0]) for i in rng.sample(ids, min(n, len(ids)))]
+
+
+def _search_availability(f: Fixtures, rng: random.Random) -> Request:
+    check_in, check_out = _stay(rng)
+    return (
+        "GET",
+        "/availability",
+        {
+            "params": {
+                "hotel_ids": _some(f.hotels, rng),
+                "from": check_in,
+                "to": check_out,
+            }
+        },
+    )
+
+
+def _review_activity(f: Fixtures, rng: random.Random) -> Request:
+    hotel_id, owner_id = rng.choice(f.hotels)
+    return (
+        "GET",
+        f"/my_hotels/{hotel_id}/review-activity",
+        {"headers": {USER: str(owner_id)}, "params": {"days": 90}},
+    )
+
+
+def _create_hotel(f: Fixtures, rng: random.Random) -> Request:
+    _, owner_id = rng.choice(f.hotels)
+    body = _hotel(owner_id, rng)
+    return "POST", "/my_hotels", {"headers": {USER: str(owner_id)}, "json": body}
+
+
+def _patch_hotel(f: Fixtures, rng: random.Random) -> Request:
+    hotel_id, owner_id = rng.choice(f.hotels)
+    body = {
+        "id": str(hotel_id),
+        "name": f"Patched Hotel {rng.randrange(10**6)}",
+        "description": None,
+        "location": None,
+    }
+    return "PATCH", "/my_hotels", {"headers": {USER: str(owner_id)}, "json": body}
+
+
+def _create_hotels(f: Fixtures, rng: random.Random) -> Request:
+    owner_id, _ = _owned(f, rng)
+    body = [_hotel(owner_id, rng) for _ in range(10)]
+    return "POST", "/my_hotels/bulk", {"headers": {USER: str(owner_id)}, "json": body}
+
+
+def _upsert_hotels(f: Fixtures, rng: random.Random) -> Request:
+    owner_id, hotel_ids = _owned(f, rng)
+    body = [{"id": str(h), **_hotel(owner_id, rng)} for h in hotel_ids]
+    return "PUT", "/my_hotels/bulk", {"headers": {USER: str(owner_id)}, "json": body}
+
+
+def _create_rooms(f: Fixtures, rng: random.Random) -> Request:
+    owner_id, hotel_ids = _owned(f, rng)
+    body = [_room(rng.choice(hotel_ids), rng) for _ in range(10)]
+    return (
+        "POST",
+        "/my_hotels/rooms/bulk",
+        {"headers": {USER: str(owner_id)}, "json": body},
+    )
+
+
+def _upsert_rooms(f: Fixtures, rng: random.Random) -> Request:
+    _, _, owner_id = rng.choice(f.rooms)
+    rooms = f.rooms_by_owner[owner_id][:10]
+    body = [{"id": str(r), **_room(h, rng)} for r, h, _ in rooms]
+    return (
+        "PUT",
+        "/my_hotels/rooms/bulk",
+        {"headers": {USER: str(owner_id)}, "json": body},
+    )
+
+
+def _create_review(f: Fixtures, rng: random.Random) -> Request:
+    author_id = uuid4()
+    body = {
+        "author_id": str(author_id),
+        "hotel_id": str(_hotel_id(f, rng)),
+        "rating": rng.randrange(1, 6),
+        "comment": "Written by the load benchmark.",
+    }
+    return "POST", "/reviews", {"headers": {USER: str(author_id)}, "json": body}
+
+
+def _record_review(f: Fixtures, request: dict[str, Any], body: Any) -> None:
+    f.reviews.append((UUID(request["headers"][USER]), UUID(body["id"])))
+
+
+def _delete_review(f: Fixtures, rng: random.Random) -> Request:
+    author_id, review_id = f.reviews.pop() if f.reviews else (uuid4(), uuid4())
+    return (
+        "DELETE",
+        "/reviews",
+        {"headers": {USER: str(author_id)}, "params": {"review_id": str(review_id)}},
+    )
+
+
+def _create_reservation(f: Fixtures, rng: random.Random) -> Request:
+    guest_id = uuid4()
+    check_in, check_out = _stay(rng)
+    body = {
+        "guest_id": str(guest_id),
+        "room_id": str(rng.choice(f.rooms)[0]),
+        "check_in": check_in,
+        "check_out": check_out,
+    }
+    return "POST", "/reservations", {"headers": {USER: str(guest_id)}, "json": body}
+
+
+def _record_reservation(f: Fixtures, request: dict[str, Any], body: Any) -> None:
+    f.reservations.append((UUID(request["headers"][USER]), UUID(body["id"])))
+
+
+def _cancel_reservation(f: Fixtures, rng: random.Random) -> Request:
+    guest_id, reservation_id = (
+        f.reservations.pop() if f.reservations else (uuid4(), uuid4())
+    )
+    return (
+        "DELETE",
+        "/reservations",
+        {
+            "headers": {USER: str(guest_id)},
+            "params": {"reservation_id": str(reservation_id)},
+        },
+    )
+
+
+# creating routes run before the deleting ones, which consume what they made
+SCENARIOS: dict[str, Scenario] = {
+    "GET /metrics": Scenario(lambda f, rng: ("GET", "/metrics", {})),
+    "GET /hotels/search": Scenario(_search_hotels),
+    "GET /hotels": Scenario(
+        lambda f, rng: ("GET", "/hotels", {"params": {"ids": _some(f.hotels, rng)}})
+    ),
+    "GET /hotels/rooms": Scenario(
+        lambda f, rng: (
+            "GET",
+            "/hotels/rooms",
+            {"params": {"hotel_ids": _some(f.hotels, rng)}},
+        )
+    ),
+    "GET /hotels/{hotel_id}": Scenario(
+        lambda f, rng: ("GET", f"/hotels/{_hotel_id(f, rng)}", {})
+    ),
+    "GET /hotels/{hotel_id}/page": Scenario(
+        lambda f, rng: (
+            "GET",
+            f"/hotels/{_hotel_id(f, rng)}/page",
+            {"params": {"currency": "EUR"}},
+        )
+    ),
+    "GET /hotels/{hotel_id}/rooms": Scenario(
+        lambda f, rng: ("GET", f"/hotels/{_hotel_id(f, rng)}/rooms", {})
+    ),
+    "GET /rooms": Scenario(
+        lambda f, rng: ("GET", "/rooms", {"params": {"ids": _some(f.rooms, rng)}})
+    ),
+    "GET /rooms/search": Scenario(
+        lambda f, rng: (
+            "GET",
+            "/rooms/search",
+            {"params": {"currency": "EUR", "min_price": 100, "max_price": 200}},
+        )
+    ),
+    "GET /hotels/{hotel_id}/reviews": Scenario(
+        lambda f, rng: ("GET", f"/hotels/{_hotel_id(f, rng)}/reviews", {})
+    ),
+    "GET /hotels/{hotel_id}/rating-stats": Scenario(
+        lambda f, rng: ("GET", f"/hotels/{_hotel_id(f, rng)}/rating-stats", {})
+    ),
+    "GET /hotels/{hotel_id}/availability": Scenario(_availability),
+    "GET /availability": Scenario(_search_availability),
+    "POST /my_hotels": Scenario(_create_hotel),
+    "PATCH /my_hotels": Scenario(_patch_hotel),
+    "POST /my_hotels/bulk": Scenario(_create_hotels),
+    "PUT /my_hotels/bulk": Scenario(_upsert_hotels),
+    "POST /my_hotels/rooms/bulk": Scenario(_create_rooms),
+    "PUT /my_hotels/rooms/bulk": Scenario(_upsert_rooms),
+    "GET /my_hotels": Scenario(
+        lambda f, rng: (
+            "GET",
+            "/my_hotels",
+            {"headers": {USER: str(rng.choice(f.hotels)[1])}},
+        )
+    ),
+    "GET /my_hotels/rating-stats": Scenario(
+        lambda f, rng: (
+            "GET",
+            "/my_hotels/rating-stats",
+            {"headers": {USER: str(rng.choice(f.hotels)[1])}},
+        )
+    ),
+    "GET /my_hotels/{hotel_id}/review-activity": Scenario(_review_activity),
+    "POST /reviews": Scenario(_create_review, _record_review),
+    "DELETE /reviews": Scenario(_delete_review),
+    "POST /reservations": Scenario(_create_reservation, _record_reservation),
+    "DELETE /reservations": Scenario(_cancel_reservation),
+}
+
+
+def missing_scenarios() -> set[str]:
+    routes = {
+        f"{method} {route.path}"
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+    return routes - SCENARIOS.keys()
+
+
+async def load_fixtures(conn: AsyncConnection, hotels: int) -> Fixtures:
+    sampled = (
+        await conn.execute(
+            text("SELECT id, owner_id FROM hotel ORDER BY random() LIMIT :n"),
+            {"n": hotels},
+        )
+    ).all()
+    rooms = (
+        await conn.execute(
+            text("""
+                SELECT rm.id, rm.hotel_id, h.owner_id
+                FROM hotel_room rm
+                JOIN hotel h ON h.id = rm.hotel_id
+                WHERE rm.hotel_id = ANY(:ids)
+                """),
+            {"ids": [h for h, _ in sampled]},
+        )
+    ).all()
+
+    return Fixtures(hotels=[tuple(r) for r in sampled], rooms=[tuple(r) for r in rooms])
+
+
+def percentile(samples: list[float], p: float) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0
+
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(p) - 1]
+
+
+class StatementCounter:
+    def __init__(self):
+        self.n = 0
+
+        app_db.open()
+        for engine in app_db.engines:
+            event.listen(engine.sync_engine, "before_cursor_execute", self.__count)
+
+    def __count(self, *_: Any) -> None:
+        self.n += 1
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    fixtures: Fixtures,
+    rng: random.Random,
+    concurrency: int,
+    requests: int,
+    statements: StatementCounter,
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+
+        while remaining > 0:
+            remaining -= 1
+            method, url, kwargs = scenario.make(fixtures, rng)
+
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+
+            statuses[response.status_code] += 1
+            if scenario.record is not None and response.is_success:
+                scenario.record(fixtures, kwargs, response.json())
+
+    statements.n = 0
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "rps": len(latencies) / elapsed,
+        "statements_per_request": statements.n / len(latencies),
+        "errors": sum(n for s, n in statuses.items() if s >= 500),
+        "statuses": {str(s): n for s, n in sorted(statuses.items())},
+    }
+
+
+async def run(
+    dsn: str,
+    volumes: Volumes | None,
+    levels: list[int],
+    requests: int,
+    warmup: int,
+    routes: list[str],
+) -> dict[str, Any]:
+    engine = create_async_engine(dsn)
+
+    if volumes is not None:
+        async with engine.begin() as conn:
+            await seed(conn, volumes)
+
+    async with engine.connect() as conn:
+        fixtures = await load_fixtures(conn, 1000)
+
+    await engine.dispose()
+
+    rng, statements = random.Random(7), StatementCounter()
+    results: dict[str, dict[str, Any]] = {}
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for concurrency in levels:
+            for name in routes:
+                scenario = SCENARIOS[name]
+                await drive(client, scenario, fixtures, rng, 1, warmup, statements)
+                result = await drive(
+                    client, scenario, fixtures, rng, concurrency, requests, statements
+                )
+                results.setdefault(name, {})[str(concurrency)] = result
+
+                print(
+                    f"{name:38} c={concurrency:<4} p50 {result['p50_ms']:7.2f} ms"
+                    f"  p95 {result['p95_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms"
+                    f"  {result['rps']:8.1f} rps"
+                    f"  {result['statements_per_request']:5.2f} stmt/req"
+                    + (f"  {result['errors']} errors" if result["errors"] else "")
+                )
+
+    return {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "requests": requests,
+        "routes": results,
+    }
+
+
+def regressions(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[str]:
+    found = []
+
+    for name, levels in current["routes"].items():
+        for concurrency, now in levels.items():
+            before = baseline["routes"].get(name, {}).get(concurrency)
+            if before is None:
+                continue
+
+            if now["p99_ms"] > before["p99_ms"] * (1 + threshold):
+                found.append(
+                    f"{name} c={concurrency}: p99 {before['p99_ms']:.2f}"
+                    f" -> {now['p99_ms']:.2f} ms"
+                )
+            if now["rps"] < before["rps"] * (1 - threshold):
+                found.append(
+                    f"{name} c={concurrency}: {before['rps']:.1f}"
+                    f" -> {now['rps']:.1f} rps"
+                )
+
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=db_config.ALCHEMY_DB_URI)
+    parser.add_argument(
+        "--seed",
+        action="store_true",
+        help="truncate and reseed the database first (use a dedicated database)",
+    )
+    parser.add_argument("--hotels", type=int, default=Volumes.hotels)
+    parser.add_argument("--reviews", type=int, default=Volumes.reviews)
+    parser.add_argument("--concurrency", default="1,16,64", help="comma separated")
+    parser.add_argument("--requests", type=int, default=500, help="per route and level")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--route", action="append", help="only these, repeatable")
+    parser.add_argument("--out", default="load.json")
+    parser.add_argument("--baseline", help="results of an earlier run to compare")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed relative regression"
+    )
+    args = parser.parse_args()
+
+    if missing := missing_scenarios():
+        print(f"routes without a scenario: {', '.join(sorted(missing))}")
+        sys.exit(2)
+
+    routes = args.route or list(SCENARIOS)
+    volumes = Volumes(hotels=args.hotels, reviews=args.reviews) if args.seed else None
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    current = asyncio.run(
+        run(args.dsn, volumes, levels, args.requests, args.warmup, routes)
+    )
+
+    with open(args.out, "w") as f:
+        json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(json.load(f), current, args.threshold)
+
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
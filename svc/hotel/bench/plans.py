@@ -0,0 +1,399 @@
+"""Query-plan regression check for every statement issued by the postgres DAOs.
+
+    alembic upgrade head
+    python -m bench.plans --seed
+
+Each check calls DAO methods against a seeded database inside a transaction
+that is rolled back afterwards. Every statement they emit is then EXPLAINed
+with the same parameters, and the run exits non-zero if any plan reads one of
+the service tables with a sequential scan.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import sys
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+from uuid import UUID, uuid4
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import src.app.dto as dto
+import src.app.service as svc
+import src.inf.db.postgres.config as db_config
+from src.app.enum import CountryCode, CurrencyCode, EventType
+from src.inf.db.postgres.dao import (
+    FxRateDao,
+    HotelDao,
+    HotelRatingDao,
+    HotelRatingStatsDao,
+    HotelReservationDao,
+    HotelReviewDao,
+    HotelRoomDao,
+    HotelSearchDao,
+    OutboxDao,
+    ReadModelDao,
+)
+
+from .seed import Volumes, seed
+
+TABLES = {
+    "hotel",
+    "hotel_room",
+    "hotel_review",
+    "hotel_reservation",
+    "hotel_rating_stats",
+    "hotel_review_daily",
+}
+
+# bulk jobs that rewrite a large share of a table, where a scan is the right plan
+SEQ_SCAN_OK = {"FxRateDao.set_rates"}
+
+
+@dataclass
+class Sample:
+    hotel_id: UUID
+    owner_id: UUID
+    room_id: UUID
+    review_id: UUID
+    author_id: UUID
+    review_after: tuple[datetime.date, UUID]
+    reservation_id: UUID
+    guest_id: UUID
+    number: int
+
+
+Check = Callable[[AsyncSession, Sample], Awaitable[Any]]
+
+
+async def _hotel_update(db: AsyncSession, s: Sample) -> None:
+    hotel = await HotelDao(db).get(s.hotel_id)
+    await HotelDao(db).update(hotel)
+
+
+async def _hotel_delete(db: AsyncSession, s: Sample) -> None:
+    # a fresh hotel, so the delete is not rejected by rooms or reviews
+    hotel = await HotelDao(db).add(_hotel(s))
+    await HotelDao(db).delete(hotel.id)
+
+
+async def _room_update(db: AsyncSession, s: Sample) -> None:
+    room = await HotelRoomDao(db).get(s.room_id)
+    await HotelRoomDao(db).update(room)
+
+
+async def _room_upsert(db: AsyncSession, s: Sample) -> None:
+    room = await HotelRoomDao(db).get(s.room_id)
+    await HotelRoomDao(db).upsert_many([room])
+
+
+async def _review_stream(db: AsyncSession, s: Sample) -> None:
+    async with aclosing(HotelReviewDao(db).stream_by_hotel(s.hotel_id, 1000)) as chunks:
+        async for _ in chunks:
+            break
+
+
+def _review(s: Sample) -> dto.HotelReview:
+    return dto.HotelReview(
+        author_id=s.author_id,
+        hotel_id=s.hotel_id,
+        rating=4,
+        comment="plan check",
+        date_created=datetime.date.today(),
+    )
+
+
+def _reservation(s: Sample) -> dto.Reservation:
+    # far enough ahead not to collide with seeded stays
+    check_in = datetime.date.today() + datetime.timedelta(days=300)
+
+    return dto.Reservation(
+        guest_id=s.guest_id,
+        hotel_id=s.hotel_id,
+        room_id=s.room_id,
+        number=s.number,
+        check_in=check_in,
+        check_out=check_in + datetime.timedelta(days=2),
+    )
+
+
+def _days(n: int) -> datetime.date:
+    return datetime.date.today() + datetime.timedelta(days=n)
+
+
+def _hotel_upsert(s: Sample) -> list[dto.HotelUpsert]:
+    hotel = _hotel(s)
+    return [dto.HotelUpsert(id=s.hotel_id, **hotel.model_dump(exclude={"rating"}))]
+
+
+def _hotel(s: Sample) -> dto.Hotel:
+    return dto.Hotel(
+        owner_id=s.owner_id,
+        name="plan check",
+        description="plan check",
+        location=dto.Location(country_code=CountryCode.PL, address="plan check"),
+        rating=dto.Rating(average=0, num_votes=0),
+    )
+
+
+CHECKS: dict[str, Check] = {
+    "HotelDao.get": lambda db, s: HotelDao(db).get(s.hotel_id),
+    "HotelDao.get_with_version": lambda db, s: HotelDao(db).get_with_version(
+        s.hotel_id
+    ),
+    "HotelDao.get_version": lambda db, s: HotelDao(db).get_version(s.hotel_id),
+    "HotelDao.get_many": lambda db, s: HotelDao(db).get_many([s.hotel_id, uuid4()]),
+    "HotelDao.get_page": lambda db, s: HotelDao(db).get_page(s.hotel_id, 21, 11),
+    "HotelDao.add": lambda db, s: HotelDao(db).add(_hotel(s)),
+    "HotelDao.update": _hotel_update,
+    "HotelDao.update_if_owned": lambda db, s: HotelDao(db).update_if_owned(
+        dto.HotelPatch(
+            id=s.hotel_id, name="plan check", description=None, location=None
+        ),
+        s.owner_id,
+    ),
+    "HotelDao.delete": _hotel_delete,
+    "HotelDao.by_owner": lambda db, s: HotelDao(db).by_owner(s.owner_id, 21),
+    "HotelDao.by_owner(after)": lambda db, s: HotelDao(db).by_owner(
+        s.owner_id, 21, after=UUID(int=0)
+    ),
+    "HotelDao.owned_ids": lambda db, s: HotelDao(db).owned_ids(
+        s.owner_id, [s.hotel_id, UUID(int=0)]
+    ),
+    "HotelDao.upsert_many": lambda db, s: HotelDao(db).upsert_many(_hotel_upsert(s)),
+    "HotelSearchDao.search": lambda db, s: HotelSearchDao(db).search(
+        dto.HotelSearchQuery(min_rating=4), 21
+    ),
+    "HotelSearchDao.search(country)": lambda db, s: HotelSearchDao(db).search(
+        dto.HotelSearchQuery(country_code=CountryCode.PL, min_rating=4),
+        21,
+        after=(4.5, UUID(int=0)),
+    ),
+    "HotelSearchDao.search(text)": lambda db, s: HotelSearchDao(db).search(
+        dto.HotelSearchQuery(q="seaside", country_code=CountryCode.PL), 21
+    ),
+    "HotelSearchDao.search(price)": lambda db, s: HotelSearchDao(db).search(
+        dto.HotelSearchQuery(
+            country_code=CountryCode.PL,
+            currency_code=CurrencyCode.EUR,
+            min_price=100,
+            max_price=200,
+        ),
+        21,
+    ),
+    "HotelRoomDao.get": lambda db, s: HotelRoomDao(db).get(s.room_id),
+    "HotelRoomDao.get_many": lambda db, s: HotelRoomDao(db).get_many(
+        [s.room_id, uuid4()]
+    ),
+    "HotelRoomDao.update": _room_update,
+    "HotelRoomDao.upsert_many": _room_upsert,
+    "HotelRoomDao.delete": lambda db, s: HotelRoomDao(db).delete(s.room_id),
+    "HotelRoomDao.by_hotel": lambda db, s: HotelRoomDao(db).by_hotel(s.hotel_id, 21),
+    "HotelRoomDao.by_hotel(after)": lambda db, s: HotelRoomDao(db).by_hotel(
+        s.hotel_id, 21, after=UUID(int=0)
+    ),
+    "HotelRoomDao.by_hotels": lambda db, s: HotelRoomDao(db).by_hotels(
+        [s.hotel_id, uuid4()], 21
+    ),
+    "HotelRoomDao.by_price": lambda db, s: HotelRoomDao(db).by_price(
+        CurrencyCode.EUR, 100, 200, 21
+    ),
+    "HotelRoomDao.by_price(after)": lambda db, s: HotelRoomDao(db).by_price(
+        CurrencyCode.EUR, None, None, 21, after=(150.0, UUID(int=0))
+    ),
+    "HotelReviewDao.get": lambda db, s: HotelReviewDao(db).get(s.review_id),
+    "HotelReviewDao.add": lambda db, s: HotelReviewDao(db).add(_review(s)),
+    "HotelReviewDao.delete": lambda db, s: HotelReviewDao(db).delete(s.review_id),
+    "HotelReviewDao.delete_if_authored": lambda db, s: HotelReviewDao(
+        db
+    ).delete_if_authored(s.review_id, s.author_id),
+    "HotelReviewDao.add(unrated)": lambda db, s: HotelReviewDao(
+        db, rate_hotels=False
+    ).add(_review(s)),
+    "HotelReviewDao.delete_if_authored(unrated)": lambda db, s: HotelReviewDao(
+        db, rate_hotels=False
+    ).delete_if_authored(s.review_id, s.author_id),
+    "HotelReviewDao.by_hotel": lambda db, s: HotelReviewDao(db).by_hotel(
+        s.hotel_id, 21
+    ),
+    "HotelReviewDao.by_hotel(after)": lambda db, s: HotelReviewDao(db).by_hotel(
+        s.hotel_id, 21, after=s.review_after
+    ),
+    "HotelReviewDao.stream_by_hotel": _review_stream,
+    "HotelRatingStatsDao.get": lambda db, s: HotelRatingStatsDao(db).get(
+        s.hotel_id, _days(-29)
+    ),
+    "HotelRatingStatsDao.by_owner": lambda db, s: HotelRatingStatsDao(db).by_owner(
+        s.owner_id, _days(-29), 21
+    ),
+    "HotelRatingStatsDao.daily": lambda db, s: HotelRatingStatsDao(db).daily(
+        s.hotel_id, _days(-364)
+    ),
+    "HotelReviewDao.by_author": lambda db, s: HotelReviewDao(db).by_author(
+        s.author_id, 21
+    ),
+    "HotelReviewDao.by_author(after)": lambda db, s: HotelReviewDao(db).by_author(
+        s.author_id, 21, after=s.review_after
+    ),
+    "HotelReservationDao.get": lambda db, s: HotelReservationDao(db).get(
+        s.reservation_id
+    ),
+    "HotelReservationDao.add": lambda db, s: HotelReservationDao(db).add(
+        _reservation(s)
+    ),
+    "HotelReservationDao.delete_if_guest": lambda db, s: HotelReservationDao(
+        db
+    ).delete_if_guest(s.reservation_id, s.guest_id),
+    "HotelReservationDao.by_hotel": lambda db, s: HotelReservationDao(db).by_hotel(
+        s.hotel_id, _days(-1), _days(400)
+    ),
+    "HotelReservationDao.available": lambda db, s: HotelReservationDao(db).available(
+        s.hotel_id, _days(7), _days(10)
+    ),
+    "HotelReservationDao.available_by_hotels": lambda db, s: HotelReservationDao(
+        db
+    ).available_by_hotels([s.hotel_id], _days(7), _days(10)),
+    "FxRateDao.rates": lambda db, s: FxRateDao(db).rates(),
+    "FxRateDao.set_rates": lambda db, s: FxRateDao(db).set_rates(
+        {CurrencyCode.PLN: 0.25}
+    ),
+    "HotelRatingDao.apply": lambda db, s: HotelRatingDao(db).apply(
+        {s.hotel_id: (1, 4)}
+    ),
+    "HotelRatingDao.reconcile": lambda db, s: HotelRatingDao(db).reconcile(None, 1000),
+    "ReadModelDao.hotels": lambda db, s: ReadModelDao(db).hotels(s.hotel_id, 10_000),
+    "ReadModelDao.rooms": lambda db, s: ReadModelDao(db).rooms(s.room_id, 10_000),
+    "ReadModelDao.hotels_by_id": lambda db, s: ReadModelDao(db).hotels_by_id(
+        [s.hotel_id]
+    ),
+    "ReadModelDao.rooms_by_id": lambda db, s: ReadModelDao(db).rooms_by_id([s.room_id]),
+    "ReadModelDao.rooms_of": lambda db, s: ReadModelDao(db).rooms_of(s.hotel_id),
+    "OutboxDao.add_many": lambda db, s: OutboxDao(db).add_many(
+        [svc.make_event(EventType.HOTEL_UPDATED, s.hotel_id, {}) for _ in range(10)]
+    ),
+    "OutboxDao.take": lambda db, s: OutboxDao(db).take(500),
+}
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = []
+
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in TABLES:
+        found.append(plan["Relation Name"])
+
+    for child in plan.get("Plans", []):
+        found += seq_scans(child)
+
+    return found
+
+
+async def load_sample(db: AsyncSession) -> Sample:
+    # the most reviewed hotel is the worst case for every per-hotel listing
+    row = (await db.execute(text("""
+                SELECT h.id, h.owner_id, rm.id, rv.id, rv.author_id, rv.date_created
+                FROM hotel h
+                JOIN hotel_room rm ON rm.hotel_id = h.id
+                JOIN hotel_review rv ON rv.hotel_id = h.id
+                ORDER BY h.rating_num_votes DESC
+                LIMIT 1
+                """))).one()
+
+    reservation = (
+        await db.execute(
+            text("""
+                SELECT id, guest_id, number
+                FROM hotel_reservation
+                WHERE room_id = :room_id
+                LIMIT 1
+                """),
+            {"room_id": row[2]},
+        )
+    ).one()
+
+    return Sample(
+        hotel_id=row[0],
+        owner_id=row[1],
+        room_id=row[2],
+        review_id=row[3],
+        author_id=row[4],
+        review_after=(row[5], row[3]),
+        reservation_id=reservation[0],
+        guest_id=reservation[1],
+        number=reservation[2],
+    )
+
+
+async def run(dsn: str, volumes: Volumes | None) -> int:
+    engine = create_async_engine(dsn)
+    captured: list[tuple[str, Any]] | None = None
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if captured is not None:
+            captured.append((statement, parameters))
+
+    if volumes is not None:
+        async with engine.begin() as conn:
+            await seed(conn, volumes)
+
+    failures = 0
+
+    async with AsyncSession(engine) as db:
+        sample = await load_sample(db)
+
+        for name, check in CHECKS.items():
+            captured = []
+            async with db.begin_nested():
+                await check(db, sample)
+            statements, captured = captured, None
+
+            conn = await db.connection()
+            for statement, parameters in statements:
+                if statement.startswith(("SAVEPOINT", "RELEASE", "ROLLBACK")):
+                    continue
+
+                result = await conn.exec_driver_sql(
+                    "EXPLAIN (FORMAT JSON) " + statement, parameters
+                )
+                plan = result.scalar_one()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                scans = [] if name in SEQ_SCAN_OK else seq_scans(plan[0]["Plan"])
+
+                status = "FAIL" if scans else "ok"
+                print(f"{status:4} {name}: {' '.join(statement.split())[:100]}")
+                for table in scans:
+                    print(f"     seq scan on {table}")
+                failures += bool(scans)
+
+        await db.rollback()
+
+    await engine.dispose()
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=db_config.ALCHEMY_DB_URI)
+    parser.add_argument(
+        "--seed",
+        action="store_true",
+        help="truncate and reseed the database first (use a dedicated database)",
+    )
+    parser.add_argument("--hotels", type=int, default=Volumes.hotels)
+    parser.add_argument("--reviews", type=int, default=Volumes.reviews)
+    args = parser.parse_args()
+
+    volumes = Volumes(hotels=args.hotels, reviews=args.reviews) if args.seed else None
+    failures = asyncio.run(run(args.dsn, volumes))
+
+    if failures:
+        print(f"{failures} statement(s) regressed to a sequential scan")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
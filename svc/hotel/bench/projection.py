@@ -0,0 +1,148 @@
+"""Micro-benchmark of the DAO read path: ORM hydration vs column projection.
+
+    alembic upgrade head
+    python -m bench.projection --rows 10000
+
+Inserts one hotel with `rows` room types and `rows` reviews inside a
+transaction that is rolled back, then times `by_hotel` both ways.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import src.app.dto as dto
+import src.inf.db.postgres.config as db_config
+from src.app.enum import CurrencyCode
+from src.inf.db.postgres.dao import HotelReviewDao, HotelRoomDao
+from src.inf.db.postgres.model import HotelReview, HotelRoom
+
+
+async def legacy_rooms(db: AsyncSession, hotel_id: UUID, limit: int) -> list:
+    stmt = select(HotelRoom).where(HotelRoom.hotel_id == hotel_id).limit(limit)
+    rooms = (await db.execute(stmt)).scalars().all()
+
+    result = [
+        dto.HotelRoomWithID(
+            id=r.id,
+            hotel_id=r.hotel_id,
+            name=r.name,
+            description=r.description,
+            price_per_night=dto.Price(
+                currency_code=CurrencyCode(r.price_per_night_currency_code),
+                amount=r.price_per_night,
+            ),
+            numbers=r.numbers,
+        )
+        for r in rooms
+    ]
+    db.expunge_all()
+
+    return result
+
+
+async def legacy_reviews(db: AsyncSession, hotel_id: UUID, limit: int) -> list:
+    stmt = select(HotelReview).where(HotelReview.hotel_id == hotel_id).limit(limit)
+    reviews = (await db.execute(stmt)).scalars().all()
+
+    result = [
+        dto.HotelReviewWithID(
+            id=r.id,
+            author_id=r.author_id,
+            hotel_id=r.hotel_id,
+            rating=r.rating,
+            comment=r.comment,
+            date_created=r.date_created,
+        )
+        for r in reviews
+    ]
+    db.expunge_all()
+
+    return result
+
+
+async def measure(
+    fetch: Callable[[], Awaitable[list]], repeat: int
+) -> tuple[int, float]:
+    await fetch()  # warm up statement caches
+
+    rows, start = 0, time.perf_counter()
+    for _ in range(repeat):
+        rows += len(await fetch())
+
+    return rows, time.perf_counter() - start
+
+
+async def run(dsn: str, rows: int, repeat: int) -> None:
+    engine = create_async_engine(dsn)
+    hotel_id = uuid4()
+
+    async with AsyncSession(engine) as db:
+        await db.execute(
+            text("""
+                INSERT INTO hotel (
+                    id, owner_id, name, description,
+                    location_country_code, location_address,
+                    rating_average, rating_num_votes
+                )
+                VALUES (:id, gen_random_uuid(), 'bench', 'bench', 'PL', 'bench', 0, 0)
+                """),
+            {"id": hotel_id},
+        )
+        await db.execute(
+            text("""
+                INSERT INTO hotel_room (
+                    id, hotel_id, name, description,
+                    price_per_night_currency_code, price_per_night, numbers
+                )
+                SELECT gen_random_uuid(), :id, 'Room ' || g, 'Double bed',
+                    (ARRAY['USD', 'EUR', 'PLN'])[1 + g % 3], 100, ARRAY[g]
+                FROM generate_series(1, :rows) AS g
+                """),
+            {"id": hotel_id, "rows": rows},
+        )
+        await db.execute(
+            text("""
+                INSERT INTO hotel_review (
+                    id, author_id, hotel_id, rating, comment, date_created
+                )
+                SELECT gen_random_uuid(), gen_random_uuid(), :id, 1 + g % 5,
+                    'Nice stay', current_date - g % 365
+                FROM generate_series(1, :rows) AS g
+                """),
+            {"id": hotel_id, "rows": rows},
+        )
+
+        cases = {
+            "rooms    orm+validate": lambda: legacy_rooms(db, hotel_id, rows),
+            "rooms    projection": lambda: HotelRoomDao(db).by_hotel(hotel_id, rows),
+            "reviews  orm+validate": lambda: legacy_reviews(db, hotel_id, rows),
+            "reviews  projection": lambda: HotelReviewDao(db).by_hotel(hotel_id, rows),
+        }
+
+        for name, fetch in cases.items():
+            fetched, elapsed = await measure(fetch, repeat)
+            print(f"{name:24} {fetched / elapsed:>12,.0f} rows/sec")
+
+        await db.rollback()
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=db_config.ALCHEMY_DB_URI)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.dsn, args.rows, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Memory footprint and lookup speed of the in-process read model.
+
+    python -m bench.read_model --hotels 1000000 --rooms-per-hotel 5
+
+Fills a read model state with synthetic hotels and room types, shaped like the
+seeded ones, and reports the memory traced per hotel and room and extrapolated
+to 1M hotels, to size READ_MODEL_MAX_HOTELS and READ_MODEL_MAX_ROOMS. Then
+times serving a hotel, an owner's page and a hotel's rooms from memory.
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+import uuid
+from typing import Callable
+
+from src.app.enum import CountryCode, CurrencyCode
+from src.inf.db.read_model import HotelRecord, ReadModel, ReadModelState, RoomRecord
+
+
+def hotel_row(n: int, owners: list[uuid.UUID]) -> tuple:
+    return (
+        uuid.uuid4(),
+        owners[n % len(owners)],
+        f"Grand Hotel {n}",
+        "A comfortable place to stay. " * 8,
+        random.choice(list(CountryCode)),
+        f"{n} Main Street",
+        random.uniform(1, 5),
+        random.randrange(1000),
+        1,
+    )
+
+
+def room_row(hotel_id: uuid.UUID, n: int) -> tuple:
+    return (
+        uuid.uuid4(),
+        hotel_id,
+        f"Room type {n}",
+        "Double bed, sea view. " * 4,
+        random.choice(list(CurrencyCode)),
+        float(50 + n % 450),
+        [100 + n % 50, 200 + n % 50, 300 + n % 50],
+    )
+
+
+def traced(fn: Callable[[], None]) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    fn()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return after - before
+
+
+def timed(label: str, fn: Callable[[], object], repeat: int = 10_000) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+
+    print(f"{label:28} {elapsed * 1e6:8.2f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=200_000)
+    parser.add_argument("--rooms-per-hotel", type=int, default=5)
+    parser.add_argument("--owners", type=int, default=20_000)
+    args = parser.parse_args()
+
+    owners = [uuid.uuid4() for _ in range(args.owners)]
+    state = ReadModelState()
+
+    # rows are made inside the traced section, the records keep their values
+    def load_hotels() -> None:
+        for n in range(args.hotels):
+            state.put_hotel(HotelRecord(hotel_row(n, owners)))
+
+    def load_rooms() -> None:
+        for n, hotel_id in enumerate(list(state.hotels) * args.rooms_per_hotel):
+            state.put_room(RoomRecord(room_row(hotel_id, n)))
+
+    hotel_bytes = traced(load_hotels) / args.hotels
+    room_bytes = traced(load_rooms) / (args.hotels * args.rooms_per_hotel)
+    per_million = (hotel_bytes + room_bytes * args.rooms_per_hotel) * 1_000_000
+
+    print(f"{'per hotel':28} {hotel_bytes:8.0f} B")
+    print(f"{'per room type':28} {room_bytes:8.0f} B")
+    print(
+        f"{'per 1M hotels':28} {per_million / 2**20:8.0f} MiB"
+        f"  ({args.rooms_per_hotel} room types each)"
+    )
+
+    model = ReadModel("", None, len(state.hotels), len(state.rooms))
+    model.state, model.ready = state, True
+
+    hotel_id, owner_id = next(iter(state.hotels)), owners[0]
+    timed("hotel", lambda: model.hotel(hotel_id))
+    timed("owner page of 20", lambda: model.by_owner(owner_id, 20, None))
+    timed("rooms of a hotel", lambda: model.rooms_of(hotel_id, 20, None))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Throughput of the web app as worker processes are added.
+
+    alembic upgrade head
+    python -m bench.scaling --seed --workers 1,2,4,8 --clients 4
+
+Starts `python -m src.inf.web` with each worker count and drives a mix of read
+routes over HTTP for a fixed time from --clients processes, then reports RPS,
+latency and the speedup over the first count. The clients share the machine
+with the workers, so RPS stops scaling once workers plus clients cover the
+cores; read the scaling per core up to that point.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import src.inf.db.postgres.config as db_config
+
+from .load import SCENARIOS, Fixtures, load_fixtures, percentile
+from .seed import Volumes, seed
+
+ROUTES = [
+    "GET /hotels/{hotel_id}",
+    "GET /hotels/{hotel_id}/page",
+    "GET /hotels/{hotel_id}/rooms",
+    "GET /hotels/{hotel_id}/reviews",
+    "GET /hotels/{hotel_id}/rating-stats",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, server: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with {server.returncode}")
+        try:
+            if httpx.get(f"{url}/metrics").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+
+    raise TimeoutError(f"{url} not ready after {timeout} s")
+
+
+@contextmanager
+def serve(workers: int) -> Iterator[str]:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            *("-m", "src.inf.web"),
+            *("--host", "127.0.0.1"),
+            *("--port", str(port)),
+            *("--workers", str(workers)),
+        ],
+        env={**os.environ, "WEB_ACCESS_LOG": "false"},
+    )
+
+    try:
+        wait_ready(url, server)
+        yield url
+    finally:
+        server.terminate()
+        server.wait(30)
+
+
+async def hammer(
+    url: str,
+    fixtures: Fixtures,
+    routes: list[str],
+    concurrency: int,
+    duration: float,
+    rng_seed: int,
+) -> tuple[list[float], int]:
+    rng, latencies, errors = random.Random(rng_seed), [], 0
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async with httpx.AsyncClient(base_url=url, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker() -> None:
+            nonlocal errors
+
+            while (start := time.perf_counter()) < deadline:
+                method, path, kwargs = SCENARIOS[rng.choice(routes)].make(fixtures, rng)
+                response = await client.request(method, path, **kwargs)
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code >= 500
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return latencies, errors
+
+
+def client(job: tuple) -> tuple[list[float], int]:
+    return asyncio.run(hammer(*job))
+
+
+def measure(
+    pool: ProcessPoolExecutor,
+    clients: int,
+    url: str,
+    fixtures: Fixtures,
+    routes: list[str],
+    concurrency: int,
+    duration: float,
+) -> dict[str, Any]:
+    jobs = [(url, fixtures, routes, concurrency, duration, n) for n in range(clients)]
+    latencies, errors = [], 0
+    for samples, failed in pool.map(client, jobs):
+        latencies += samples
+        errors += failed
+
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / duration,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": errors,
+    }
+
+
+async def prepare(dsn: str, volumes: Volumes | None) -> Fixtures:
+    engine = create_async_engine(dsn)
+
+    if volumes is not None:
+        async with engine.begin() as conn:
+            await seed(conn, volumes)
+
+    async with engine.connect() as conn:
+        fixtures = await load_fixtures(conn, 1000)
+    await engine.dispose()
+
+    return fixtures
+
+
+def run(
+    dsn: str,
+    volumes: Volumes | None,
+    counts: list[int],
+    clients: int,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    routes: list[str],
+) -> dict[str, Any]:
+    fixtures = asyncio.run(prepare(dsn, volumes))
+    results: dict[str, dict[str, Any]] = {}
+
+    with ProcessPoolExecutor(clients) as pool:
+        for workers in counts:
+            with serve(workers) as url:
+                args = (pool, clients, url, fixtures, routes, concurrency)
+                measure(*args, warmup)
+                result = measure(*args, duration)
+
+            base = next(iter(results.values()), result)
+            result["speedup"] = result["rps"] / base["rps"] * counts[0]
+            results[str(workers)] = result
+
+            print(
+                f"{workers:3} workers  {result['rps']:9.1f} rps"
+                f"  p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms"
+                f"  x{result['speedup']:.2f}"
+                f"  {result['speedup'] / workers:4.0%} per worker"
+                + (f"  {result['errors']} errors" if result["errors"] else "")
+            )
+
+    return {"cores": os.cpu_count(), "routes": routes, "workers": results}
+
+
+def main() -> None:
+    cores = os.cpu_count() or 1
+    counts = sorted({*(2**n for n in range(cores.bit_length()) if 2**n < cores), cores})
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=db_config.ALCHEMY_DB_URI)
+    parser.add_argument(
+        "--seed",
+        action="store_true",
+        help="truncate and reseed the database first (use a dedicated database)",
+    )
+    parser.add_argument("--hotels", type=int, default=Volumes.hotels)
+    parser.add_argument("--reviews", type=int, default=Volumes.reviews)
+    parser.add_argument(
+        "--workers", default=",".join(map(str, counts)), help="comma separated"
+    )
+    parser.add_argument("--clients", type=int, default=max(1, cores // 4))
+    parser.add_argument(
+        "--concurrency", type=int, default=32, help="connections per client"
+    )
+    parser.add_argument("--duration", type=float, default=15, help="seconds")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds")
+    parser.add_argument("--route", action="append", help="only these, repeatable")
+    parser.add_argument("--out", default="scaling.json")
+    args = parser.parse_args()
+
+    volumes = Volumes(hotels=args.hotels, reviews=args.reviews) if args.seed else None
+
+    result = run(
+        args.dsn,
+        volumes,
+        [int(w) for w in args.workers.split(",")],
+        args.clients,
+        args.concurrency,
+        args.duration,
+        args.warmup,
+        args.route or ROUTES,
+    )
+
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
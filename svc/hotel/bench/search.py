@@ -0,0 +1,126 @@
+"""Latency benchmark of hotel search against a seeded database.
+
+    alembic upgrade head
+    python -m bench.search --seed --hotels 1000000
+
+Runs a mix of filter combinations, each with and without a page cursor, and
+reports p50/p95/p99 per scenario. Exits non-zero if any p99 exceeds the budget.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import src.app.dto as dto
+import src.inf.db.postgres.config as db_config
+from src.app.enum import CountryCode, CurrencyCode
+from src.inf.db.postgres.dao import HotelSearchDao
+
+from .seed import Volumes, seed
+
+COUNTRIES = [CountryCode.US, CountryCode.DE, CountryCode.PL, CountryCode.JP]
+
+SCENARIOS: dict[str, list[dto.HotelSearchQuery]] = {
+    "rating": [dto.HotelSearchQuery(min_rating=r) for r in (0, 3, 4.5)],
+    "country+rating": [
+        dto.HotelSearchQuery(country_code=c, min_rating=3) for c in COUNTRIES
+    ],
+    "text": [
+        dto.HotelSearchQuery(q=q) for q in ("seaside", "grand palace", "royal -hotel")
+    ],
+    "text+country": [
+        dto.HotelSearchQuery(q="plaza", country_code=c) for c in COUNTRIES
+    ],
+    "country+price": [
+        dto.HotelSearchQuery(
+            country_code=c,
+            currency_code=CurrencyCode.EUR,
+            min_price=100,
+            max_price=150,
+        )
+        for c in COUNTRIES
+    ],
+}
+
+
+def percentile(samples: list[float], p: float) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[int(p) - 1]
+
+
+async def run_scenario(
+    db: AsyncSession, queries: list[dto.HotelSearchQuery], repeat: int, limit: int
+) -> list[float]:
+    dao, samples = HotelSearchDao(db), []
+
+    for query in queries:
+        await dao.search(query, limit)  # warm up statement caches
+
+    for n in range(repeat):
+        query = queries[n % len(queries)]
+
+        start = time.perf_counter()
+        page = await dao.search(query, limit)
+        samples.append(time.perf_counter() - start)
+
+        if page:
+            # the next page, as a client following the cursor would ask for it
+            start = time.perf_counter()
+            await dao.search(query, limit, after=(page[-1].score, page[-1].id))
+            samples.append(time.perf_counter() - start)
+
+    return samples
+
+
+async def run(dsn: str, volumes: Volumes | None, repeat: int, budget: float) -> int:
+    engine = create_async_engine(dsn)
+
+    if volumes is not None:
+        async with engine.begin() as conn:
+            await seed(conn, volumes)
+
+    failures = 0
+
+    async with AsyncSession(engine) as db:
+        for name, queries in SCENARIOS.items():
+            samples = await run_scenario(db, queries, repeat, limit=21)
+            p50, p95, p99 = (percentile(samples, p) * 1000 for p in (50, 95, 99))
+
+            status = "FAIL" if p99 > budget else "ok"
+            print(
+                f"{status:4} {name:16} p50 {p50:7.2f} ms  p95 {p95:7.2f} ms"
+                f"  p99 {p99:7.2f} ms  ({len(samples)} queries)"
+            )
+            failures += p99 > budget
+
+    await engine.dispose()
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", default=db_config.ALCHEMY_DB_URI)
+    parser.add_argument(
+        "--seed",
+        action="store_true",
+        help="truncate and reseed the database first (use a dedicated database)",
+    )
+    parser.add_argument("--hotels", type=int, default=Volumes.hotels)
+    parser.add_argument("--reviews", type=int, default=Volumes.reviews)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--budget", type=float, default=50, help="p99 budget in ms")
+    args = parser.parse_args()
+
+    volumes = Volumes(hotels=args.hotels, reviews=args.reviews) if args.seed else None
+    failures = asyncio.run(run(args.dsn, volumes, args.repeat, args.budget))
+
+    if failures:
+        print(f"{failures} scenario(s) over the {args.budget:g} ms p99 budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
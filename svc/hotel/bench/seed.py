@@ -0,0 +1,146 @@
+"""Server-side seeding of a benchmark database.
+
+Rows are generated with generate_series so seeding a few million reviews takes
+seconds. Ids are derived from md5 of a counter, so the same volumes always
+produce the same hotels and owners. Reviews are skewed towards a few hot
+hotels, like production traffic.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+@dataclass
+class Volumes:
+    hotels: int = 20_000
+    owners: int = 2_000
+    rooms_per_hotel: int = 5
+    reviews: int = 1_000_000
+    authors: int = 200_000
+    reservation_weeks: int = 4
+    guests: int = 100_000
+
+
+def hotel_id(n: int) -> UUID:
+    return UUID(hashlib.md5(f"hotel{n}".encode()).hexdigest())
+
+
+def owner_id(n: int) -> UUID:
+    return UUID(hashlib.md5(f"owner{n}".encode()).hexdigest())
+
+
+async def seed(conn: AsyncConnection, volumes: Volumes) -> None:
+    await conn.execute(
+        text(
+            "TRUNCATE outbox_event, hotel_reservation, hotel_review, hotel_room, hotel"
+            " CASCADE"
+        )
+    )
+
+    # rates go first, the hotel_room trigger normalizes prices on insert
+    await conn.execute(text("""
+            INSERT INTO fx_rate (currency_code, rate)
+            VALUES ('USD', 1), ('EUR', 1.08), ('GBP', 1.27), ('JPY', 0.0067), ('PLN', 0.25)
+            ON CONFLICT (currency_code) DO UPDATE SET rate = excluded.rate
+            """))
+
+    await conn.execute(
+        text("""
+            INSERT INTO hotel (
+                id, owner_id, name, description,
+                location_country_code, location_address,
+                rating_average, rating_num_votes
+            )
+            SELECT
+                md5('hotel' || g)::uuid,
+                md5('owner' || (g % :owners))::uuid,
+                (ARRAY['Grand', 'Plaza', 'Palace', 'Seaside', 'Central', 'Royal'])
+                    [1 + (g / 8) % 6] || ' Hotel ' || g,
+                repeat('A comfortable place to stay. ', 8),
+                (ARRAY['US', 'DE', 'FR', 'IT', 'ES', 'GB', 'JP', 'PL'])[1 + g % 8]::country_code,
+                g || ' Main Street',
+                0,
+                0
+            FROM generate_series(0, :hotels - 1) AS g
+            """),
+        {"hotels": volumes.hotels, "owners": volumes.owners},
+    )
+
+    await conn.execute(
+        text("""
+            INSERT INTO hotel_room (
+                id, hotel_id, name, description,
+                price_per_night_currency_code, price_per_night, numbers
+            )
+            SELECT
+                gen_random_uuid(),
+                md5('hotel' || (g % :hotels))::uuid,
+                'Room type ' || (g / :hotels),
+                repeat('Double bed, sea view. ', 4),
+                (ARRAY['USD', 'EUR', 'GBP', 'JPY', 'PLN'])[1 + g % 5]::currency_code,
+                50 + (g % 450),
+                ARRAY[100 + g % 50, 200 + g % 50, 300 + g % 50]
+            FROM generate_series(0, :hotels * :rooms - 1) AS g
+            """),
+        {"hotels": volumes.hotels, "rooms": volumes.rooms_per_hotel},
+    )
+
+    await conn.execute(
+        text("""
+            INSERT INTO hotel_review (
+                id, author_id, hotel_id, rating, comment, date_created
+            )
+            SELECT
+                gen_random_uuid(),
+                md5('author' || (g % :authors))::uuid,
+                md5('hotel' || floor(:hotels * power(random(), 3))::int)::uuid,
+                1 + (g % 5),
+                repeat('Nice stay. ', 6),
+                current_date - (g % 1500)
+            FROM generate_series(0, :reviews - 1) AS g
+            """),
+        {
+            "reviews": volumes.reviews,
+            "authors": volumes.authors,
+            "hotels": volumes.hotels,
+        },
+    )
+
+    # one stay of 1-5 nights per room number and week, so none overlap
+    await conn.execute(
+        text("""
+            INSERT INTO hotel_reservation (
+                id, guest_id, hotel_id, room_id, number, stay
+            )
+            SELECT
+                gen_random_uuid(),
+                md5('guest' || ((w * 7919 + n) % :guests))::uuid,
+                rm.hotel_id,
+                rm.id,
+                n,
+                daterange(current_date + 7 * w, current_date + 7 * w + 1 + (n + w) % 5)
+            FROM hotel_room AS rm
+            CROSS JOIN unnest(rm.numbers) AS n
+            CROSS JOIN generate_series(0, :weeks - 1) AS w
+            """),
+        {"weeks": volumes.reservation_weeks, "guests": volumes.guests},
+    )
+
+    await conn.execute(text("""
+            UPDATE hotel
+            SET rating_average = s.average, rating_num_votes = s.num_votes
+            FROM (
+                SELECT hotel_id, avg(rating) AS average, count(*) AS num_votes
+                FROM hotel_review
+                GROUP BY hotel_id
+            ) AS s
+            WHERE hotel.id = s.hotel_id
+            """))
+
+    await conn.execute(
+        text("ANALYZE hotel, hotel_room, hotel_review, hotel_reservation")
+    )
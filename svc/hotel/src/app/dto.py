@@ -1,7 +1,11 @@
-from pydantic import BaseModel, UUID4
-from datetime import date
+from typing import Any, Generic, TypeVar
+from uuid import UUID
+from pydantic import BaseModel, Field, UUID4
+from datetime import date, datetime
 from . import enum
 
+T = TypeVar("T")
+
 # misc
 
 
@@ -20,6 +24,27 @@ class Rating(BaseModel):
     num_votes: int
 
 
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: str | None
+
+
+class BulkItemError(BaseModel):
+    index: int
+    detail: str
+
+
+class BulkResult(BaseModel, Generic[T]):
+    items: list[T]
+    errors: list[BulkItemError]
+
+
+class Batch(BaseModel, Generic[T]):
+    # in the order requested, without the ids listed as missing
+    items: list[T]
+    missing: list[UUID]
+
+
 # hotel
 
 
@@ -46,6 +71,25 @@ class HotelNew(BaseModel):
     location: Location
 
 
+class HotelUpsert(HotelNew):
+    id: UUID4
+
+
+class HotelSearchQuery(BaseModel):
+    q: str | None = None
+
+    country_code: enum.CountryCode | None = None
+    min_rating: float | None = None
+
+    currency_code: enum.CurrencyCode | None = None
+    min_price: float | None = None
+    max_price: float | None = None
+
+
+class HotelSearchResult(HotelWithID):
+    score: float
+
+
 class HotelPatch(BaseModel):
     id: UUID4
 
@@ -72,6 +116,16 @@ class HotelRoomWithID(HotelRoom):
     id: UUID4
 
 
+class HotelRooms(BaseModel):
+    hotel_id: UUID
+    rooms: list[HotelRoomWithID]
+
+
+class HotelRoomSearchResult(HotelRoomWithID):
+    # price_per_night in the fx base currency, the sort key of room searches
+    base_price: float
+
+
 class HotelRoomNew(BaseModel):
     hotel_id: UUID4
 
@@ -115,5 +169,93 @@ class HotelReviewNew(BaseModel):
 
     hotel_id: UUID4
 
-    rating: int
+    rating: int = Field(ge=1, le=5)
     comment: str
+
+
+class ReviewWindow(BaseModel):
+    since: date
+
+    num_reviews: int
+    average: float
+
+
+class HotelRatingStats(BaseModel):
+    hotel_id: UUID4
+
+    rating: Rating
+    # number of reviews giving the hotel 1 to 5 stars
+    stars: dict[int, int]
+
+    recent: ReviewWindow
+
+
+class HotelReviewDay(BaseModel):
+    day: date
+
+    num_reviews: int
+    average: float
+
+
+# reservation
+
+
+class Reservation(BaseModel):
+    guest_id: UUID4
+
+    hotel_id: UUID4
+    room_id: UUID4
+    number: int
+
+    check_in: date
+    check_out: date
+
+
+class ReservationWithID(Reservation):
+    id: UUID4
+
+
+class ReservationNew(BaseModel):
+    guest_id: UUID4
+
+    room_id: UUID4
+
+    check_in: date
+    check_out: date
+
+
+class HotelRoomAvailability(BaseModel):
+    room_id: UUID4
+    numbers: list[int]
+
+
+class HotelAvailability(BaseModel):
+    hotel_id: UUID4
+
+    check_in: date
+    check_out: date
+
+    rooms: list[HotelRoomAvailability]
+
+
+# hotel page
+
+
+class HotelPage(BaseModel):
+    hotel: HotelWithID
+    rooms: Page[HotelRoomWithID]
+    reviews: Page[HotelReviewWithID]
+
+
+# event
+
+
+class Event(BaseModel):
+    id: UUID4
+    type: enum.EventType
+
+    # id of the hotel the event belongs to, consumers may rely on its order
+    key: UUID4
+    payload: dict[str, Any]
+
+    created_at: datetime
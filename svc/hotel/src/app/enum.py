@@ -428,3 +428,10 @@ class CountryCode(Enum):
     YE = "YE"
     ZM = "ZM"
     ZW = "ZW"
+
+
+class EventType(Enum):
+    HOTEL_CREATED = "hotel.created"
+    HOTEL_UPDATED = "hotel.updated"
+    REVIEW_CREATED = "review.created"
+    REVIEW_DELETED = "review.deleted"
@@ -1,3 +1,4 @@
+from datetime import date
 from uuid import UUID
 
 
@@ -15,3 +16,44 @@ class NotOwnedError(Exception):
         super().__init__(
             f"resource of type {resource_type} is not owned by user:{user_id}."
         )
+
+
+class InvalidCursorError(Exception):
+    def __init__(self, cursor: str):
+        self.cursor = cursor
+        super().__init__(f"invalid pagination cursor {cursor!r}.")
+
+
+class InvalidSearchError(Exception):
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(f"invalid search: {reason}")
+
+
+class UnknownCurrencyError(Exception):
+    def __init__(self, currency_code: str):
+        self.currency_code = currency_code
+        super().__init__(f"no exchange rate for currency {currency_code}.")
+
+
+class InvalidStayError(Exception):
+    def __init__(self, check_in: date, check_out: date):
+        self.check_in = check_in
+        self.check_out = check_out
+        super().__init__(f"invalid stay from {check_in} to {check_out}.")
+
+
+class NotAvailableError(Exception):
+    def __init__(self, room_id: UUID):
+        self.room_id = room_id
+        super().__init__(f"room:{room_id} is not available for the requested stay.")
+
+
+class NotModifiedError(Exception):
+    def __init__(self, resource_type: str, resource_id: UUID, version: int):
+        self.resource_type = resource_type
+        self.resource_id = resource_id
+        self.version = version
+        super().__init__(
+            f"{resource_type}:{resource_id} is still at version {version}."
+        )
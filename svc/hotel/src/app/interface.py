@@ -1,30 +1,103 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from datetime import date
+from typing import Any, AsyncIterator, Iterable
 from uuid import UUID
 from . import dto
+from .enum import CurrencyCode
+from .loader import Loader
 
 
 class HotelDao(ABC):
     @abstractmethod
     async def get(self, hotel_id: UUID) -> dto.HotelWithID | None: ...
 
+    @abstractmethod
+    async def get_many(self, hotel_ids: list[UUID]) -> list[dto.HotelWithID]:
+        """The hotels found among the ids, in no particular order."""
+
+    @abstractmethod
+    async def get_with_version(
+        self, hotel_id: UUID
+    ) -> tuple[dto.HotelWithID, int] | None:
+        """The hotel and the version it was read at, see get_version."""
+
+    @abstractmethod
+    async def get_version(self, hotel_id: UUID) -> int | None:
+        """The hotel's row version, which changes with every write to the hotel,
+        its room types or its reviews."""
+
+    @abstractmethod
+    async def get_page(self, hotel_id: UUID, room_limit: int, review_limit: int) -> (
+        tuple[
+            dto.HotelWithID,
+            list[dto.HotelRoomWithID],
+            list[dto.HotelReviewWithID],
+            int,
+        ]
+        | None
+    ):
+        """Fetch the hotel with its first room types, latest reviews and version
+        in one round trip."""
+
     @abstractmethod
     async def add(self, hotel: dto.Hotel) -> dto.HotelWithID: ...
 
     @abstractmethod
     async def update(self, hotel: dto.HotelWithID) -> dto.HotelWithID: ...
 
+    @abstractmethod
+    async def update_if_owned(
+        self, patch: dto.HotelPatch, owner_id: UUID
+    ) -> dto.HotelWithID:
+        """Apply the patch in one statement, raising ResourceNotFoundError or
+        NotOwnedError without a separate lookup. An empty patch writes nothing."""
+
     @abstractmethod
     async def delete(self, hotel_id: UUID) -> None: ...
 
     @abstractmethod
-    async def by_owner(self, owner_id: UUID) -> list[dto.HotelWithID]: ...
+    async def by_owner(
+        self, owner_id: UUID, limit: int, after: UUID | None = None
+    ) -> list[dto.HotelWithID]: ...
+
+    @abstractmethod
+    async def owned_ids(self, owner_id: UUID, hotel_ids: list[UUID]) -> set[UUID]: ...
+
+    @abstractmethod
+    async def add_many(self, hotels: list[dto.Hotel]) -> list[dto.HotelWithID]: ...
+
+    @abstractmethod
+    async def upsert_many(self, hotels: list[dto.HotelUpsert]) -> list[dto.HotelWithID]:
+        """Insert or update by id, skipping hotels that exist under another owner."""
+
+    async def evict(self, hotel_id: UUID) -> None:
+        """Drop any cached copy of the hotel, called once a write has committed."""
+
+    async def evict_many(self, hotel_ids: Iterable[UUID]) -> None:
+        for hotel_id in hotel_ids:
+            await self.evict(hotel_id)
+
+
+class HotelSearchDao(ABC):
+    @abstractmethod
+    async def search(
+        self,
+        query: dto.HotelSearchQuery,
+        limit: int,
+        after: tuple[float, UUID] | None = None,
+    ) -> list[dto.HotelSearchResult]:
+        """Hotels matching every filter, best score first: the text rank when the
+        query has text, the rating average otherwise."""
 
 
 class HotelRoomDao(ABC):
     @abstractmethod
     async def get(self, room_id: UUID) -> dto.HotelRoomWithID | None: ...
 
+    @abstractmethod
+    async def get_many(self, room_ids: list[UUID]) -> list[dto.HotelRoomWithID]:
+        """The room types found among the ids, in no particular order."""
+
     @abstractmethod
     async def add(self, room: dto.HotelRoom) -> dto.HotelRoomWithID: ...
 
@@ -35,7 +108,42 @@ class HotelRoomDao(ABC):
     async def delete(self, room_id: UUID) -> None: ...
 
     @abstractmethod
-    async def by_hotel(self, hotel_id: UUID) -> list[dto.HotelRoomWithID]: ...
+    async def by_hotel(
+        self, hotel_id: UUID, limit: int, after: UUID | None = None
+    ) -> list[dto.HotelRoomWithID]: ...
+
+    @abstractmethod
+    async def by_hotels(
+        self, hotel_ids: list[UUID], limit: int
+    ) -> list[dto.HotelRoomWithID]:
+        """The first `limit` room types by id of each hotel, in one round trip."""
+
+    @abstractmethod
+    async def by_price(
+        self,
+        currency_code: CurrencyCode,
+        min_price: float | None,
+        max_price: float | None,
+        limit: int,
+        after: tuple[float, UUID] | None = None,
+    ) -> list[dto.HotelRoomSearchResult]:
+        """Rooms of every hotel priced within the bounds, given in currency_code,
+        cheapest first across currencies."""
+
+    @abstractmethod
+    async def add_many(
+        self, rooms: list[dto.HotelRoom]
+    ) -> list[dto.HotelRoomWithID]: ...
+
+    @abstractmethod
+    async def upsert_many(
+        self, rooms: list[dto.HotelRoomWithID]
+    ) -> list[dto.HotelRoomWithID]:
+        """Insert or update by id, skipping rooms that exist under another hotel."""
+
+    async def evict(self, hotel_id: UUID) -> None:
+        """Drop any cached copy of the hotel's rooms, called once a write has
+        committed."""
 
 
 class HotelReviewDao(ABC):
@@ -43,7 +151,7 @@ class HotelReviewDao(ABC):
     async def get(self, review_id: UUID) -> dto.HotelReviewWithID | None: ...
 
     @abstractmethod
-    async def add(self, review: dto.HotelReview) -> dto.HotelReviewWithID: ...
+    async def add(self, review: dto.HotelReview) -> dto.HotelReviewWithID | None: ...
 
     @abstractmethod
     async def update(self, review: dto.HotelReviewWithID) -> dto.HotelReviewWithID: ...
@@ -52,16 +160,129 @@ class HotelReviewDao(ABC):
     async def delete(self, review_id: UUID) -> None: ...
 
     @abstractmethod
-    async def by_hotel(self, hotel_id: UUID) -> list[dto.HotelReviewWithID]: ...
+    async def delete_if_authored(
+        self, review_id: UUID, author_id: UUID
+    ) -> dto.HotelReviewWithID:
+        """Delete in one statement and return the review, raising
+        ResourceNotFoundError or NotOwnedError without a separate lookup."""
+
+    @abstractmethod
+    async def by_hotel(
+        self, hotel_id: UUID, limit: int, after: tuple[date, UUID] | None = None
+    ) -> list[dto.HotelReviewWithID]: ...
 
     @abstractmethod
-    async def by_author(self, author_id: UUID) -> list[dto.HotelReviewWithID]: ...
+    def stream_by_hotel(
+        self, hotel_id: UUID, chunk_size: int
+    ) -> AsyncIterator[list[dto.HotelReviewWithID]]: ...
+
+    @abstractmethod
+    async def by_author(
+        self, author_id: UUID, limit: int, after: tuple[date, UUID] | None = None
+    ) -> list[dto.HotelReviewWithID]: ...
+
+
+class HotelRatingStatsDao(ABC):
+    @abstractmethod
+    async def get(self, hotel_id: UUID, since: date) -> dto.HotelRatingStats | None:
+        """Star counts of the hotel and its reviews from `since` on, None when
+        the hotel does not exist."""
+
+    @abstractmethod
+    async def by_owner(
+        self, owner_id: UUID, since: date, limit: int, after: UUID | None = None
+    ) -> list[dto.HotelRatingStats]: ...
+
+    @abstractmethod
+    async def daily(self, hotel_id: UUID, since: date) -> list[dto.HotelReviewDay]:
+        """Days from `since` on that the hotel got reviews, in order."""
+
+
+class HotelReservationDao(ABC):
+    @abstractmethod
+    async def get(self, reservation_id: UUID) -> dto.ReservationWithID | None: ...
+
+    @abstractmethod
+    async def add(self, reservation: dto.Reservation) -> dto.ReservationWithID | None:
+        """Insert the reservation, returning None if its room number is already
+        taken for any night of the stay."""
+
+    @abstractmethod
+    async def delete_if_guest(
+        self, reservation_id: UUID, guest_id: UUID
+    ) -> dto.ReservationWithID:
+        """Delete in one statement and return the reservation, raising
+        ResourceNotFoundError or NotOwnedError without a separate lookup."""
+
+    @abstractmethod
+    async def by_hotel(
+        self, hotel_id: UUID, start: date, end: date
+    ) -> list[dto.ReservationWithID]:
+        """Reservations of the hotel with at least one night in [start, end)."""
+
+    @abstractmethod
+    async def available(
+        self, hotel_id: UUID, check_in: date, check_out: date
+    ) -> list[dto.HotelRoomAvailability]:
+        """Room numbers of each room type that are free for every night of the stay."""
+
+    @abstractmethod
+    async def available_by_hotels(
+        self, hotel_ids: list[UUID], check_in: date, check_out: date
+    ) -> dict[UUID, list[dto.HotelRoomAvailability]]:
+        """`available` for many hotels at once, leaving out hotels without rooms."""
+
+    async def available_uncached(
+        self, hotel_id: UUID, check_in: date, check_out: date
+    ) -> list[dto.HotelRoomAvailability]:
+        """`available` read from the database, past any cached occupancy."""
+        return await self.available(hotel_id, check_in, check_out)
+
+    async def occupy(self, reservation: dto.ReservationWithID) -> None:
+        """Add the reservation to any cached occupancy, called once it has
+        committed."""
+
+    async def release(self, reservation: dto.ReservationWithID) -> None:
+        """Take the reservation off any cached occupancy, called once its delete
+        has committed."""
+
+    async def evict(self, hotel_id: UUID) -> None:
+        """Drop any cached occupancy of the hotel, called once a write has committed."""
+
+
+class FxRateDao(ABC):
+    @abstractmethod
+    async def rates(self) -> dict[CurrencyCode, float]:
+        """Value of one unit of each currency in the base currency."""
+
+    @abstractmethod
+    async def set_rates(self, rates: dict[CurrencyCode, float]) -> None:
+        """Store the rates and re-normalize the room prices they apply to."""
 
 
 class UnitOfWork(ABC):
     hotel_dao: HotelDao
+    hotel_search_dao: HotelSearchDao
     hotel_room_dao: HotelRoomDao
     hotel_review_dao: HotelReviewDao
+    hotel_rating_stats_dao: HotelRatingStatsDao
+    hotel_reservation_dao: HotelReservationDao
+    fx_rate_dao: FxRateDao
+
+    # batch the single lookups of a unit of work, see Loader
+    hotels: Loader[UUID, dto.HotelWithID]
+    rooms: Loader[UUID, dto.HotelRoomWithID]
+
+    def __init__(self, read_only: bool = False, affinity: Iterable[UUID] = ()):
+        # read-only work may be served by a replica, unless one of the affinity
+        # keys (user or hotel ids) was written moments ago
+        self.read_only = read_only
+        self.affinity = set(affinity)
+        self.events: list[dto.Event] = []
+
+    def publish(self, event: dto.Event) -> None:
+        """Queue a domain event, stored by commit in the same transaction."""
+        self.events.append(event)
 
     @abstractmethod
     async def __aenter__(self) -> "UnitOfWork": ...
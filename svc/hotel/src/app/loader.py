@@ -0,0 +1,69 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, Iterable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class Loader(Generic[K, V]):
+    """Collapses the `load` calls made while the event loop turns once into one
+    `fetch_many` call, and remembers each key's result.
+
+    Made per unit of work: batches run one at a time on its session, and the
+    results live no longer than it does.
+    """
+
+    def __init__(
+        self,
+        fetch_many: Callable[[list[K]], Awaitable[list[V]]],
+        key: Callable[[V], K],
+    ):
+        self.fetch_many = fetch_many
+        self.key = key
+
+        self.__results: dict[K, asyncio.Future] = {}
+        self.__queue: list[K] = []
+        self.__lock = asyncio.Lock()
+        self.__dispatches: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V | None:
+        future = self.__results.get(key)
+
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.__results[key] = future
+            self.__queue.append(key)
+
+            if len(self.__queue) == 1:
+                task = asyncio.ensure_future(self.__dispatch())
+                self.__dispatches.add(task)
+                task.add_done_callback(self.__dispatches.discard)
+
+        return await future
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        return await asyncio.gather(*(self.load(k) for k in keys))
+
+    async def __dispatch(self) -> None:
+        # let the callers runnable by now queue their keys, gathers of gathers
+        # take a few turns to reach their loads
+        queued = -1
+        while queued < len(self.__queue):
+            queued = len(self.__queue)
+            await asyncio.sleep(0)
+
+        async with self.__lock:
+            keys, self.__queue = self.__queue, []
+            if not keys:
+                return
+
+            try:
+                found = {self.key(v): v for v in await self.fetch_many(keys)}
+            except Exception as e:
+                # forgotten, so a later load of these keys tries again
+                for k in keys:
+                    self.__results.pop(k).set_exception(e)
+                return
+
+            for k in keys:
+                self.__results[k].set_result(found.get(k))
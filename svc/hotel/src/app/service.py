@@ -1,21 +1,185 @@
+import base64
+import binascii
 import datetime
-from uuid import UUID
+import json
+import math
+from typing import Any, AsyncIterator, Callable, Container, TypeVar
+from uuid import UUID, uuid4
 from . import dto, interface as i, exception as exc
+from .enum import CurrencyCode, EventType
+from .loader import Loader
 
+T = TypeVar("T")
+R = TypeVar("R", bound=dto.HotelRoomWithID)
 
-async def get_hotel(hotel_dao: i.HotelDao, hotel_id: UUID) -> dto.HotelWithID:
-    hotel = await hotel_dao.get(hotel_id)
+MAX_PAGE_SIZE = 100
 
-    if hotel is None:
+MAX_STAY_NIGHTS = 30
+BOOKING_HORIZON_DAYS = 365
+BOOKING_ATTEMPTS = 3
+
+RECENT_REVIEW_DAYS = 30
+MAX_REVIEW_ACTIVITY_DAYS = 365
+
+
+def encode_cursor(*key: Any) -> str:
+    raw = json.dumps([str(k) for k in key]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[str], Any]) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+
+        if not isinstance(key, list) or len(key) != len(types):
+            raise ValueError(cursor)
+        if not all(isinstance(k, str) for k in key):
+            raise ValueError(cursor)
+
+        return tuple(t(k) for t, k in zip(types, key))
+    except (binascii.Error, TypeError, ValueError):
+        raise exc.InvalidCursorError(cursor)
+
+
+def make_page(items: list[T], limit: int, key: Callable[[T], tuple]) -> dto.Page[T]:
+    """Build a page from up to `limit + 1` items, the extra one marking more data."""
+    if len(items) <= limit:
+        return dto.Page(items=items, next_cursor=None)
+
+    items = items[:limit]
+    return dto.Page(items=items, next_cursor=encode_cursor(*key(items[-1])))
+
+
+def make_batch(ids: list[UUID], found: list[T | None]) -> dto.Batch[T]:
+    return dto.Batch(
+        items=[f for f in found if f is not None],
+        missing=[id for id, f in zip(ids, found) if f is None],
+    )
+
+
+def make_event(type: EventType, key: UUID, payload: dict[str, Any]) -> dto.Event:
+    return dto.Event(
+        id=uuid4(),
+        type=type,
+        key=key,
+        payload=payload,
+        created_at=datetime.datetime.now(datetime.timezone.utc),
+    )
+
+
+def hotel_event(type: EventType, hotel: dto.HotelWithID) -> dto.Event:
+    return make_event(type, hotel.id, hotel.model_dump(mode="json"))
+
+
+def _review_key(review: dto.HotelReviewWithID) -> tuple:
+    return review.date_created, review.id
+
+
+async def get_hotel_with_version(
+    hotel_dao: i.HotelDao, hotel_id: UUID
+) -> tuple[dto.HotelWithID, int]:
+    found = await hotel_dao.get_with_version(hotel_id)
+
+    if found is None:
+        raise exc.ResourceNotFoundError("hotel", hotel_id)
+
+    return found
+
+
+async def get_hotels(
+    hotels: Loader[UUID, dto.HotelWithID], hotel_ids: list[UUID]
+) -> dto.Batch[dto.HotelWithID]:
+    hotel_ids = list(dict.fromkeys(hotel_ids))
+    return make_batch(hotel_ids, await hotels.load_many(hotel_ids))
+
+
+async def get_hotel_version(hotel_dao: i.HotelDao, hotel_id: UUID) -> int:
+    version = await hotel_dao.get_version(hotel_id)
+
+    if version is None:
         raise exc.ResourceNotFoundError("hotel", hotel_id)
 
-    return hotel
+    return version
+
+
+def ensure_modified(hotel_id: UUID, version: int, known: Container[int]) -> None:
+    if version in known:
+        raise exc.NotModifiedError("hotel", hotel_id, version)
 
 
 async def get_hotels_by_owner(
-    hotel_dao: i.HotelDao, owner_id: UUID
-) -> list[dto.HotelWithID]:
-    return await hotel_dao.by_owner(owner_id=owner_id)
+    hotel_dao: i.HotelDao, owner_id: UUID, limit: int, cursor: str | None = None
+) -> dto.Page[dto.HotelWithID]:
+    limit = min(limit, MAX_PAGE_SIZE)
+    after = decode_cursor(cursor, UUID)[0] if cursor else None
+
+    hotels = await hotel_dao.by_owner(owner_id=owner_id, limit=limit + 1, after=after)
+
+    return make_page(hotels, limit, lambda h: (h.id,))
+
+
+async def get_hotel_page(
+    hotel_dao: i.HotelDao, hotel_id: UUID, room_limit: int, review_limit: int
+) -> tuple[dto.HotelPage, int]:
+    room_limit = min(room_limit, MAX_PAGE_SIZE)
+    review_limit = min(review_limit, MAX_PAGE_SIZE)
+
+    found = await hotel_dao.get_page(hotel_id, room_limit + 1, review_limit + 1)
+
+    if found is None:
+        raise exc.ResourceNotFoundError("hotel", hotel_id)
+
+    hotel, rooms, reviews, version = found
+
+    page = dto.HotelPage(
+        hotel=hotel,
+        rooms=make_page(rooms, room_limit, lambda r: (r.id,)),
+        reviews=make_page(reviews, review_limit, _review_key),
+    )
+
+    return page, version
+
+
+def check_hotel_search(query: dto.HotelSearchQuery) -> None:
+    priced = query.min_price is not None or query.max_price is not None
+
+    if priced and query.currency_code is None:
+        raise exc.InvalidSearchError("a price range needs a currency_code.")
+
+    if priced:
+        check_price_range(query.min_price, query.max_price)
+
+
+def check_price_range(min_price: float | None, max_price: float | None) -> None:
+    if (min_price or 0) > (float("inf") if max_price is None else max_price):
+        raise exc.InvalidSearchError("min_price is above max_price.")
+
+
+def finite_float(value: str) -> float:
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(value)
+
+    return number
+
+
+def decode_search_cursor(cursor: str | None) -> tuple[float, UUID] | None:
+    return decode_cursor(cursor, finite_float, UUID) if cursor else None
+
+
+async def search_hotels(
+    search_dao: i.HotelSearchDao,
+    query: dto.HotelSearchQuery,
+    limit: int,
+    after: tuple[float, UUID] | None = None,
+) -> dto.Page[dto.HotelSearchResult]:
+    """Search with input checked by check_hotel_search and decode_search_cursor,
+    which callers run before taking a connection."""
+    limit = min(limit, MAX_PAGE_SIZE)
+    hotels = await search_dao.search(query, limit=limit + 1, after=after)
+
+    return make_page(hotels, limit, lambda h: (h.score, h.id))
 
 
 async def create_hotel(hotel_dao: i.HotelDao, data: dto.HotelNew) -> dto.HotelWithID:
@@ -30,34 +194,186 @@ async def create_hotel(hotel_dao: i.HotelDao, data: dto.HotelNew) -> dto.HotelWi
     return await hotel_dao.add(hotel)
 
 
-async def update_hotel(hotel_dao: i.HotelDao, patch: dto.HotelPatch) -> dto.HotelWithID:
-    hotel = await get_hotel(hotel_dao, patch.id)
-    hotel = dto.HotelWithID.model_validate(
-        hotel.__dict__ | {k: v for k, v in patch.__dict__.items() if v is not None}
-    )
+async def create_hotels(
+    hotel_dao: i.HotelDao, data: list[dto.HotelNew]
+) -> list[dto.HotelWithID]:
+    hotels = [
+        dto.Hotel(
+            owner_id=d.owner_id,
+            name=d.name,
+            description=d.description,
+            location=d.location,
+            rating=dto.Rating(average=0, num_votes=0),
+        )
+        for d in data
+    ]
+
+    return await hotel_dao.add_many(hotels)
+
+
+async def upsert_hotels(
+    hotel_dao: i.HotelDao, data: list[dto.HotelUpsert]
+) -> list[dto.HotelWithID]:
+    return await hotel_dao.upsert_many(data)
+
+
+async def get_owned_hotel_ids(
+    hotel_dao: i.HotelDao, owner_id: UUID, hotel_ids: list[UUID]
+) -> set[UUID]:
+    return await hotel_dao.owned_ids(owner_id, list(set(hotel_ids)))
+
+
+def is_empty_patch(patch: dto.HotelPatch) -> bool:
+    return patch.name is None and patch.description is None and patch.location is None
 
-    return await hotel_dao.update(hotel)
+
+async def update_owned_hotel(
+    hotel_dao: i.HotelDao, owner_id: UUID, patch: dto.HotelPatch
+) -> dto.HotelWithID:
+    return await hotel_dao.update_if_owned(patch, owner_id)
 
 
 async def get_rooms_by_hotel(
-    hotel_dao: i.HotelRoomDao, hotel_id: UUID
+    hotel_dao: i.HotelRoomDao, hotel_id: UUID, limit: int, cursor: str | None = None
+) -> dto.Page[dto.HotelRoomWithID]:
+    limit = min(limit, MAX_PAGE_SIZE)
+    after = decode_cursor(cursor, UUID)[0] if cursor else None
+
+    rooms = await hotel_dao.by_hotel(hotel_id, limit=limit + 1, after=after)
+
+    return make_page(rooms, limit, lambda r: (r.id,))
+
+
+async def get_rooms(
+    rooms: Loader[UUID, dto.HotelRoomWithID], room_ids: list[UUID]
+) -> dto.Batch[dto.HotelRoomWithID]:
+    room_ids = list(dict.fromkeys(room_ids))
+    return make_batch(room_ids, await rooms.load_many(room_ids))
+
+
+async def get_rooms_by_hotels(
+    room_dao: i.HotelRoomDao, hotel_ids: list[UUID], limit: int
+) -> list[dto.HotelRooms]:
+    limit = min(limit, MAX_PAGE_SIZE)
+    by_hotel: dict[UUID, list[dto.HotelRoomWithID]] = {
+        h: [] for h in dict.fromkeys(hotel_ids)
+    }
+
+    for room in await room_dao.by_hotels(list(by_hotel), limit):
+        by_hotel[room.hotel_id].append(room)
+
+    return [dto.HotelRooms(hotel_id=h, rooms=r) for h, r in by_hotel.items()]
+
+
+def convert_room_prices(
+    rooms: list[R], rates: dict[CurrencyCode, float], currency_code: CurrencyCode
+) -> list[R]:
+    """Show prices in currency_code, leaving rooms in a currency without a rate."""
+    to_rate = rates.get(currency_code)
+
+    if to_rate is None:
+        raise exc.UnknownCurrencyError(currency_code.value)
+
+    converted = []
+
+    for room in rooms:
+        price = room.price_per_night
+        from_rate = rates.get(price.currency_code)
+
+        if from_rate is not None and price.currency_code != currency_code:
+            price = dto.Price(
+                currency_code=currency_code,
+                amount=round(price.amount * from_rate / to_rate, 2),
+            )
+            room = room.model_copy(update={"price_per_night": price})
+
+        converted.append(room)
+
+    return converted
+
+
+async def search_rooms(
+    room_dao: i.HotelRoomDao,
+    fx_dao: i.FxRateDao,
+    currency_code: CurrencyCode,
+    min_price: float | None,
+    max_price: float | None,
+    limit: int,
+    after: tuple[float, UUID] | None = None,
+) -> dto.Page[dto.HotelRoomSearchResult]:
+    """Search with input checked by check_price_range and decode_search_cursor,
+    which callers run before taking a connection."""
+    rates = await fx_dao.rates()
+
+    if currency_code not in rates:
+        raise exc.UnknownCurrencyError(currency_code.value)
+
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    rooms = await room_dao.by_price(
+        currency_code, min_price, max_price, limit=limit + 1, after=after
+    )
+    page = make_page(rooms, limit, lambda r: (r.base_price, r.id))
+    page.items = convert_room_prices(page.items, rates, currency_code)
+
+    return page
+
+
+async def create_rooms(
+    room_dao: i.HotelRoomDao, data: list[dto.HotelRoomNew]
+) -> list[dto.HotelRoomWithID]:
+    rooms = [dto.HotelRoom(**d.model_dump()) for d in data]
+
+    return await room_dao.add_many(rooms)
+
+
+async def upsert_rooms(
+    room_dao: i.HotelRoomDao, data: list[dto.HotelRoomWithID]
 ) -> list[dto.HotelRoomWithID]:
-    return await hotel_dao.by_hotel(hotel_id)
+    return await room_dao.upsert_many(data)
+
+
+def bulk_result(items: list[T], errors: dict[int, str]) -> dto.BulkResult[T]:
+    return dto.BulkResult(
+        items=items,
+        errors=[
+            dto.BulkItemError(index=n, detail=d) for n, d in sorted(errors.items())
+        ],
+    )
+
+
+def duplicate_id_errors(items: list[Any]) -> dict[int, str]:
+    seen, errors = set(), {}
+
+    for n, item in enumerate(items):
+        if item.id in seen:
+            errors[n] = f"duplicate id {item.id} in batch."
+        seen.add(item.id)
+
+    return errors
 
 
 async def get_reviews_by_hotel(
-    hotel_dao: i.HotelReviewDao, hotel_id: UUID
-) -> list[dto.HotelReviewWithID]:
-    return await hotel_dao.by_hotel(hotel_id)
+    hotel_dao: i.HotelReviewDao, hotel_id: UUID, limit: int, cursor: str | None = None
+) -> dto.Page[dto.HotelReviewWithID]:
+    limit = min(limit, MAX_PAGE_SIZE)
+    after = decode_cursor(cursor, datetime.date.fromisoformat, UUID) if cursor else None
+
+    reviews = await hotel_dao.by_hotel(hotel_id, limit=limit + 1, after=after)
+
+    return make_page(reviews, limit, _review_key)
+
+
+def stream_reviews_by_hotel(
+    review_dao: i.HotelReviewDao, hotel_id: UUID, chunk_size: int = 1000
+) -> AsyncIterator[list[dto.HotelReviewWithID]]:
+    return review_dao.stream_by_hotel(hotel_id, chunk_size)
 
 
 async def create_hotel_review(
-    hotel_dao: i.HotelDao,
     review_dao: i.HotelReviewDao,
     data: dto.HotelReviewNew,
 ) -> dto.HotelReviewWithID:
-    hotel = await get_hotel(hotel_dao, data.hotel_id)
-
     review = dto.HotelReview(
         author_id=data.author_id,
         hotel_id=data.hotel_id,
@@ -66,16 +382,65 @@ async def create_hotel_review(
         date_created=datetime.date.today(),
     )
 
-    review = await review_dao.add(review)
+    created = await review_dao.add(review)
 
-    rating_sum = hotel.rating.average * hotel.rating.num_votes + review.rating
-    hotel.rating.average = rating_sum / (hotel.rating.num_votes + 1)
+    if created is None:
+        raise exc.ResourceNotFoundError("hotel", data.hotel_id)
 
-    hotel.rating.num_votes += 1
+    return created
 
-    await hotel_dao.update(hotel)
 
-    return review
+def days_back(days: int) -> datetime.date:
+    """First day of the `days` long window ending today."""
+    return datetime.date.today() - datetime.timedelta(days=days - 1)
+
+
+async def get_rating_stats(
+    stats_dao: i.HotelRatingStatsDao, hotel_id: UUID
+) -> dto.HotelRatingStats:
+    stats = await stats_dao.get(hotel_id, days_back(RECENT_REVIEW_DAYS))
+
+    if stats is None:
+        raise exc.ResourceNotFoundError("hotel", hotel_id)
+
+    return stats
+
+
+async def get_rating_stats_by_owner(
+    stats_dao: i.HotelRatingStatsDao,
+    owner_id: UUID,
+    limit: int,
+    cursor: str | None = None,
+) -> dto.Page[dto.HotelRatingStats]:
+    limit = min(limit, MAX_PAGE_SIZE)
+    after = decode_cursor(cursor, UUID)[0] if cursor else None
+
+    stats = await stats_dao.by_owner(
+        owner_id, days_back(RECENT_REVIEW_DAYS), limit=limit + 1, after=after
+    )
+
+    return make_page(stats, limit, lambda s: (s.hotel_id,))
+
+
+async def get_owned_review_activity(
+    hotel_dao: i.HotelDao,
+    stats_dao: i.HotelRatingStatsDao,
+    owner_id: UUID,
+    hotel_id: UUID,
+    days: int,
+) -> list[dto.HotelReviewDay]:
+    if not await hotel_dao.owned_ids(owner_id, [hotel_id]):
+        raise exc.NotOwnedError("hotel", owner_id)
+
+    since = days_back(min(days, MAX_REVIEW_ACTIVITY_DAYS))
+    found = {d.day: d for d in await stats_dao.daily(hotel_id, since)}
+
+    # one entry per day, so charts need not fill the quiet ones
+    days_since = (datetime.date.today() - since).days + 1
+    return [
+        found.get(day) or dto.HotelReviewDay(day=day, num_reviews=0, average=0)
+        for day in (since + datetime.timedelta(days=n) for n in range(days_since))
+    ]
 
 
 async def get_hotel_review(
@@ -89,5 +454,114 @@ async def get_hotel_review(
     return review
 
 
-async def delete_hotel_review(review_dao: i.HotelReviewDao, review_id: UUID) -> None:
-    await review_dao.delete(review_id)
+async def delete_authored_review(
+    review_dao: i.HotelReviewDao, author_id: UUID, review_id: UUID
+) -> dto.HotelReviewWithID:
+    return await review_dao.delete_if_authored(review_id, author_id)
+
+
+def check_stay(check_in: datetime.date, check_out: datetime.date) -> None:
+    today = datetime.date.today()
+    last_check_out = today + datetime.timedelta(days=BOOKING_HORIZON_DAYS)
+
+    if not today <= check_in < check_out <= last_check_out:
+        raise exc.InvalidStayError(check_in, check_out)
+
+    if (check_out - check_in).days > MAX_STAY_NIGHTS:
+        raise exc.InvalidStayError(check_in, check_out)
+
+
+async def get_hotel_availability(
+    reservation_dao: i.HotelReservationDao,
+    hotel_id: UUID,
+    check_in: datetime.date,
+    check_out: datetime.date,
+) -> dto.HotelAvailability:
+    check_stay(check_in, check_out)
+
+    rooms = await reservation_dao.available(hotel_id, check_in, check_out)
+
+    return dto.HotelAvailability(
+        hotel_id=hotel_id,
+        check_in=check_in,
+        check_out=check_out,
+        rooms=[r for r in rooms if r.numbers],
+    )
+
+
+async def search_availability(
+    reservation_dao: i.HotelReservationDao,
+    hotel_ids: list[UUID],
+    check_in: datetime.date,
+    check_out: datetime.date,
+) -> list[dto.HotelAvailability]:
+    check_stay(check_in, check_out)
+
+    hotel_ids = list(dict.fromkeys(hotel_ids))
+    by_hotel = await reservation_dao.available_by_hotels(hotel_ids, check_in, check_out)
+    found = []
+
+    for hotel_id in hotel_ids:
+        rooms = [r for r in by_hotel.get(hotel_id, []) if r.numbers]
+        if rooms:
+            found.append(
+                dto.HotelAvailability(
+                    hotel_id=hotel_id,
+                    check_in=check_in,
+                    check_out=check_out,
+                    rooms=rooms,
+                )
+            )
+
+    return found
+
+
+async def create_reservation(
+    room_dao: i.HotelRoomDao,
+    reservation_dao: i.HotelReservationDao,
+    data: dto.ReservationNew,
+) -> dto.ReservationWithID:
+    check_stay(data.check_in, data.check_out)
+
+    room = await room_dao.get(data.room_id)
+
+    if room is None:
+        raise exc.ResourceNotFoundError("room", data.room_id)
+
+    # availability may be a moment stale; a number taken meanwhile is rejected by
+    # the database and the next attempt sees fresh occupancy
+    for _ in range(BOOKING_ATTEMPTS):
+        # cached occupancy may miss a cancellation made by another process
+        for available in (
+            reservation_dao.available,
+            reservation_dao.available_uncached,
+        ):
+            rooms = await available(room.hotel_id, data.check_in, data.check_out)
+            free = next((r.numbers for r in rooms if r.room_id == room.id), [])
+
+            if free:
+                break
+        else:
+            break
+
+        created = await reservation_dao.add(
+            dto.Reservation(
+                guest_id=data.guest_id,
+                hotel_id=room.hotel_id,
+                room_id=room.id,
+                number=free[0],
+                check_in=data.check_in,
+                check_out=data.check_out,
+            )
+        )
+
+        if created is not None:
+            return created
+
+    raise exc.NotAvailableError(room.id)
+
+
+async def cancel_guest_reservation(
+    reservation_dao: i.HotelReservationDao, guest_id: UUID, reservation_id: UUID
+) -> dto.ReservationWithID:
+    return await reservation_dao.delete_if_guest(reservation_id, guest_id)
@@ -1,5 +1,13 @@
+import asyncio
+from datetime import date
+from typing import AsyncIterator, Awaitable, Callable, Container, Hashable, TypeVar
 from uuid import UUID
 from . import dto, interface as i, service as svc, exception as exc
+from .enum import CurrencyCode, EventType
+
+T = TypeVar("T")
+
+MAX_INFLIGHT_READS = 1000
 
 
 class UowUseCase:
@@ -7,25 +15,290 @@ class UowUseCase:
         self.get_uow = get_uow
 
 
+class SingleFlight:
+    """Concurrent identical reads share one call and its result or exception.
+
+    Calls are grouped by hotel so a committed write can `forget` its hotel: a
+    read arriving after the commit starts afresh instead of joining one that
+    began before it. That only covers writes of this process, and only once they
+    call `forget`. A read whose result is tagged with a hotel version must
+    therefore return that version itself, or have it in its key. Beyond
+    `max_inflight` calls, reads run uncoalesced.
+    """
+
+    def __init__(self, max_inflight: int):
+        self.max_inflight = max_inflight
+        self.inflight = 0
+        self.led = 0
+        self.joined = 0
+        self.bypassed = 0
+
+        self.__calls: dict[UUID, dict[Hashable, asyncio.Task]] = {}
+
+    async def do(
+        self, group: UUID, key: Hashable, call: Callable[[], Awaitable[T]]
+    ) -> T:
+        task = self.__calls.get(group, {}).get(key)
+
+        if task is not None:
+            self.joined += 1
+        elif self.inflight >= self.max_inflight:
+            self.bypassed += 1
+            return await call()
+        else:
+            self.led += 1
+            self.inflight += 1
+            # a task of its own, so the callers going away does not cancel it
+            task = asyncio.ensure_future(call())
+            self.__calls.setdefault(group, {})[key] = task
+            task.add_done_callback(lambda t: self.__done(group, key, t))
+
+        return await asyncio.shield(task)
+
+    def forget(self, group: UUID) -> None:
+        self.inflight -= len(self.__calls.pop(group, {}))
+
+    def __done(self, group: UUID, key: Hashable, task: asyncio.Task) -> None:
+        calls = self.__calls.get(group)
+
+        if calls is not None and calls.get(key) is task:
+            del calls[key]
+            self.inflight -= 1
+            if not calls:
+                del self.__calls[group]
+
+        # every caller may have gone away before it finished
+        if not task.cancelled():
+            task.exception()
+
+
+reads = SingleFlight(MAX_INFLIGHT_READS)
+
+
 # common
 
 
 class GetHotelUseCase(UowUseCase):
-    async def execute(self, hotel_id: UUID) -> dto.HotelWithID:
-        async with self.get_uow() as uow:
-            return await svc.get_hotel(uow.hotel_dao, hotel_id)
+    async def execute(
+        self, hotel_id: UUID, known: Container[int] = ()
+    ) -> tuple[dto.HotelWithID, int]:
+        # the version comes with the hotel, so whoever joins the read gets a
+        # version that matches the body
+        hotel, version = await reads.do(
+            hotel_id, ("hotel",), lambda: self.__get(hotel_id)
+        )
+        svc.ensure_modified(hotel_id, version, known)
+
+        return hotel, version
+
+    async def __get(self, hotel_id: UUID) -> tuple[dto.HotelWithID, int]:
+        async with self.get_uow(read_only=True, affinity=(hotel_id,)) as uow:
+            return await svc.get_hotel_with_version(uow.hotel_dao, hotel_id)
+
+
+class GetHotelVersionUseCase(UowUseCase):
+    async def execute(self, hotel_id: UUID, known: Container[int] = ()) -> int:
+        version = await reads.do(hotel_id, ("version",), lambda: self.__get(hotel_id))
+        svc.ensure_modified(hotel_id, version, known)
+
+        return version
+
+    async def __get(self, hotel_id: UUID) -> int:
+        async with self.get_uow(read_only=True, affinity=(hotel_id,)) as uow:
+            return await svc.get_hotel_version(uow.hotel_dao, hotel_id)
+
+
+class GetHotelsUseCase(UowUseCase):
+    async def execute(self, hotel_ids: list[UUID]) -> dto.Batch[dto.HotelWithID]:
+        async with self.get_uow(read_only=True, affinity=hotel_ids) as uow:
+            return await svc.get_hotels(uow.hotels, hotel_ids)
+
+
+class GetHotelPageUseCase(UowUseCase):
+    async def execute(
+        self,
+        hotel_id: UUID,
+        room_limit: int,
+        review_limit: int,
+        currency_code: CurrencyCode | None = None,
+        known: Container[int] = (),
+    ) -> tuple[dto.HotelPage, int]:
+        page, version = await reads.do(
+            hotel_id,
+            ("page", room_limit, review_limit, currency_code),
+            lambda: self.__get(hotel_id, room_limit, review_limit, currency_code),
+        )
+        svc.ensure_modified(hotel_id, version, known)
+
+        return page, version
+
+    async def __get(
+        self,
+        hotel_id: UUID,
+        room_limit: int,
+        review_limit: int,
+        currency_code: CurrencyCode | None,
+    ) -> tuple[dto.HotelPage, int]:
+        async with self.get_uow(read_only=True, affinity=(hotel_id,)) as uow:
+            page, version = await svc.get_hotel_page(
+                uow.hotel_dao, hotel_id, room_limit, review_limit
+            )
+
+            if currency_code is not None:
+                page.rooms.items = svc.convert_room_prices(
+                    page.rooms.items, await uow.fx_rate_dao.rates(), currency_code
+                )
+
+            return page, version
+
+
+class SearchHotelsUseCase(UowUseCase):
+    async def execute(
+        self, query: dto.HotelSearchQuery, limit: int, cursor: str | None = None
+    ) -> dto.Page[dto.HotelSearchResult]:
+        # bad input is turned away before a connection is taken
+        svc.check_hotel_search(query)
+        after = svc.decode_search_cursor(cursor)
+
+        async with self.get_uow(read_only=True) as uow:
+            return await svc.search_hotels(uow.hotel_search_dao, query, limit, after)
 
 
 class ListHotelRoomsUseCase(UowUseCase):
-    async def execute(self, hotel_id: UUID) -> list[dto.HotelRoomWithID]:
-        async with self.get_uow() as uow:
-            return await svc.get_rooms_by_hotel(uow.hotel_room_dao, hotel_id)
+    async def execute(
+        self,
+        hotel_id: UUID,
+        limit: int,
+        cursor: str | None = None,
+        currency_code: CurrencyCode | None = None,
+        version: int | None = None,
+    ) -> dto.Page[dto.HotelRoomWithID]:
+        # keyed by the version the response is tagged with, so the body comes
+        # from a read that started after that version was read
+        return await reads.do(
+            hotel_id,
+            ("rooms", version, limit, cursor, currency_code),
+            lambda: self.__get(hotel_id, limit, cursor, currency_code),
+        )
+
+    async def __get(
+        self,
+        hotel_id: UUID,
+        limit: int,
+        cursor: str | None,
+        currency_code: CurrencyCode | None,
+    ) -> dto.Page[dto.HotelRoomWithID]:
+        async with self.get_uow(read_only=True, affinity=(hotel_id,)) as uow:
+            page = await svc.get_rooms_by_hotel(
+                uow.hotel_room_dao, hotel_id, limit, cursor
+            )
+
+            if currency_code is not None:
+                page.items = svc.convert_room_prices(
+                    page.items, await uow.fx_rate_dao.rates(), currency_code
+                )
+
+            return page
+
+
+class GetRoomsUseCase(UowUseCase):
+    async def execute(self, room_ids: list[UUID]) -> dto.Batch[dto.HotelRoomWithID]:
+        async with self.get_uow(read_only=True) as uow:
+            return await svc.get_rooms(uow.rooms, room_ids)
+
+
+class ListRoomsOfHotelsUseCase(UowUseCase):
+    async def execute(self, hotel_ids: list[UUID], limit: int) -> list[dto.HotelRooms]:
+        async with self.get_uow(read_only=True, affinity=hotel_ids) as uow:
+            return await svc.get_rooms_by_hotels(uow.hotel_room_dao, hotel_ids, limit)
+
+
+class SearchRoomsUseCase(UowUseCase):
+    async def execute(
+        self,
+        currency_code: CurrencyCode,
+        min_price: float | None,
+        max_price: float | None,
+        limit: int,
+        cursor: str | None = None,
+    ) -> dto.Page[dto.HotelRoomSearchResult]:
+        svc.check_price_range(min_price, max_price)
+        after = svc.decode_search_cursor(cursor)
+
+        async with self.get_uow(read_only=True) as uow:
+            return await svc.search_rooms(
+                uow.hotel_room_dao,
+                uow.fx_rate_dao,
+                currency_code,
+                min_price,
+                max_price,
+                limit,
+                after,
+            )
 
 
 class ListHotelReviewsUseCase(UowUseCase):
-    async def execute(self, hotel_id: UUID) -> list[dto.HotelReviewWithID]:
-        async with self.get_uow() as uow:
-            return await svc.get_reviews_by_hotel(uow.hotel_review_dao, hotel_id)
+    async def execute(
+        self,
+        hotel_id: UUID,
+        limit: int,
+        cursor: str | None = None,
+        version: int | None = None,
+    ) -> dto.Page[dto.HotelReviewWithID]:
+        # see ListHotelRoomsUseCase
+        return await reads.do(
+            hotel_id,
+            ("reviews", version, limit, cursor),
+            lambda: self.__get(hotel_id, limit, cursor),
+        )
+
+    async def __get(
+        self, hotel_id: UUID, limit: int, cursor: str | None
+    ) -> dto.Page[dto.HotelReviewWithID]:
+        async with self.get_uow(read_only=True, affinity=(hotel_id,)) as uow:
+            return await svc.get_reviews_by_hotel(
+                uow.hotel_review_dao, hotel_id, limit, cursor
+            )
+
+
+class GetHotelRatingStatsUseCase(UowUseCase):
+    async def execute(self, hotel_id: UUID) -> dto.HotelRatingStats:
+        return await reads.do(hotel_id, ("rating-stats",), lambda: self.__get(hotel_id))
+
+    async def __get(self, hotel_id: UUID) -> dto.HotelRatingStats:
+        async with self.get_uow(read_only=True, affinity=(hotel_id,)) as uow:
+            return await svc.get_rating_stats(uow.hotel_rating_stats_dao, hotel_id)
+
+
+class StreamHotelReviewsUseCase(UowUseCase):
+    async def execute(
+        self, hotel_id: UUID
+    ) -> AsyncIterator[list[dto.HotelReviewWithID]]:
+        async with self.get_uow(read_only=True, affinity=(hotel_id,)) as uow:
+            async for chunk in svc.stream_reviews_by_hotel(
+                uow.hotel_review_dao, hotel_id
+            ):
+                yield chunk
+
+
+class GetHotelAvailabilityUseCase(UowUseCase):
+    async def execute(
+        self, hotel_id: UUID, check_in: date, check_out: date
+    ) -> dto.HotelAvailability:
+        async with self.get_uow(read_only=True, affinity=(hotel_id,)) as uow:
+            return await svc.get_hotel_availability(
+                uow.hotel_reservation_dao, hotel_id, check_in, check_out
+            )
+
+
+class SearchAvailabilityUseCase(UowUseCase):
+    async def execute(
+        self, hotel_ids: list[UUID], check_in: date, check_out: date
+    ) -> list[dto.HotelAvailability]:
+        async with self.get_uow(read_only=True, affinity=hotel_ids) as uow:
+            return await svc.search_availability(
+                uow.hotel_reservation_dao, hotel_ids, check_in, check_out
+            )
 
 
 # hotelier
@@ -33,30 +306,182 @@ class ListHotelReviewsUseCase(UowUseCase):
 
 class HotelierCreateHotelUseCase(UowUseCase):
     async def execute(self, hotelier_id: UUID, hotel: dto.HotelNew) -> dto.HotelWithID:
-        async with self.get_uow() as uow:
-            if not hotel.owner_id == hotelier_id:
-                raise exc.NotOwnedError("hotel", hotelier_id)
+        if not hotel.owner_id == hotelier_id:
+            raise exc.NotOwnedError("hotel", hotelier_id)
+
+        async with self.get_uow(affinity=(hotelier_id,)) as uow:
+            created = await svc.create_hotel(uow.hotel_dao, hotel)
+            uow.affinity.add(created.id)
+            uow.publish(svc.hotel_event(EventType.HOTEL_CREATED, created))
 
-            return await svc.create_hotel(uow.hotel_dao, hotel)
+        await uow.hotel_dao.evict(created.id)
+        reads.forget(created.id)
+
+        return created
 
 
 class HotelierUpdateHotelUseCase(UowUseCase):
     async def execute(
         self, hotelier_id: UUID, patch: dto.HotelPatch
     ) -> dto.HotelWithID:
-        async with self.get_uow() as uow:
-            hotel = await svc.get_hotel(uow.hotel_dao, patch.id)
+        async with self.get_uow(affinity=(hotelier_id, patch.id)) as uow:
+            hotel = await svc.update_owned_hotel(uow.hotel_dao, hotelier_id, patch)
+            if svc.is_empty_patch(patch):
+                return hotel
+
+            uow.publish(svc.hotel_event(EventType.HOTEL_UPDATED, hotel))
+
+        await uow.hotel_dao.evict(hotel.id)
+        reads.forget(hotel.id)
+
+        return hotel
+
+
+class HotelierBulkCreateHotelsUseCase(UowUseCase):
+    async def execute(
+        self, hotelier_id: UUID, hotels: list[dto.HotelNew]
+    ) -> dto.BulkResult[dto.HotelWithID]:
+        errors = {
+            n: str(exc.NotOwnedError("hotel", hotelier_id))
+            for n, h in enumerate(hotels)
+            if h.owner_id != hotelier_id
+        }
+        valid = [h for n, h in enumerate(hotels) if n not in errors]
+
+        async with self.get_uow(affinity=(hotelier_id,)) as uow:
+            created = await svc.create_hotels(uow.hotel_dao, valid)
+            uow.affinity.update(h.id for h in created)
+            for h in created:
+                uow.publish(svc.hotel_event(EventType.HOTEL_CREATED, h))
+
+        await uow.hotel_dao.evict_many(h.id for h in created)
+        for h in created:
+            reads.forget(h.id)
+
+        return svc.bulk_result(created, errors)
+
+
+class HotelierBulkUpsertHotelsUseCase(UowUseCase):
+    async def execute(
+        self, hotelier_id: UUID, hotels: list[dto.HotelUpsert]
+    ) -> dto.BulkResult[dto.HotelWithID]:
+        errors = svc.duplicate_id_errors(hotels)
+        for n, h in enumerate(hotels):
+            if h.owner_id != hotelier_id:
+                errors.setdefault(n, str(exc.NotOwnedError("hotel", hotelier_id)))
+        valid = [h for n, h in enumerate(hotels) if n not in errors]
+
+        async with self.get_uow(affinity=(hotelier_id,)) as uow:
+            saved = await svc.upsert_hotels(uow.hotel_dao, valid)
+            uow.affinity.update(h.id for h in saved)
+            # an upsert does not tell inserts from updates, both carry the full hotel
+            for h in saved:
+                uow.publish(svc.hotel_event(EventType.HOTEL_UPDATED, h))
+
+        # hotels left out by the upsert already exist under another owner
+        saved_ids = {h.id for h in saved}
+        for n, h in enumerate(hotels):
+            if n not in errors and h.id not in saved_ids:
+                errors[n] = str(exc.NotOwnedError("hotel", hotelier_id))
+
+        await uow.hotel_dao.evict_many(h.id for h in saved)
+        for h in saved:
+            reads.forget(h.id)
+
+        return svc.bulk_result(saved, errors)
+
+
+class HotelierBulkCreateRoomsUseCase(UowUseCase):
+    async def execute(
+        self, hotelier_id: UUID, rooms: list[dto.HotelRoomNew]
+    ) -> dto.BulkResult[dto.HotelRoomWithID]:
+        hotel_ids = [r.hotel_id for r in rooms]
+
+        async with self.get_uow(affinity=(hotelier_id, *hotel_ids)) as uow:
+            owned = await svc.get_owned_hotel_ids(uow.hotel_dao, hotelier_id, hotel_ids)
+
+            errors = {
+                n: str(exc.NotOwnedError("hotel", hotelier_id))
+                for n, r in enumerate(rooms)
+                if r.hotel_id not in owned
+            }
+            valid = [r for n, r in enumerate(rooms) if n not in errors]
+
+            created = await svc.create_rooms(uow.hotel_room_dao, valid)
+
+        # room writes bump their hotel's version too
+        for hotel_id in {r.hotel_id for r in created}:
+            await uow.hotel_dao.evict(hotel_id)
+            await uow.hotel_room_dao.evict(hotel_id)
+            await uow.hotel_reservation_dao.evict(hotel_id)
+            reads.forget(hotel_id)
+
+        return svc.bulk_result(created, errors)
 
-            if hotel.owner_id != hotelier_id:
-                raise exc.NotOwnedError("hotel", hotelier_id)
 
-            return await svc.update_hotel(uow.hotel_dao, patch)
+class HotelierBulkUpsertRoomsUseCase(UowUseCase):
+    async def execute(
+        self, hotelier_id: UUID, rooms: list[dto.HotelRoomWithID]
+    ) -> dto.BulkResult[dto.HotelRoomWithID]:
+        hotel_ids = [r.hotel_id for r in rooms]
+
+        async with self.get_uow(affinity=(hotelier_id, *hotel_ids)) as uow:
+            owned = await svc.get_owned_hotel_ids(uow.hotel_dao, hotelier_id, hotel_ids)
+
+            errors = svc.duplicate_id_errors(rooms)
+            for n, r in enumerate(rooms):
+                if r.hotel_id not in owned:
+                    errors.setdefault(n, str(exc.NotOwnedError("hotel", hotelier_id)))
+            valid = [r for n, r in enumerate(rooms) if n not in errors]
+
+            saved = await svc.upsert_rooms(uow.hotel_room_dao, valid)
+
+        # rooms left out by the upsert already exist under another hotel
+        saved_ids = {r.id for r in saved}
+        for n, r in enumerate(rooms):
+            if n not in errors and r.id not in saved_ids:
+                errors[n] = str(exc.NotOwnedError("room", hotelier_id))
+
+        # room writes bump their hotel's version too
+        for hotel_id in {r.hotel_id for r in saved}:
+            await uow.hotel_dao.evict(hotel_id)
+            await uow.hotel_room_dao.evict(hotel_id)
+            await uow.hotel_reservation_dao.evict(hotel_id)
+            reads.forget(hotel_id)
+
+        return svc.bulk_result(saved, errors)
 
 
 class HotelierListOwnedHotelsUseCase(UowUseCase):
-    async def execute(self, hotelier_id: UUID) -> list[dto.HotelWithID]:
-        async with self.get_uow() as uow:
-            return await svc.get_hotels_by_owner(uow.hotel_dao, hotelier_id)
+    async def execute(
+        self, hotelier_id: UUID, limit: int, cursor: str | None = None
+    ) -> dto.Page[dto.HotelWithID]:
+        async with self.get_uow(read_only=True, affinity=(hotelier_id,)) as uow:
+            return await svc.get_hotels_by_owner(
+                uow.hotel_dao, hotelier_id, limit, cursor
+            )
+
+
+class HotelierListRatingStatsUseCase(UowUseCase):
+    async def execute(
+        self, hotelier_id: UUID, limit: int, cursor: str | None = None
+    ) -> dto.Page[dto.HotelRatingStats]:
+        async with self.get_uow(read_only=True, affinity=(hotelier_id,)) as uow:
+            return await svc.get_rating_stats_by_owner(
+                uow.hotel_rating_stats_dao, hotelier_id, limit, cursor
+            )
+
+
+class HotelierGetReviewActivityUseCase(UowUseCase):
+    async def execute(
+        self, hotelier_id: UUID, hotel_id: UUID, days: int
+    ) -> list[dto.HotelReviewDay]:
+        async with self.get_uow(
+            read_only=True, affinity=(hotelier_id, hotel_id)
+        ) as uow:
+            return await svc.get_owned_review_activity(
+                uow.hotel_dao, uow.hotel_rating_stats_dao, hotelier_id, hotel_id, days
+            )
 
 
 # user
@@ -66,21 +491,68 @@ class UserCreateReviewUseCase(UowUseCase):
     async def execute(
         self, user_id: UUID, review: dto.HotelReviewNew
     ) -> dto.HotelReviewWithID:
-        async with self.get_uow() as uow:
-            if not review.author_id == user_id:
-                raise exc.NotOwnedError("review", user_id)
+        if not review.author_id == user_id:
+            raise exc.NotOwnedError("review", user_id)
 
-            return await svc.create_hotel_review(
-                uow.hotel_dao, uow.hotel_review_dao, review
+        async with self.get_uow(affinity=(user_id, review.hotel_id)) as uow:
+            created = await svc.create_hotel_review(uow.hotel_review_dao, review)
+            uow.publish(
+                svc.make_event(
+                    EventType.REVIEW_CREATED,
+                    created.hotel_id,
+                    created.model_dump(mode="json"),
+                )
             )
 
+        await uow.hotel_dao.evict(created.hotel_id)
+        reads.forget(created.hotel_id)
+
+        return created
+
 
 class UserDeleteReviewUseCase(UowUseCase):
     async def execute(self, user_id: UUID, review_id: UUID) -> None:
-        async with self.get_uow() as uow:
-            review = await svc.get_hotel_review(uow.hotel_review_dao, review_id)
+        async with self.get_uow(affinity=(user_id,)) as uow:
+            removed = await svc.delete_authored_review(
+                uow.hotel_review_dao, user_id, review_id
+            )
+            uow.affinity.add(removed.hotel_id)
+            uow.publish(
+                svc.make_event(
+                    EventType.REVIEW_DELETED,
+                    removed.hotel_id,
+                    removed.model_dump(mode="json"),
+                )
+            )
+
+        await uow.hotel_dao.evict(removed.hotel_id)
+        reads.forget(removed.hotel_id)
 
-            if review.author_id != user_id:
-                raise exc.NotOwnedError("review", user_id)
 
-            await svc.delete_hotel_review(uow.hotel_review_dao, review.id)
+class UserCreateReservationUseCase(UowUseCase):
+    async def execute(
+        self, user_id: UUID, reservation: dto.ReservationNew
+    ) -> dto.ReservationWithID:
+        if not reservation.guest_id == user_id:
+            raise exc.NotOwnedError("reservation", user_id)
+
+        async with self.get_uow(affinity=(user_id,)) as uow:
+            created = await svc.create_reservation(
+                uow.hotel_room_dao, uow.hotel_reservation_dao, reservation
+            )
+            uow.affinity.add(created.hotel_id)
+
+        await uow.hotel_reservation_dao.occupy(created)
+
+        return created
+
+
+class UserCancelReservationUseCase(UowUseCase):
+    async def execute(self, user_id: UUID, reservation_id: UUID) -> None:
+        async with self.get_uow(affinity=(user_id,)) as uow:
+            removed = await svc.cancel_guest_reservation(
+                uow.hotel_reservation_dao, user_id, reservation_id
+            )
+            uow.affinity.add(removed.hotel_id)
+
+        await uow.hotel_reservation_dao.release(removed)
@@ -0,0 +1,357 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from uuid import UUID
+
+import src.app.dto as dto
+import src.app.interface as i
+
+# what a reload read per hotel, None once the hotel is gone
+Loaded = dict[UUID, tuple[dto.HotelWithID, int | None] | None]
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+
+class LocalCacheBackend(CacheBackend):
+    """In-process stand-in for a shared backend such as redis."""
+
+    def __init__(self):
+        self.__data: dict[str, tuple[float, bytes]] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        item = self.__data.get(key)
+
+        if item is None:
+            return None
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self.__data[key]
+            return None
+
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.__data[key] = (time.monotonic() + ttl, value)
+
+    async def delete(self, key: str) -> None:
+        self.__data.pop(key, None)
+
+
+class HotelCache:
+    """LRU+TTL cache of hotels.
+
+    Entries are fresh for `ttl` seconds. An expired entry is reloaded once per
+    hotel, on the session of the reader that found it expired, which waits it
+    out; readers arriving meanwhile wait up to `refresh_timeout`. Only when the
+    reload fails, or runs late for them, do readers get the expired entry, for
+    at most `stale_ttl` seconds past its expiry. Each entry keeps the version the
+    hotel was read at, in the same statement, or None when read without one;
+    while fresh, the entry answers for both.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        stale_ttl: float,
+        refresh_timeout: float,
+        backend: CacheBackend | None = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.refresh_timeout = refresh_timeout
+        self.backend = backend
+
+        self.__entries: OrderedDict[UUID, tuple[float, dto.HotelWithID, int | None]] = (
+            OrderedDict()
+        )
+        self.__refreshing: dict[UUID, asyncio.Task[Loaded]] = {}
+
+    @staticmethod
+    def __key(hotel_id: UUID) -> str:
+        return f"hotel:{hotel_id}"
+
+    @staticmethod
+    def __encode(hotel: dto.HotelWithID, version: int | None) -> bytes:
+        head = b"" if version is None else str(version).encode()
+        return head + b"\n" + hotel.model_dump_json().encode()
+
+    @staticmethod
+    def __decode(raw: bytes) -> tuple[dto.HotelWithID, int | None]:
+        head, _, hotel = raw.partition(b"\n")
+        return dto.HotelWithID.model_validate_json(hotel), int(head) if head else None
+
+    async def get(
+        self, hotel_id: UUID
+    ) -> tuple[dto.HotelWithID, int | None, bool] | None:
+        """Return the cached hotel, its version and whether it is still fresh."""
+        entry = self.__entries.get(hotel_id)
+        now = time.monotonic()
+
+        if entry is not None and entry[0] > now:
+            self.__entries.move_to_end(hotel_id)
+            return entry[1], entry[2], True
+
+        if self.backend is not None:
+            raw = await self.backend.get(self.__key(hotel_id))
+            if raw is not None:
+                hotel, version = self.__decode(raw)
+                self.__put(hotel, version)
+                return hotel, version, True
+
+        if entry is None:
+            return None
+
+        if entry[0] + self.stale_ttl < now:
+            del self.__entries[hotel_id]
+            return None
+
+        return entry[1], entry[2], False
+
+    async def set(self, hotel: dto.HotelWithID, version: int | None = None) -> None:
+        self.__put(hotel, version)
+
+        if self.backend is not None:
+            await self.backend.set(
+                self.__key(hotel.id), self.__encode(hotel, version), self.ttl
+            )
+
+    async def evict(self, hotel_id: UUID) -> None:
+        self.__entries.pop(hotel_id, None)
+
+        if self.backend is not None:
+            await self.backend.delete(self.__key(hotel_id))
+
+    async def refresh(
+        self,
+        hotel_id: UUID,
+        load: Callable[[UUID], Awaitable[tuple[dto.HotelWithID, int] | None]],
+    ) -> tuple[dto.HotelWithID, int | None] | None:
+        """Reload an expired entry and return it, None once the hotel is gone.
+
+        `load` runs on the caller's session. Raises when the reload fails, or
+        when it was started by another reader and outlasts `refresh_timeout`.
+        """
+
+        async def run(_: list[UUID]) -> Loaded:
+            loaded = await load(hotel_id)
+
+            if loaded is None:
+                await self.evict(hotel_id)
+            else:
+                await self.set(*loaded)
+
+            return {hotel_id: loaded}
+
+        return (await self.__wait([hotel_id], run))[hotel_id]
+
+    async def refresh_many(
+        self,
+        hotel_ids: list[UUID],
+        load: Callable[[list[UUID]], Awaitable[list[dto.HotelWithID]]],
+    ) -> dict[UUID, dto.HotelWithID | None]:
+        """Reload expired entries in one query, see `refresh`."""
+
+        async def run(ids: list[UUID]) -> Loaded:
+            loaded: Loaded = dict.fromkeys(ids)
+
+            for hotel in await load(ids):
+                await self.set(hotel)
+                loaded[hotel.id] = hotel, None
+            for hotel_id in ids:
+                if loaded[hotel_id] is None:
+                    await self.evict(hotel_id)
+
+            return loaded
+
+        loaded = await self.__wait(hotel_ids, run)
+        return {h: None if loaded[h] is None else loaded[h][0] for h in hotel_ids}
+
+    async def __wait(
+        self, hotel_ids: list[UUID], run: Callable[[list[UUID]], Awaitable[Loaded]]
+    ) -> Loaded:
+        joined = {self.__refreshing[h] for h in hotel_ids if h in self.__refreshing}
+        idle = [h for h in hotel_ids if h not in self.__refreshing]
+        loaded: Loaded = {}
+
+        # a reload this reader starts runs on its session, so it waits it out
+        if idle:
+            task = asyncio.create_task(run(idle))
+            for hotel_id in idle:
+                self.__refreshing[hotel_id] = task
+            task.add_done_callback(lambda t: self.__done(idle, t))
+
+            loaded.update(await task)
+
+        if joined:
+            done, _ = await asyncio.wait(joined, timeout=self.refresh_timeout)
+
+            if len(done) < len(joined):
+                raise TimeoutError("hotel reload outlasted refresh_timeout")
+            for task in done:
+                if task.cancelled():
+                    raise RuntimeError("hotel reload cancelled with its reader")
+                loaded.update(task.result())
+
+        return loaded
+
+    def __done(self, hotel_ids: list[UUID], task: asyncio.Task) -> None:
+        for hotel_id in hotel_ids:
+            if self.__refreshing.get(hotel_id) is task:
+                del self.__refreshing[hotel_id]
+
+        # a failed reload was reported to its readers, the next one retries
+        if not task.cancelled():
+            task.exception()
+
+    def __put(self, hotel: dto.HotelWithID, version: int | None) -> None:
+        self.__entries[hotel.id] = (time.monotonic() + self.ttl, hotel, version)
+        self.__entries.move_to_end(hotel.id)
+
+        while len(self.__entries) > self.maxsize:
+            self.__entries.popitem(last=False)
+
+
+class CachedHotelDao(i.HotelDao):
+    """Reads through the cache, reloading on the wrapped DAO's session: a second
+    checkout while the unit of work holds one can drain the pool under load."""
+
+    def __init__(self, dao: i.HotelDao, cache: HotelCache):
+        self.dao = dao
+        self.cache = cache
+
+    async def get(self, hotel_id: UUID) -> dto.HotelWithID | None:
+        cached = await self.__cached(hotel_id)
+
+        if cached is not None:
+            return cached[0]
+
+        loaded = await self.__load(hotel_id)
+        return None if loaded is None else loaded[0]
+
+    async def get_with_version(
+        self, hotel_id: UUID
+    ) -> tuple[dto.HotelWithID, int] | None:
+        cached = await self.__cached(hotel_id)
+
+        # entries filled by get_many carry no version
+        if cached is not None and cached[1] is not None:
+            return cached[0], cached[1]
+
+        return await self.__load(hotel_id)
+
+    async def __cached(
+        self, hotel_id: UUID
+    ) -> tuple[dto.HotelWithID, int | None] | None:
+        cached = await self.cache.get(hotel_id)
+
+        if cached is None:
+            return None
+
+        hotel, version, fresh = cached
+        if fresh:
+            return hotel, version
+
+        try:
+            return await self.cache.refresh(hotel_id, self.dao.get_with_version)
+        except Exception:
+            return hotel, version
+
+    async def __load(self, hotel_id: UUID) -> tuple[dto.HotelWithID, int] | None:
+        loaded = await self.dao.get_with_version(hotel_id)
+
+        if loaded is not None:
+            await self.cache.set(*loaded)
+
+        return loaded
+
+    async def get_many(self, hotel_ids: list[UUID]) -> list[dto.HotelWithID]:
+        found, missed, expired = [], [], {}
+
+        for hotel_id in hotel_ids:
+            cached = await self.cache.get(hotel_id)
+
+            if cached is None:
+                missed.append(hotel_id)
+                continue
+
+            hotel, _, fresh = cached
+            if fresh:
+                found.append(hotel)
+            else:
+                expired[hotel_id] = hotel
+
+        if expired:
+            try:
+                refreshed = await self.cache.refresh_many(
+                    list(expired), self.dao.get_many
+                )
+            except Exception:
+                refreshed = expired
+            found += [hotel for hotel in refreshed.values() if hotel is not None]
+
+        if missed:
+            for hotel in await self.dao.get_many(missed):
+                await self.cache.set(hotel)
+                found.append(hotel)
+
+        return found
+
+    async def get_version(self, hotel_id: UUID) -> int | None:
+        found = await self.get_with_version(hotel_id)
+        return None if found is None else found[1]
+
+    async def get_page(self, hotel_id: UUID, room_limit: int, review_limit: int) -> (
+        tuple[
+            dto.HotelWithID,
+            list[dto.HotelRoomWithID],
+            list[dto.HotelReviewWithID],
+            int,
+        ]
+        | None
+    ):
+        return await self.dao.get_page(hotel_id, room_limit, review_limit)
+
+    async def add(self, hotel: dto.Hotel) -> dto.HotelWithID:
+        return await self.dao.add(hotel)
+
+    async def update(self, hotel: dto.HotelWithID) -> dto.HotelWithID:
+        return await self.dao.update(hotel)
+
+    async def update_if_owned(
+        self, patch: dto.HotelPatch, owner_id: UUID
+    ) -> dto.HotelWithID:
+        return await self.dao.update_if_owned(patch, owner_id)
+
+    async def delete(self, hotel_id: UUID) -> None:
+        await self.dao.delete(hotel_id)
+
+    async def by_owner(
+        self, owner_id: UUID, limit: int, after: UUID | None = None
+    ) -> list[dto.HotelWithID]:
+        return await self.dao.by_owner(owner_id, limit, after)
+
+    async def owned_ids(self, owner_id: UUID, hotel_ids: list[UUID]) -> set[UUID]:
+        return await self.dao.owned_ids(owner_id, hotel_ids)
+
+    async def add_many(self, hotels: list[dto.Hotel]) -> list[dto.HotelWithID]:
+        return await self.dao.add_many(hotels)
+
+    async def upsert_many(self, hotels: list[dto.HotelUpsert]) -> list[dto.HotelWithID]:
+        return await self.dao.upsert_many(hotels)
+
+    async def evict(self, hotel_id: UUID) -> None:
+        await self.cache.evict(hotel_id)
@@ -0,0 +1,39 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HOTEL_CACHE_SIZE = int(os.getenv("HOTEL_CACHE_SIZE", "10000"))
+HOTEL_CACHE_TTL = float(os.getenv("HOTEL_CACHE_TTL", "5"))
+HOTEL_CACHE_STALE_TTL = float(os.getenv("HOTEL_CACHE_STALE_TTL", "60"))
+# how long a read of an expired hotel waits for a reload another read started
+# before it settles for the expired entry
+HOTEL_CACHE_REFRESH_TIMEOUT = float(os.getenv("HOTEL_CACHE_REFRESH_TIMEOUT", "0.25"))
+HOTEL_CACHE_BACKEND = os.getenv("HOTEL_CACHE_BACKEND", "")
+
+OCCUPANCY_INDEX_SIZE = int(os.getenv("OCCUPANCY_INDEX_SIZE", "10000"))
+OCCUPANCY_INDEX_TTL = float(os.getenv("OCCUPANCY_INDEX_TTL", "30"))
+OCCUPANCY_INDEX_HORIZON = int(os.getenv("OCCUPANCY_INDEX_HORIZON", "400"))
+
+FX_RATES_TTL = float(os.getenv("FX_RATES_TTL", "300"))
+
+# hold every hotel and room type in memory, 0 turns the read model off; past
+# these bounds it stops serving, see bench/read_model.py for bytes per row
+READ_MODEL_MAX_HOTELS = int(os.getenv("READ_MODEL_MAX_HOTELS", "0"))
+READ_MODEL_MAX_ROOMS = int(os.getenv("READ_MODEL_MAX_ROOMS", "0"))
+
+# sync: a review updates its hotel's rating in the same statement.
+# async: the outbox relay applies review events to ratings in per-hotel batches,
+# so a rating lags its reviews by up to OUTBOX_POLL_INTERVAL plus one batch while
+# the relay keeps up, and by HOTEL_CACHE_TTL more in hotel reads. Only run it
+# with the relay up; `python -m src.inf.db.reconcile_ratings` fixes any drift.
+# In async mode a review write never locks its hotel row, but it still locks the
+# hotel's hotel_rating_stats row and day until commit, so concurrent reviews of
+# one hotel queue there.
+RATING_MODE = os.getenv("RATING_MODE", "sync")
+
+# write domain events to the outbox, always on for async ratings; only the relay
+# (`python -m src.inf.mq`) empties it, so leave it off unless one runs
+OUTBOX_ENABLED = (
+    RATING_MODE == "async" or os.getenv("OUTBOX_ENABLED", "false").lower() == "true"
+)
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+import src.app.interface as i
+from src.app.enum import CurrencyCode
+
+Rates = dict[CurrencyCode, float]
+
+
+class FxRateCache:
+    """Process-wide copy of the fx rates.
+
+    Rates change a few times a day, so every request shares one dict. After `ttl`
+    seconds the next reader reloads them on its own session and waits for it,
+    while the readers meanwhile keep getting the current rates; a failed reload
+    keeps serving them too.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+        self.__rates: Rates | None = None
+        self.__expires_at = 0.0
+        self.__loading: asyncio.Task | None = None
+
+    async def get(self, load: Callable[[], Awaitable[Rates]]) -> Rates:
+        if self.__loading is not None:
+            if self.__rates is not None:
+                return self.__rates
+
+            # the first load, nothing to serve until it lands
+            task = self.__loading
+            await asyncio.wait({task})
+
+            # its reader went away, load on this one's session instead
+            if task.cancelled():
+                return await self.get(load)
+
+            return task.result()
+
+        if self.__rates is not None and self.__expires_at > time.monotonic():
+            return self.__rates
+
+        self.__loading = asyncio.create_task(self.__run(load))
+        self.__loading.add_done_callback(self.__done)
+
+        try:
+            return await self.__loading
+        except Exception:
+            if self.__rates is None:
+                raise
+
+            return self.__rates
+
+    def evict(self) -> None:
+        self.__expires_at = 0.0
+
+    async def __run(self, load: Callable[[], Awaitable[Rates]]) -> Rates:
+        rates = await load()
+        self.__rates, self.__expires_at = rates, time.monotonic() + self.ttl
+
+        return rates
+
+    def __done(self, task: asyncio.Task) -> None:
+        self.__loading = None
+
+        if not task.cancelled():
+            task.exception()
+
+
+class CachedFxRateDao(i.FxRateDao):
+    def __init__(self, dao: i.FxRateDao, cache: FxRateCache):
+        self.dao = dao
+        self.cache = cache
+
+    async def rates(self) -> Rates:
+        # loads on this unit of work's session, a second checkout while it holds
+        # one can drain the pool under load
+        return await self.cache.get(self.dao.rates)
+
+    async def set_rates(self, rates: Rates) -> None:
+        await self.dao.set_rates(rates)
+        self.cache.evict()
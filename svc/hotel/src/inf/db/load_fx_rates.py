@@ -0,0 +1,40 @@
+"""Load fx rates into the database and re-normalize room prices.
+
+    python -m src.inf.db.load_fx_rates rates.json
+
+The file maps currency codes to the value of one unit in the base currency,
+e.g. {"USD": 1.0, "EUR": 1.08, "JPY": 0.0067}.
+"""
+
+import argparse
+import asyncio
+import json
+
+from src.app.enum import CurrencyCode
+
+from .uow import UnitOfWork, shutdown
+
+
+async def load(path: str) -> int:
+    with open(path) as f:
+        rates = {CurrencyCode(code): float(rate) for code, rate in json.load(f).items()}
+
+    try:
+        async with UnitOfWork() as uow:
+            await uow.fx_rate_dao.set_rates(rates)
+    finally:
+        await shutdown()
+
+    return len(rates)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    print(f"loaded {asyncio.run(load(args.path))} rates")
+
+
+if __name__ == "__main__":
+    main()
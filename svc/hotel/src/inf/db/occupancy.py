@@ -0,0 +1,266 @@
+import asyncio
+import datetime
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from uuid import UUID
+
+import src.app.dto as dto
+import src.app.interface as i
+
+OccupancyLoader = Callable[
+    [UUID, datetime.date, datetime.date],
+    Awaitable[tuple[list[dto.HotelRoomWithID], list[dto.ReservationWithID]]],
+]
+
+
+class HotelOccupancy:
+    """Occupancy of one hotel over the nights [first, last), as date ordinals.
+
+    Every physical room number holds an int bitset with bit n set when night
+    first + n is taken, so a stay is free when its nights' bits are all clear.
+    Numbers belong to the hotel: room types listing the same number share it.
+    """
+
+    __slots__ = ("expires_at", "first", "last", "rooms", "taken")
+
+    def __init__(
+        self,
+        expires_at: float,
+        first: int,
+        last: int,
+        rooms: list[dto.HotelRoomWithID],
+    ):
+        self.expires_at = expires_at
+        self.first = first
+        self.last = last
+        self.rooms = {r.id: list(dict.fromkeys(r.numbers)) for r in rooms}
+        self.taken = dict.fromkeys((n for r in rooms for n in r.numbers), 0)
+
+    def covers(self, first: int, last: int) -> bool:
+        return self.first <= first and last <= self.last
+
+    def available(self, first: int, last: int) -> list[dto.HotelRoomAvailability]:
+        mask = ((1 << (last - first)) - 1) << (first - self.first)
+
+        return [
+            dto.HotelRoomAvailability(
+                room_id=room_id,
+                numbers=[n for n in numbers if not self.taken[n] & mask],
+            )
+            for room_id, numbers in self.rooms.items()
+        ]
+
+    def occupy(self, reservation: dto.ReservationWithID) -> None:
+        # numbers dropped from the hotel since loading are not tracked
+        if reservation.number in self.taken:
+            self.taken[reservation.number] |= self.__mask(reservation)
+
+    def release(self, reservation: dto.ReservationWithID) -> None:
+        if reservation.number in self.taken:
+            self.taken[reservation.number] &= ~self.__mask(reservation)
+
+    def __mask(self, reservation: dto.ReservationWithID) -> int:
+        first = max(reservation.check_in.toordinal(), self.first)
+        last = min(reservation.check_out.toordinal(), self.last)
+
+        if first >= last:
+            return 0
+
+        return ((1 << (last - first)) - 1) << (first - self.first)
+
+
+class OccupancyIndex:
+    """LRU+TTL index of hotel occupancy for the next `horizon` nights.
+
+    Availability is answered from memory. Bookings stay authoritative in the
+    database, whose exclusion constraint rejects a room number taken by a write
+    this process has not seen; that write evicts the hotel so it is reloaded.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, horizon: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.horizon = horizon
+
+        self.__entries: OrderedDict[UUID, HotelOccupancy] = OrderedDict()
+        self.__loading: dict[UUID, asyncio.Task] = {}
+        self.__changed: set[UUID] = set()
+
+    async def available(
+        self,
+        hotel_id: UUID,
+        check_in: datetime.date,
+        check_out: datetime.date,
+        load: OccupancyLoader,
+    ) -> list[dto.HotelRoomAvailability] | None:
+        """Return the availability, or None for a stay outside the horizon."""
+        first, last = check_in.toordinal(), check_out.toordinal()
+
+        entry = self.__entries.get(hotel_id)
+        if entry is None or entry.expires_at < time.monotonic():
+            entry = await self.__load(hotel_id, load)
+        else:
+            self.__entries.move_to_end(hotel_id)
+
+        if not entry.covers(first, last):
+            return None
+
+        return entry.available(first, last)
+
+    def cached(
+        self, hotel_id: UUID, check_in: datetime.date, check_out: datetime.date
+    ) -> list[dto.HotelRoomAvailability] | None:
+        """Return the availability if the hotel is indexed, without loading it."""
+        first, last = check_in.toordinal(), check_out.toordinal()
+        entry = self.__entries.get(hotel_id)
+
+        if entry is None or entry.expires_at < time.monotonic():
+            return None
+        if not entry.covers(first, last):
+            return None
+
+        return entry.available(first, last)
+
+    def occupy(self, reservation: dto.ReservationWithID) -> None:
+        self.__change(reservation.hotel_id)
+
+        if (entry := self.__entries.get(reservation.hotel_id)) is not None:
+            entry.occupy(reservation)
+
+    def release(self, reservation: dto.ReservationWithID) -> None:
+        self.__change(reservation.hotel_id)
+
+        if (entry := self.__entries.get(reservation.hotel_id)) is not None:
+            entry.release(reservation)
+
+    def evict(self, hotel_id: UUID) -> None:
+        self.__change(hotel_id)
+        self.__entries.pop(hotel_id, None)
+
+    def __change(self, hotel_id: UUID) -> None:
+        # a snapshot being loaded right now may miss this write
+        if hotel_id in self.__loading:
+            self.__changed.add(hotel_id)
+
+    async def __load(self, hotel_id: UUID, load: OccupancyLoader) -> HotelOccupancy:
+        # concurrent misses on one hotel share a single load, which runs on the
+        # session of the reader that started it, so that reader waits it out
+        task = self.__loading.get(hotel_id)
+
+        if task is None:
+            task = asyncio.create_task(self.__run(hotel_id, load))
+            self.__loading[hotel_id] = task
+            task.add_done_callback(lambda _: self.__loading.pop(hotel_id, None))
+
+            return await task
+
+        await asyncio.wait({task})
+
+        # its reader went away, load on this one's session instead
+        if task.cancelled():
+            return await self.__load(hotel_id, load)
+
+        return task.result()
+
+    async def __run(self, hotel_id: UUID, load: OccupancyLoader) -> HotelOccupancy:
+        start = datetime.date.today() - datetime.timedelta(days=1)
+        end = start + datetime.timedelta(days=self.horizon + 1)
+
+        self.__changed.discard(hotel_id)
+        rooms, reservations = await load(hotel_id, start, end)
+
+        entry = HotelOccupancy(
+            time.monotonic() + self.ttl, start.toordinal(), end.toordinal(), rooms
+        )
+        for reservation in reservations:
+            entry.occupy(reservation)
+
+        # a snapshot that raced a local write is served once but not kept
+        if hotel_id in self.__changed:
+            self.__changed.discard(hotel_id)
+        else:
+            self.__entries[hotel_id] = entry
+            self.__entries.move_to_end(hotel_id)
+
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+        return entry
+
+
+class IndexedReservationDao(i.HotelReservationDao):
+    def __init__(
+        self,
+        dao: i.HotelReservationDao,
+        index: OccupancyIndex,
+        load: OccupancyLoader,
+    ):
+        self.dao = dao
+        self.index = index
+        self.load = load
+
+    async def get(self, reservation_id: UUID) -> dto.ReservationWithID | None:
+        return await self.dao.get(reservation_id)
+
+    async def add(self, reservation: dto.Reservation) -> dto.ReservationWithID | None:
+        created = await self.dao.add(reservation)
+
+        # the number was taken by a write the index missed
+        if created is None:
+            self.index.evict(reservation.hotel_id)
+
+        return created
+
+    async def delete_if_guest(
+        self, reservation_id: UUID, guest_id: UUID
+    ) -> dto.ReservationWithID:
+        return await self.dao.delete_if_guest(reservation_id, guest_id)
+
+    async def by_hotel(
+        self, hotel_id: UUID, start: datetime.date, end: datetime.date
+    ) -> list[dto.ReservationWithID]:
+        return await self.dao.by_hotel(hotel_id, start, end)
+
+    async def available(
+        self, hotel_id: UUID, check_in: datetime.date, check_out: datetime.date
+    ) -> list[dto.HotelRoomAvailability]:
+        rooms = await self.index.available(hotel_id, check_in, check_out, self.load)
+
+        if rooms is None:
+            return await self.dao.available(hotel_id, check_in, check_out)
+
+        return rooms
+
+    async def available_by_hotels(
+        self, hotel_ids: list[UUID], check_in: datetime.date, check_out: datetime.date
+    ) -> dict[UUID, list[dto.HotelRoomAvailability]]:
+        # indexed hotels answer from memory, the rest in one query rather than
+        # one index load each
+        found, missed = {}, []
+
+        for hotel_id in hotel_ids:
+            rooms = self.index.cached(hotel_id, check_in, check_out)
+            if rooms is None:
+                missed.append(hotel_id)
+            else:
+                found[hotel_id] = rooms
+
+        if missed:
+            found |= await self.dao.available_by_hotels(missed, check_in, check_out)
+
+        return found
+
+    async def available_uncached(
+        self, hotel_id: UUID, check_in: datetime.date, check_out: datetime.date
+    ) -> list[dto.HotelRoomAvailability]:
+        return await self.dao.available(hotel_id, check_in, check_out)
+
+    async def occupy(self, reservation: dto.ReservationWithID) -> None:
+        self.index.occupy(reservation)
+
+    async def release(self, reservation: dto.ReservationWithID) -> None:
+        self.index.release(reservation)
+
+    async def evict(self, hotel_id: UUID) -> None:
+        self.index.evict(hotel_id)
@@ -12,3 +12,24 @@ DB_PASS = os.getenv("DB_PASS")
 ALCHEMY_DB_URI = (
     f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
+
+# comma separated postgresql+asyncpg:// DSNs of streaming replicas
+DB_REPLICA_URIS = [
+    uri.strip() for uri in os.getenv("DB_REPLICA_URIS", "").split(",") if uri.strip()
+]
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))
+# how long reads touching a just-written key keep going to the primary
+DB_STICKY_WINDOW = float(os.getenv("DB_STICKY_WINDOW", "5"))
+
+# per engine and per worker process: N workers hold up to
+# N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections to each replica and twice that
+# to the primary, whose read-only sessions have an engine of their own
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# seconds before a connection is replaced, -1 keeps them
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# test each connection on checkout, for networks that drop idle connections
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+# connections opened per engine at startup, so the first requests do not pay
+DB_POOL_WARM = int(os.getenv("DB_POOL_WARM", str(DB_POOL_SIZE)))
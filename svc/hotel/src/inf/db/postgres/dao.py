@@ -1,12 +1,234 @@
-from uuid import UUID
-from sqlalchemy import delete, select
+from datetime import date
+from typing import Any, AsyncIterator, Sequence
+from uuid import UUID, uuid4
+from pydantic import TypeAdapter
+from sqlalchemy import (
+    Float,
+    Integer,
+    Uuid,
+    any_,
+    bindparam,
+    case,
+    delete,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import (
+    ARRAY,
+    JSON,
+    Range,
+    aggregate_order_by,
+    insert,
+    websearch_to_tsquery,
+)
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import src.app.dto as dto
+import src.app.exception as exc
 import src.app.interface as i
-from src.app.enum import CountryCode, CurrencyCode
+from src.app.enum import CurrencyCode, EventType
 
-from .model import Hotel, HotelRoom, HotelReview
+from .model import (
+    FxRate,
+    Hotel,
+    HotelRatingStats,
+    HotelRoom,
+    HotelReview,
+    HotelReviewDaily,
+    HotelReservation,
+    OutboxEvent,
+)
+
+# Read paths select plain columns, so rows skip the ORM identity map, and map
+# them to DTOs with precompiled TypeAdapters that validate a whole result set in
+# one pydantic-core call. On pydantic 2.11+ this beats both per-row model
+# construction and model_construct(), which runs in Python.
+
+HOTEL_COLUMNS = (
+    Hotel.id,
+    Hotel.owner_id,
+    Hotel.name,
+    Hotel.description,
+    Hotel.location_country_code,
+    Hotel.location_address,
+    Hotel.rating_average,
+    Hotel.rating_num_votes,
+)
+
+# review writes bump hotel_rating_stats.review_version, so async-rated ones never lock the
+# hotel row, and everything else bumps hotel.version
+HOTEL_VERSION = (
+    Hotel.version
+    + func.coalesce(
+        select(HotelRatingStats.review_version)
+        .where(HotelRatingStats.hotel_id == Hotel.id)
+        .scalar_subquery(),
+        0,
+    )
+).label("version")
+
+HOTEL_ROOM_COLUMNS = (
+    HotelRoom.id,
+    HotelRoom.hotel_id,
+    HotelRoom.name,
+    HotelRoom.description,
+    HotelRoom.price_per_night_currency_code,
+    HotelRoom.price_per_night,
+    HotelRoom.numbers,
+)
+
+HOTEL_REVIEW_COLUMNS = (
+    HotelReview.id,
+    HotelReview.author_id,
+    HotelReview.hotel_id,
+    HotelReview.rating,
+    HotelReview.comment,
+    HotelReview.date_created,
+)
+
+
+HOTEL_RESERVATION_COLUMNS = (
+    HotelReservation.id,
+    HotelReservation.guest_id,
+    HotelReservation.hotel_id,
+    HotelReservation.room_id,
+    HotelReservation.number,
+    HotelReservation.stay,
+)
+
+
+def hotel_values(row: Sequence[Any]) -> dict[str, Any]:
+    id, owner_id, name, description, country_code, address, average, votes = row
+
+    return {
+        "id": id,
+        "owner_id": owner_id,
+        "name": name,
+        "description": description,
+        "location": {"country_code": country_code, "address": address},
+        "rating": {"average": average, "num_votes": votes},
+    }
+
+
+def hotel_room_values(row: Sequence[Any]) -> dict[str, Any]:
+    id, hotel_id, name, description, currency_code, amount, numbers = row
+
+    return {
+        "id": id,
+        "hotel_id": hotel_id,
+        "name": name,
+        "description": description,
+        "price_per_night": {"currency_code": currency_code, "amount": amount},
+        "numbers": numbers,
+    }
+
+
+def hotel_review_values(row: Sequence[Any]) -> dict[str, Any]:
+    id, author_id, hotel_id, rating, comment, date_created = row
+
+    return {
+        "id": id,
+        "author_id": author_id,
+        "hotel_id": hotel_id,
+        "rating": rating,
+        "comment": comment,
+        "date_created": date_created,
+    }
+
+
+def hotel_reservation_values(row: Sequence[Any]) -> dict[str, Any]:
+    id, guest_id, hotel_id, room_id, number, stay = row
+
+    return {
+        "id": id,
+        "guest_id": guest_id,
+        "hotel_id": hotel_id,
+        "room_id": room_id,
+        "number": number,
+        "check_in": stay.lower,
+        "check_out": stay.upper,
+    }
+
+
+STARS_COLUMNS = (
+    HotelRatingStats.stars_1,
+    HotelRatingStats.stars_2,
+    HotelRatingStats.stars_3,
+    HotelRatingStats.stars_4,
+    HotelRatingStats.stars_5,
+)
+
+
+def average(total: int, count: int) -> float:
+    return total / count if count else 0
+
+
+def rating_stats_values(row: Sequence[Any], since: date) -> dict[str, Any]:
+    # hotels without reviews have no stats row, so outer-joined stars are null
+    hotel_id, *stars, recent_reviews, recent_total = row
+    stars = [n or 0 for n in stars]
+    votes = sum(stars)
+
+    return {
+        "hotel_id": hotel_id,
+        "rating": {
+            "average": average(sum(s * n for s, n in enumerate(stars, 1)), votes),
+            "num_votes": votes,
+        },
+        "stars": dict(enumerate(stars, 1)),
+        "recent": {
+            "since": since,
+            "num_reviews": recent_reviews,
+            "average": average(recent_total, recent_reviews),
+        },
+    }
+
+
+def fx_rate(currency_code: CurrencyCode):
+    return (
+        select(FxRate.rate)
+        .where(FxRate.currency_code == currency_code)
+        .scalar_subquery()
+    )
+
+
+def any_id(ids: list[UUID]):
+    """`= ANY($1::uuid[])`: one array parameter, so every batch size shares one
+    prepared statement where an IN list would prepare one per length."""
+    return any_(literal(ids, ARRAY(Uuid)))
+
+
+async def copy_records(
+    db: AsyncSession, table: str, columns: Sequence[str], records: list[tuple]
+) -> None:
+    """Bulk load rows with COPY, inside the session's transaction."""
+    conn = await db.connection()
+    raw = (await conn.get_raw_connection()).driver_connection
+
+    # asyncpg only begins the session transaction on the first statement, and a
+    # COPY sent before it would commit on its own
+    if not raw.is_in_transaction():
+        await conn.exec_driver_sql("SELECT 1")
+
+    await raw.copy_records_to_table(table, records=records, columns=columns)
+
+
+HOTELS = TypeAdapter(list[dto.HotelWithID])
+HOTEL_SEARCH_RESULTS = TypeAdapter(list[dto.HotelSearchResult])
+HOTEL_ROOMS = TypeAdapter(list[dto.HotelRoomWithID])
+HOTEL_ROOM_SEARCH_RESULTS = TypeAdapter(list[dto.HotelRoomSearchResult])
+HOTEL_REVIEWS = TypeAdapter(list[dto.HotelReviewWithID])
+HOTEL_RESERVATIONS = TypeAdapter(list[dto.ReservationWithID])
+HOTEL_RATING_STATS = TypeAdapter(list[dto.HotelRatingStats])
+HOTEL_REVIEW_DAYS = TypeAdapter(list[dto.HotelReviewDay])
+EVENTS = TypeAdapter(list[dto.Event])
 
 
 class HotelDao(i.HotelDao):
@@ -21,7 +243,7 @@ class HotelDao(i.HotelDao):
             name=hotel.name,
             description=hotel.description,
             location=dto.Location(
-                country_code=CountryCode(hotel.location_country_code),
+                country_code=hotel.location_country_code,
                 address=hotel.location_address,
             ),
             rating=dto.Rating(
@@ -35,20 +257,101 @@ class HotelDao(i.HotelDao):
             owner_id=hotel.owner_id,
             name=hotel.name,
             description=hotel.description,
-            location_country_code=hotel.location.country_code.value,
+            location_country_code=hotel.location.country_code,
             location_address=hotel.location.address,
             rating_average=hotel.rating.average,
             rating_num_votes=hotel.rating.num_votes,
         )
 
     async def get(self, hotel_id: UUID) -> dto.HotelWithID | None:
-        stmt = select(Hotel).where(Hotel.id == hotel_id)
-        hotel = (await self.db.execute(stmt)).scalar_one_or_none()
+        stmt = select(*HOTEL_COLUMNS).where(Hotel.id == hotel_id)
+        row = (await self.db.execute(stmt)).one_or_none()
+
+        if row is None:
+            return None
+
+        return dto.HotelWithID.model_validate(hotel_values(row))
+
+    async def get_many(self, hotel_ids: list[UUID]) -> list[dto.HotelWithID]:
+        stmt = select(*HOTEL_COLUMNS).where(Hotel.id == any_id(hotel_ids))
+        rows = (await self.db.execute(stmt)).all()
+
+        return HOTELS.validate_python([hotel_values(r) for r in rows])
+
+    async def get_with_version(
+        self, hotel_id: UUID
+    ) -> tuple[dto.HotelWithID, int] | None:
+        stmt = select(*HOTEL_COLUMNS, HOTEL_VERSION).where(Hotel.id == hotel_id)
+        row = (await self.db.execute(stmt)).one_or_none()
+
+        if row is None:
+            return None
+
+        return dto.HotelWithID.model_validate(hotel_values(row[:-1])), row[-1]
+
+    async def get_version(self, hotel_id: UUID) -> int | None:
+        stmt = select(HOTEL_VERSION).where(Hotel.id == hotel_id)
+        return (await self.db.execute(stmt)).scalar_one_or_none()
+
+    async def get_page(self, hotel_id: UUID, room_limit: int, review_limit: int) -> (
+        tuple[
+            dto.HotelWithID,
+            list[dto.HotelRoomWithID],
+            list[dto.HotelReviewWithID],
+            int,
+        ]
+        | None
+    ):
+        rooms = (
+            select(*HOTEL_ROOM_COLUMNS)
+            .where(HotelRoom.hotel_id == hotel_id)
+            .order_by(HotelRoom.id)
+            .limit(room_limit)
+            .subquery("room")
+        )
+        reviews = (
+            select(*HOTEL_REVIEW_COLUMNS)
+            .where(HotelReview.hotel_id == hotel_id)
+            .order_by(HotelReview.date_created.desc(), HotelReview.id.desc())
+            .limit(review_limit)
+            .subquery("review")
+        )
+
+        # each child row is aggregated as a positional json array, so it maps
+        # with the same *_values helpers as a plain result row
+        room_rows = select(
+            func.json_agg(
+                aggregate_order_by(func.json_build_array(*rooms.c), rooms.c.id),
+                type_=JSON,
+            )
+        ).scalar_subquery()
+        review_rows = select(
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_array(*reviews.c),
+                    reviews.c.date_created.desc(),
+                    reviews.c.id.desc(),
+                ),
+                type_=JSON,
+            )
+        ).scalar_subquery()
+
+        stmt = select(*HOTEL_COLUMNS, HOTEL_VERSION, room_rows, review_rows).where(
+            Hotel.id == hotel_id
+        )
+        row = (await self.db.execute(stmt)).one_or_none()
 
-        if hotel is None:
+        if row is None:
             return None
 
-        return self.__to_dto(hotel)
+        return (
+            dto.HotelWithID.model_validate(hotel_values(row[:-3])),
+            HOTEL_ROOMS.validate_python([hotel_room_values(r) for r in row[-2] or []]),
+            HOTEL_REVIEWS.validate_python(
+                [hotel_review_values(r) for r in row[-1] or []]
+            ),
+            row[-3],
+        )
 
     async def add(self, hotel: dto.Hotel) -> dto.HotelWithID:
         orm_hotel = self.__to_orm(hotel)
@@ -59,22 +362,222 @@ class HotelDao(i.HotelDao):
         return self.__to_dto(orm_hotel)
 
     async def update(self, hotel: dto.HotelWithID) -> dto.HotelWithID:
-        orm_hotel = self.__to_orm(hotel)
-        orm_hotel.id = hotel.id
+        # rating is owned by review writes, never overwrite it from a stale read
+        stmt = (
+            update(Hotel)
+            .where(Hotel.id == hotel.id)
+            .values(
+                owner_id=hotel.owner_id,
+                name=hotel.name,
+                description=hotel.description,
+                location_country_code=hotel.location.country_code,
+                location_address=hotel.location.address,
+            )
+            .returning(*HOTEL_COLUMNS)
+        )
+        row = (await self.db.execute(stmt)).one()
 
-        await self.db.merge(orm_hotel)
+        return dto.HotelWithID.model_validate(hotel_values(row))
 
-        return self.__to_dto(orm_hotel)
+    async def update_if_owned(
+        self, patch: dto.HotelPatch, owner_id: UUID
+    ) -> dto.HotelWithID:
+        values = {}
+        if patch.name is not None:
+            values["name"] = patch.name
+        if patch.description is not None:
+            values["description"] = patch.description
+        if patch.location is not None:
+            values["location_country_code"] = patch.location.country_code
+            values["location_address"] = patch.location.address
+
+        if not values:
+            return await self.__get_owned(patch.id, owner_id)
+
+        # target sees the hotel whoever owns it, the UPDATE only when owner_id
+        # matches, so one round trip tells "not found" from "not owned"
+        target = (
+            select(Hotel.id, Hotel.owner_id).where(Hotel.id == patch.id).cte("target")
+        )
+        updated = (
+            update(Hotel)
+            .where(Hotel.id == target.c.id, target.c.owner_id == owner_id)
+            .values(values)
+            .returning(*HOTEL_COLUMNS)
+            .cte("updated_hotel")
+        )
+        stmt = select(target.c.owner_id, updated).select_from(
+            target.outerjoin(updated, true())
+        )
+
+        row = (await self.db.execute(stmt)).one_or_none()
+
+        if row is None:
+            raise exc.ResourceNotFoundError("hotel", patch.id)
+
+        if row[1] is None:
+            raise exc.NotOwnedError("hotel", owner_id)
+
+        return dto.HotelWithID.model_validate(hotel_values(row[1:]))
+
+    async def __get_owned(self, hotel_id: UUID, owner_id: UUID) -> dto.HotelWithID:
+        stmt = select(*HOTEL_COLUMNS).where(Hotel.id == hotel_id)
+        row = (await self.db.execute(stmt)).one_or_none()
+
+        if row is None:
+            raise exc.ResourceNotFoundError("hotel", hotel_id)
+
+        hotel = dto.HotelWithID.model_validate(hotel_values(row))
+        if hotel.owner_id != owner_id:
+            raise exc.NotOwnedError("hotel", owner_id)
+
+        return hotel
 
     async def delete(self, hotel_id: UUID) -> None:
         stmt = delete(Hotel).where(Hotel.id == hotel_id)
         await self.db.execute(stmt)
 
-    async def by_owner(self, owner_id: UUID) -> list[dto.HotelWithID]:
-        stmt = select(Hotel).where(Hotel.owner_id == owner_id)
-        hotels = (await self.db.execute(stmt)).scalars().all()
+    async def by_owner(
+        self, owner_id: UUID, limit: int, after: UUID | None = None
+    ) -> list[dto.HotelWithID]:
+        stmt = (
+            select(*HOTEL_COLUMNS)
+            .where(Hotel.owner_id == owner_id)
+            .order_by(Hotel.id)
+            .limit(limit)
+        )
+
+        if after is not None:
+            stmt = stmt.where(Hotel.id > after)
+
+        rows = (await self.db.execute(stmt)).all()
+
+        return HOTELS.validate_python([hotel_values(r) for r in rows])
+
+    async def owned_ids(self, owner_id: UUID, hotel_ids: list[UUID]) -> set[UUID]:
+        stmt = select(Hotel.id).where(
+            Hotel.id.in_(hotel_ids), Hotel.owner_id == owner_id
+        )
+
+        return set((await self.db.execute(stmt)).scalars())
+
+    async def add_many(self, hotels: list[dto.Hotel]) -> list[dto.HotelWithID]:
+        created = [dto.HotelWithID(id=uuid4(), **h.model_dump()) for h in hotels]
+
+        await copy_records(
+            self.db,
+            Hotel.__tablename__,
+            [c.key for c in HOTEL_COLUMNS],
+            [
+                (
+                    h.id,
+                    h.owner_id,
+                    h.name,
+                    h.description,
+                    h.location.country_code.value,
+                    h.location.address,
+                    h.rating.average,
+                    h.rating.num_votes,
+                )
+                for h in created
+            ],
+        )
+
+        return created
+
+    async def upsert_many(self, hotels: list[dto.HotelUpsert]) -> list[dto.HotelWithID]:
+        if not hotels:
+            return []
+
+        stmt = insert(Hotel.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Hotel.id],
+            set_={
+                "name": stmt.excluded.name,
+                "description": stmt.excluded.description,
+                "location_country_code": stmt.excluded.location_country_code,
+                "location_address": stmt.excluded.location_address,
+            },
+            where=Hotel.owner_id == stmt.excluded.owner_id,
+        ).returning(*HOTEL_COLUMNS)
+
+        rows = (
+            await self.db.execute(
+                stmt,
+                [
+                    {
+                        "id": h.id,
+                        "owner_id": h.owner_id,
+                        "name": h.name,
+                        "description": h.description,
+                        "location_country_code": h.location.country_code,
+                        "location_address": h.location.address,
+                        "rating_average": 0,
+                        "rating_num_votes": 0,
+                    }
+                    for h in hotels
+                ],
+            )
+        ).all()
+
+        return HOTELS.validate_python([hotel_values(r) for r in rows])
 
-        return [self.__to_dto(h) for h in hotels]
+
+class HotelSearchDao(i.HotelSearchDao):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def search(
+        self,
+        query: dto.HotelSearchQuery,
+        limit: int,
+        after: tuple[float, UUID] | None = None,
+    ) -> list[dto.HotelSearchResult]:
+        if query.q:
+            text_query = websearch_to_tsquery("simple", query.q)
+            score = func.ts_rank(Hotel.search_vector, text_query)
+        else:
+            score = Hotel.rating_average
+
+        stmt = (
+            select(*HOTEL_COLUMNS, score)
+            .order_by(score.desc(), Hotel.id.desc())
+            .limit(limit)
+        )
+
+        if query.q:
+            stmt = stmt.where(Hotel.search_vector.bool_op("@@")(text_query))
+
+        if query.country_code is not None:
+            stmt = stmt.where(Hotel.location_country_code == query.country_code)
+
+        if query.min_rating is not None:
+            stmt = stmt.where(Hotel.rating_average >= query.min_rating)
+
+        if query.currency_code is not None:
+            # bounds are converted once, rooms compare on their normalized price
+            rate = fx_rate(query.currency_code)
+            priced = select(HotelRoom.id).where(HotelRoom.hotel_id == Hotel.id)
+
+            if query.min_price is not None:
+                priced = priced.where(
+                    HotelRoom.price_per_night_base >= query.min_price * rate
+                )
+            if query.max_price is not None:
+                priced = priced.where(
+                    HotelRoom.price_per_night_base <= query.max_price * rate
+                )
+
+            stmt = stmt.where(exists(priced))
+
+        if after is not None:
+            stmt = stmt.where(tuple_(score, Hotel.id) < tuple_(*after))
+
+        rows = (await self.db.execute(stmt)).all()
+
+        return HOTEL_SEARCH_RESULTS.validate_python(
+            [{**hotel_values(r[:-1]), "score": r[-1]} for r in rows]
+        )
 
 
 class HotelRoomDao(i.HotelRoomDao):
@@ -89,7 +592,7 @@ class HotelRoomDao(i.HotelRoomDao):
             name=room.name,
             description=room.description,
             price_per_night=dto.Price(
-                currency_code=CurrencyCode(room.price_per_night_currency_code),
+                currency_code=room.price_per_night_currency_code,
                 amount=room.price_per_night,
             ),
             numbers=room.numbers,
@@ -101,19 +604,25 @@ class HotelRoomDao(i.HotelRoomDao):
             hotel_id=room.hotel_id,
             name=room.name,
             description=room.description,
-            price_per_night_currency_code=room.price_per_night.currency_code.value,
+            price_per_night_currency_code=room.price_per_night.currency_code,
             price_per_night=room.price_per_night.amount,
             numbers=room.numbers,
         )
 
     async def get(self, room_id: UUID) -> dto.HotelRoomWithID | None:
-        stmt = select(HotelRoom).where(HotelRoom.id == room_id)
-        room = (await self.db.execute(stmt)).scalar_one_or_none()
+        stmt = select(*HOTEL_ROOM_COLUMNS).where(HotelRoom.id == room_id)
+        row = (await self.db.execute(stmt)).one_or_none()
 
-        if room is None:
+        if row is None:
             return None
 
-        return self.__to_dto(room)
+        return dto.HotelRoomWithID.model_validate(hotel_room_values(row))
+
+    async def get_many(self, room_ids: list[UUID]) -> list[dto.HotelRoomWithID]:
+        stmt = select(*HOTEL_ROOM_COLUMNS).where(HotelRoom.id == any_id(room_ids))
+        rows = (await self.db.execute(stmt)).all()
+
+        return HOTEL_ROOMS.validate_python([hotel_room_values(r) for r in rows])
 
     async def add(self, room: dto.HotelRoom) -> dto.HotelRoomWithID:
         orm_room = self.__to_orm(room)
@@ -135,16 +644,149 @@ class HotelRoomDao(i.HotelRoomDao):
         stmt = delete(HotelRoom).where(HotelRoom.id == room_id)
         await self.db.execute(stmt)
 
-    async def by_hotel(self, hotel_id: UUID) -> list[dto.HotelRoomWithID]:
-        stmt = select(HotelRoom).where(HotelRoom.hotel_id == hotel_id)
-        rooms = (await self.db.execute(stmt)).scalars().all()
+    async def by_hotel(
+        self, hotel_id: UUID, limit: int, after: UUID | None = None
+    ) -> list[dto.HotelRoomWithID]:
+        stmt = (
+            select(*HOTEL_ROOM_COLUMNS)
+            .where(HotelRoom.hotel_id == hotel_id)
+            .order_by(HotelRoom.id)
+            .limit(limit)
+        )
+
+        if after is not None:
+            stmt = stmt.where(HotelRoom.id > after)
+
+        rows = (await self.db.execute(stmt)).all()
+
+        return HOTEL_ROOMS.validate_python([hotel_room_values(r) for r in rows])
+
+    async def by_hotels(
+        self, hotel_ids: list[UUID], limit: int
+    ) -> list[dto.HotelRoomWithID]:
+        # one index range scan of (hotel_id, id) per hotel
+        wanted = (
+            func.unnest(literal(hotel_ids, ARRAY(Uuid)))
+            .table_valued("hotel_id")
+            .render_derived("wanted")
+        )
+        rooms = (
+            select(*HOTEL_ROOM_COLUMNS)
+            .where(HotelRoom.hotel_id == wanted.c.hotel_id)
+            .order_by(HotelRoom.id)
+            .limit(limit)
+            .lateral("room")
+        )
+        stmt = select(rooms).select_from(wanted).join(rooms, true())
+        rows = (await self.db.execute(stmt)).all()
+
+        return HOTEL_ROOMS.validate_python([hotel_room_values(r) for r in rows])
 
-        return [self.__to_dto(r) for r in rooms]
+    async def by_price(
+        self,
+        currency_code: CurrencyCode,
+        min_price: float | None,
+        max_price: float | None,
+        limit: int,
+        after: tuple[float, UUID] | None = None,
+    ) -> list[dto.HotelRoomSearchResult]:
+        base = HotelRoom.price_per_night_base
+        rate = fx_rate(currency_code)
+
+        stmt = (
+            select(*HOTEL_ROOM_COLUMNS, base)
+            .where(base.is_not(None))
+            .order_by(base, HotelRoom.id)
+            .limit(limit)
+        )
+
+        if min_price is not None:
+            stmt = stmt.where(base >= min_price * rate)
+
+        if max_price is not None:
+            stmt = stmt.where(base <= max_price * rate)
+
+        if after is not None:
+            stmt = stmt.where(tuple_(base, HotelRoom.id) > tuple_(*after))
+
+        rows = (await self.db.execute(stmt)).all()
+
+        return HOTEL_ROOM_SEARCH_RESULTS.validate_python(
+            [{**hotel_room_values(r[:-1]), "base_price": r[-1]} for r in rows]
+        )
+
+    async def add_many(self, rooms: list[dto.HotelRoom]) -> list[dto.HotelRoomWithID]:
+        created = [dto.HotelRoomWithID(id=uuid4(), **r.model_dump()) for r in rooms]
+
+        await copy_records(
+            self.db,
+            HotelRoom.__tablename__,
+            [c.key for c in HOTEL_ROOM_COLUMNS],
+            [
+                (
+                    r.id,
+                    r.hotel_id,
+                    r.name,
+                    r.description,
+                    r.price_per_night.currency_code.value,
+                    r.price_per_night.amount,
+                    r.numbers,
+                )
+                for r in created
+            ],
+        )
+
+        return created
+
+    async def upsert_many(
+        self, rooms: list[dto.HotelRoomWithID]
+    ) -> list[dto.HotelRoomWithID]:
+        if not rooms:
+            return []
+
+        stmt = insert(HotelRoom.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[HotelRoom.id],
+            set_={
+                "name": stmt.excluded.name,
+                "description": stmt.excluded.description,
+                "price_per_night_currency_code": (
+                    stmt.excluded.price_per_night_currency_code
+                ),
+                "price_per_night": stmt.excluded.price_per_night,
+                "numbers": stmt.excluded.numbers,
+            },
+            where=HotelRoom.hotel_id == stmt.excluded.hotel_id,
+        ).returning(*HOTEL_ROOM_COLUMNS)
+
+        rows = (
+            await self.db.execute(
+                stmt,
+                [
+                    {
+                        "id": r.id,
+                        "hotel_id": r.hotel_id,
+                        "name": r.name,
+                        "description": r.description,
+                        "price_per_night_currency_code": (
+                            r.price_per_night.currency_code
+                        ),
+                        "price_per_night": r.price_per_night.amount,
+                        "numbers": r.numbers,
+                    }
+                    for r in rooms
+                ],
+            )
+        ).all()
+
+        return HOTEL_ROOMS.validate_python([hotel_room_values(r) for r in rows])
 
 
 class HotelReviewDao(i.HotelReviewDao):
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, rate_hotels: bool = True):
+        # without rate_hotels the hotel's rating is left to the rating worker
         self.db = db
+        self.rate_hotels = rate_hotels
 
     @staticmethod
     def __to_dto(review: HotelReview) -> dto.HotelReviewWithID:
@@ -168,21 +810,55 @@ class HotelReviewDao(i.HotelReviewDao):
         )
 
     async def get(self, review_id: UUID) -> dto.HotelReviewWithID | None:
-        stmt = select(HotelReview).where(HotelReview.id == review_id)
-        review = (await self.db.execute(stmt)).scalar_one_or_none()
+        stmt = select(*HOTEL_REVIEW_COLUMNS).where(HotelReview.id == review_id)
+        row = (await self.db.execute(stmt)).one_or_none()
 
-        if review is None:
+        if row is None:
             return None
 
-        return self.__to_dto(review)
+        return dto.HotelReviewWithID.model_validate(hotel_review_values(row))
 
-    async def add(self, review: dto.HotelReview) -> dto.HotelReviewWithID:
-        orm_review = self.__to_orm(review)
+    async def add(self, review: dto.HotelReview) -> dto.HotelReviewWithID | None:
+        review_id = uuid4()
 
-        self.db.add(orm_review)
-        await self.db.flush()
+        if self.rate_hotels:
+            rated = (
+                update(Hotel)
+                .where(Hotel.id == review.hotel_id)
+                .values(
+                    rating_average=(
+                        Hotel.rating_average * Hotel.rating_num_votes + review.rating
+                    )
+                    / (Hotel.rating_num_votes + 1),
+                    rating_num_votes=Hotel.rating_num_votes + 1,
+                )
+                .returning(Hotel.id)
+                .cte("rated_hotel")
+            )
+        else:
+            rated = (
+                select(Hotel.id).where(Hotel.id == review.hotel_id).cte("target_hotel")
+            )
+        stmt = (
+            insert(HotelReview)
+            .from_select(
+                ["id", "author_id", "hotel_id", "rating", "comment", "date_created"],
+                select(
+                    literal(review_id),
+                    literal(review.author_id),
+                    rated.c.id,
+                    literal(review.rating),
+                    literal(review.comment),
+                    literal(review.date_created),
+                ),
+            )
+            .returning(HotelReview.id)
+        )
 
-        return self.__to_dto(orm_review)
+        if (await self.db.execute(stmt)).scalar_one_or_none() is None:
+            return None
+
+        return dto.HotelReviewWithID(id=review_id, **review.model_dump())
 
     async def update(self, review: dto.HotelReviewWithID) -> dto.HotelReviewWithID:
         orm_review = self.__to_orm(review)
@@ -193,17 +869,557 @@ class HotelReviewDao(i.HotelReviewDao):
         return self.__to_dto(orm_review)
 
     async def delete(self, review_id: UUID) -> None:
-        stmt = delete(HotelReview).where(HotelReview.id == review_id)
+        removed = (
+            delete(HotelReview)
+            .where(HotelReview.id == review_id)
+            .returning(HotelReview.hotel_id, HotelReview.rating)
+            .cte("removed_review")
+        )
+        await self.db.execute(self.__unrate(removed))
+
+    async def delete_if_authored(
+        self, review_id: UUID, author_id: UUID
+    ) -> dto.HotelReviewWithID:
+        # target sees the review whoever wrote it, the DELETE only when author_id
+        # matches, so one round trip tells "not found" from "not authored"
+        target = (
+            select(HotelReview.id, HotelReview.author_id)
+            .where(HotelReview.id == review_id)
+            .cte("target")
+        )
+        removed = (
+            delete(HotelReview)
+            .where(HotelReview.id == target.c.id, target.c.author_id == author_id)
+            .returning(*HOTEL_REVIEW_COLUMNS)
+            .cte("removed_review")
+        )
+        joined = target.outerjoin(removed, true())
+
+        if self.rate_hotels:
+            unrated = self.__unrate(removed).returning(Hotel.id).cte("unrated_hotel")
+            joined = joined.outerjoin(unrated, true())
+
+        stmt = select(target.c.author_id, removed).select_from(joined)
+
+        row = (await self.db.execute(stmt)).one_or_none()
+
+        if row is None:
+            raise exc.ResourceNotFoundError("review", review_id)
+
+        if row[1] is None:
+            raise exc.NotOwnedError("review", author_id)
+
+        return dto.HotelReviewWithID.model_validate(hotel_review_values(row[1:]))
+
+    @staticmethod
+    def __unrate(removed):
+        return (
+            update(Hotel)
+            .where(Hotel.id == removed.c.hotel_id)
+            .values(
+                rating_average=case(
+                    (
+                        Hotel.rating_num_votes > 1,
+                        (
+                            Hotel.rating_average * Hotel.rating_num_votes
+                            - removed.c.rating
+                        )
+                        / (Hotel.rating_num_votes - 1),
+                    ),
+                    else_=0.0,
+                ),
+                rating_num_votes=Hotel.rating_num_votes - 1,
+            )
+        )
+
+    @staticmethod
+    def __newest_first(stmt, limit: int, after: tuple[date, UUID] | None):
+        stmt = stmt.order_by(
+            HotelReview.date_created.desc(), HotelReview.id.desc()
+        ).limit(limit)
+
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(HotelReview.date_created, HotelReview.id) < tuple_(*after)
+            )
+
+        return stmt
+
+    async def by_hotel(
+        self, hotel_id: UUID, limit: int, after: tuple[date, UUID] | None = None
+    ) -> list[dto.HotelReviewWithID]:
+        stmt = select(*HOTEL_REVIEW_COLUMNS).where(HotelReview.hotel_id == hotel_id)
+        stmt = self.__newest_first(stmt, limit, after)
+        rows = (await self.db.execute(stmt)).all()
+
+        return HOTEL_REVIEWS.validate_python([hotel_review_values(r) for r in rows])
+
+    async def stream_by_hotel(
+        self, hotel_id: UUID, chunk_size: int
+    ) -> AsyncIterator[list[dto.HotelReviewWithID]]:
+        stmt = (
+            select(*HOTEL_REVIEW_COLUMNS)
+            .where(HotelReview.hotel_id == hotel_id)
+            .order_by(HotelReview.date_created.desc(), HotelReview.id.desc())
+            .execution_options(yield_per=chunk_size)
+        )
+
+        # server-side cursors need a transaction, even in a read-only session that
+        # otherwise runs in autocommit
+        await self.db.connection(
+            execution_options={"isolation_level": "READ COMMITTED"}
+        )
+
+        # only one chunk of rows is held in memory at a time
+        result = await self.db.stream(stmt)
+        async for rows in result.partitions():
+            yield HOTEL_REVIEWS.validate_python([hotel_review_values(r) for r in rows])
+
+    async def by_author(
+        self, author_id: UUID, limit: int, after: tuple[date, UUID] | None = None
+    ) -> list[dto.HotelReviewWithID]:
+        stmt = select(*HOTEL_REVIEW_COLUMNS).where(HotelReview.author_id == author_id)
+        stmt = self.__newest_first(stmt, limit, after)
+        rows = (await self.db.execute(stmt)).all()
+
+        return HOTEL_REVIEWS.validate_python([hotel_review_values(r) for r in rows])
+
+
+class HotelRatingStatsDao(i.HotelRatingStatsDao):
+    """Reads the star counts and daily review rollups that triggers keep on
+    every hotel_review write, so no answer scans the reviews themselves."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def __select(since: date):
+        recent = (
+            select(
+                func.coalesce(func.sum(HotelReviewDaily.reviews), 0).label("reviews"),
+                func.coalesce(func.sum(HotelReviewDaily.rating_total), 0).label(
+                    "rating_total"
+                ),
+            )
+            .where(HotelReviewDaily.hotel_id == Hotel.id, HotelReviewDaily.day >= since)
+            .lateral("recent")
+        )
+
+        return (
+            select(Hotel.id, *STARS_COLUMNS, *recent.c)
+            .select_from(Hotel)
+            .outerjoin(HotelRatingStats, HotelRatingStats.hotel_id == Hotel.id)
+            .join(recent, true())
+        )
+
+    async def get(self, hotel_id: UUID, since: date) -> dto.HotelRatingStats | None:
+        stmt = self.__select(since).where(Hotel.id == hotel_id)
+        row = (await self.db.execute(stmt)).one_or_none()
+
+        if row is None:
+            return None
+
+        return dto.HotelRatingStats.model_validate(rating_stats_values(row, since))
+
+    async def by_owner(
+        self, owner_id: UUID, since: date, limit: int, after: UUID | None = None
+    ) -> list[dto.HotelRatingStats]:
+        stmt = (
+            self.__select(since)
+            .where(Hotel.owner_id == owner_id)
+            .order_by(Hotel.id)
+            .limit(limit)
+        )
+
+        if after is not None:
+            stmt = stmt.where(Hotel.id > after)
+
+        rows = (await self.db.execute(stmt)).all()
+
+        return HOTEL_RATING_STATS.validate_python(
+            [rating_stats_values(r, since) for r in rows]
+        )
+
+    async def daily(self, hotel_id: UUID, since: date) -> list[dto.HotelReviewDay]:
+        # deleting a day's reviews leaves its row at zero
+        stmt = (
+            select(
+                HotelReviewDaily.day,
+                HotelReviewDaily.reviews,
+                HotelReviewDaily.rating_total,
+            )
+            .where(
+                HotelReviewDaily.hotel_id == hotel_id,
+                HotelReviewDaily.day >= since,
+                HotelReviewDaily.reviews > 0,
+            )
+            .order_by(HotelReviewDaily.day)
+        )
+
+        rows = (await self.db.execute(stmt)).all()
+
+        return HOTEL_REVIEW_DAYS.validate_python(
+            [
+                {"day": day, "num_reviews": n, "average": average(total, n)}
+                for day, n, total in rows
+            ]
+        )
+
+
+class HotelReservationDao(i.HotelReservationDao):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, reservation_id: UUID) -> dto.ReservationWithID | None:
+        stmt = select(*HOTEL_RESERVATION_COLUMNS).where(
+            HotelReservation.id == reservation_id
+        )
+        row = (await self.db.execute(stmt)).one_or_none()
+
+        if row is None:
+            return None
+
+        return dto.ReservationWithID.model_validate(hotel_reservation_values(row))
+
+    async def add(self, reservation: dto.Reservation) -> dto.ReservationWithID | None:
+        reservation_id = uuid4()
+
+        # the room row vouches for the hotel and the number, the exclusion
+        # constraint turns an overlapping stay into an empty result
+        stmt = (
+            insert(HotelReservation)
+            .from_select(
+                ["id", "guest_id", "hotel_id", "room_id", "number", "stay"],
+                select(
+                    literal(reservation_id),
+                    literal(reservation.guest_id),
+                    HotelRoom.hotel_id,
+                    HotelRoom.id,
+                    literal(reservation.number),
+                    literal(
+                        Range(reservation.check_in, reservation.check_out),
+                        HotelReservation.stay.type,
+                    ),
+                ).where(
+                    HotelRoom.id == reservation.room_id,
+                    HotelRoom.hotel_id == reservation.hotel_id,
+                    HotelRoom.numbers.any_() == reservation.number,
+                ),
+            )
+            .on_conflict_do_nothing()
+            .returning(HotelReservation.id)
+        )
+
+        if (await self.db.execute(stmt)).scalar_one_or_none() is None:
+            return None
+
+        return dto.ReservationWithID(id=reservation_id, **reservation.model_dump())
+
+    async def delete_if_guest(
+        self, reservation_id: UUID, guest_id: UUID
+    ) -> dto.ReservationWithID:
+        target = (
+            select(HotelReservation.id, HotelReservation.guest_id)
+            .where(HotelReservation.id == reservation_id)
+            .cte("target")
+        )
+        removed = (
+            delete(HotelReservation)
+            .where(HotelReservation.id == target.c.id, target.c.guest_id == guest_id)
+            .returning(*HOTEL_RESERVATION_COLUMNS)
+            .cte("removed_reservation")
+        )
+        stmt = select(target.c.guest_id, removed).select_from(
+            target.outerjoin(removed, true())
+        )
+
+        row = (await self.db.execute(stmt)).one_or_none()
+
+        if row is None:
+            raise exc.ResourceNotFoundError("reservation", reservation_id)
+
+        if row[1] is None:
+            raise exc.NotOwnedError("reservation", guest_id)
+
+        return dto.ReservationWithID.model_validate(hotel_reservation_values(row[1:]))
+
+    async def by_hotel(
+        self, hotel_id: UUID, start: date, end: date
+    ) -> list[dto.ReservationWithID]:
+        stmt = select(*HOTEL_RESERVATION_COLUMNS).where(
+            HotelReservation.hotel_id == hotel_id,
+            HotelReservation.stay.overlaps(Range(start, end)),
+        )
+        rows = (await self.db.execute(stmt)).all()
+
+        return HOTEL_RESERVATIONS.validate_python(
+            [hotel_reservation_values(r) for r in rows]
+        )
+
+    async def available(
+        self, hotel_id: UUID, check_in: date, check_out: date
+    ) -> list[dto.HotelRoomAvailability]:
+        found = await self.available_by_hotels([hotel_id], check_in, check_out)
+        return found.get(hotel_id, [])
+
+    async def available_by_hotels(
+        self, hotel_ids: list[UUID], check_in: date, check_out: date
+    ) -> dict[UUID, list[dto.HotelRoomAvailability]]:
+        # a number taken under any room type of the hotel is taken for all
+        taken = select(HotelReservation.number).where(
+            HotelReservation.hotel_id == HotelRoom.hotel_id,
+            HotelReservation.stay.overlaps(Range(check_in, check_out)),
+        )
+        stmt = (
+            select(
+                HotelRoom.hotel_id,
+                HotelRoom.id,
+                HotelRoom.numbers,
+                func.array(taken.scalar_subquery()),
+            )
+            .where(HotelRoom.hotel_id.in_(hotel_ids))
+            .order_by(HotelRoom.hotel_id, HotelRoom.id)
+        )
+        found: dict[UUID, list[dto.HotelRoomAvailability]] = {}
+
+        for hotel_id, room_id, numbers, taken in (await self.db.execute(stmt)).all():
+            taken = set(taken)
+            free = [n for n in dict.fromkeys(numbers) if n not in taken]
+            found.setdefault(hotel_id, []).append(
+                dto.HotelRoomAvailability(room_id=room_id, numbers=free)
+            )
+
+        return found
+
+
+class FxRateDao(i.FxRateDao):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def rates(self) -> dict[CurrencyCode, float]:
+        rows = (await self.db.execute(select(FxRate.currency_code, FxRate.rate))).all()
+
+        return {code: rate for code, rate in rows}
+
+    async def set_rates(self, rates: dict[CurrencyCode, float]) -> None:
+        if not rates:
+            return
+
+        # one statement: the upserted rates feed the update of matching rooms
+        upserted = insert(FxRate).values(
+            [{"currency_code": c, "rate": r} for c, r in rates.items()]
+        )
+        upserted = (
+            upserted.on_conflict_do_update(
+                index_elements=[FxRate.currency_code],
+                set_={"rate": upserted.excluded.rate, "updated_at": func.now()},
+            )
+            .returning(FxRate.currency_code, FxRate.rate)
+            .cte("upserted_rate")
+        )
+        stmt = (
+            update(HotelRoom)
+            .where(HotelRoom.price_per_night_currency_code == upserted.c.currency_code)
+            .values(price_per_night_base=HotelRoom.price_per_night * upserted.c.rate)
+        )
+
         await self.db.execute(stmt)
 
-    async def by_hotel(self, hotel_id: UUID) -> list[dto.HotelReviewWithID]:
-        stmt = select(HotelReview).where(HotelReview.hotel_id == hotel_id)
-        reviews = (await self.db.execute(stmt)).scalars().all()
 
-        return [self.__to_dto(r) for r in reviews]
+class HotelRatingDao:
+    """Hotel ratings maintained apart from the review writes, see RATING_MODE."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def apply(self, deltas: dict[UUID, tuple[int, int]]) -> None:
+        """Add (votes, rating total) to each hotel, one UPDATE per hotel."""
+        if not deltas:
+            return
+
+        hotel = Hotel.__table__.c
+        votes = hotel.rating_num_votes + bindparam("votes")
+        stmt = (
+            update(Hotel.__table__)
+            .where(hotel.id == bindparam("hotel_id"))
+            .values(
+                rating_average=case(
+                    (
+                        votes > 0,
+                        (
+                            hotel.rating_average * hotel.rating_num_votes
+                            + bindparam("total", type_=Integer)
+                        )
+                        / votes,
+                    ),
+                    else_=0.0,
+                ),
+                rating_num_votes=votes,
+            )
+        )
 
-    async def by_author(self, author_id: UUID) -> list[dto.HotelReviewWithID]:
-        stmt = select(HotelReview).where(HotelReview.author_id == author_id)
-        reviews = (await self.db.execute(stmt)).scalars().all()
+        # a fixed order keeps concurrent batches from deadlocking on hotel rows
+        await self.db.execute(
+            stmt,
+            [
+                {"hotel_id": hotel_id, "votes": n, "total": total}
+                for hotel_id, (n, total) in sorted(deltas.items())
+            ],
+        )
 
-        return [self.__to_dto(r) for r in reviews]
+    async def reconcile(
+        self, after: UUID | None, limit: int
+    ) -> tuple[UUID | None, int]:
+        """Recompute the ratings of the next `limit` hotels by id from their
+        reviews. Returns the last hotel id of the batch and how many were fixed.
+
+        Hotels with review events still in the outbox are skipped, their rating
+        is about to move. A hotel whose rating changes while this statement runs
+        keeps the newer value, the recomputed one may already be out of date.
+        """
+        batch = select(Hotel.id, Hotel.rating_average, Hotel.rating_num_votes)
+        if after is not None:
+            batch = batch.where(Hotel.id > after)
+        batch = batch.order_by(Hotel.id).limit(limit).cte("batch")
+
+        counted = (
+            select(
+                batch.c.id,
+                batch.c.rating_average,
+                batch.c.rating_num_votes,
+                func.coalesce(func.avg(HotelReview.rating).cast(Float), 0.0).label(
+                    "average"
+                ),
+                func.count(HotelReview.id).label("votes"),
+            )
+            .select_from(
+                batch.outerjoin(HotelReview, HotelReview.hotel_id == batch.c.id)
+            )
+            .group_by(batch.c.id, batch.c.rating_average, batch.c.rating_num_votes)
+            .cte("counted")
+        )
+        pending = select(OutboxEvent.key).where(
+            OutboxEvent.type.in_(
+                [EventType.REVIEW_CREATED.value, EventType.REVIEW_DELETED.value]
+            )
+        )
+        fixed = (
+            update(Hotel)
+            .where(
+                Hotel.id == counted.c.id,
+                # rechecked against a row updated concurrently
+                Hotel.rating_num_votes == counted.c.rating_num_votes,
+                Hotel.rating_average == counted.c.rating_average,
+                or_(
+                    Hotel.rating_num_votes != counted.c.votes,
+                    func.abs(Hotel.rating_average - counted.c.average) > 1e-6,
+                ),
+                Hotel.id.not_in(pending),
+            )
+            .values(rating_average=counted.c.average, rating_num_votes=counted.c.votes)
+            .returning(Hotel.id)
+            .cte("fixed")
+        )
+        stmt = select(
+            select(batch.c.id).order_by(batch.c.id.desc()).limit(1).scalar_subquery(),
+            select(func.count()).select_from(fixed).scalar_subquery(),
+        )
+
+        last, n = (await self.db.execute(stmt)).one()
+
+        return last, n
+
+
+class ReadModelDao:
+    """Raw hotel and room rows for the in-process read model, hotels with their
+    version last."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def hotels(self, after: UUID | None, limit: int) -> Sequence[Row]:
+        stmt = select(*HOTEL_COLUMNS, HOTEL_VERSION).order_by(Hotel.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(Hotel.id > after)
+
+        return (await self.db.execute(stmt)).all()
+
+    async def rooms(self, after: UUID | None, limit: int) -> Sequence[Row]:
+        stmt = select(*HOTEL_ROOM_COLUMNS).order_by(HotelRoom.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(HotelRoom.id > after)
+
+        return (await self.db.execute(stmt)).all()
+
+    async def hotels_by_id(self, hotel_ids: list[UUID]) -> Sequence[Row]:
+        stmt = select(*HOTEL_COLUMNS, HOTEL_VERSION).where(Hotel.id.in_(hotel_ids))
+        return (await self.db.execute(stmt)).all()
+
+    async def rooms_by_id(self, room_ids: list[UUID]) -> Sequence[Row]:
+        stmt = select(*HOTEL_ROOM_COLUMNS).where(HotelRoom.id.in_(room_ids))
+        return (await self.db.execute(stmt)).all()
+
+    async def rooms_of(self, hotel_id: UUID) -> Sequence[Row]:
+        stmt = select(*HOTEL_ROOM_COLUMNS).where(HotelRoom.hotel_id == hotel_id)
+        return (await self.db.execute(stmt)).all()
+
+
+class OutboxDao:
+    """Domain events waiting in the outbox_event table to be published."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add_many(self, events: list[dto.Event]) -> None:
+        if not events:
+            return
+
+        await self.db.execute(
+            insert(OutboxEvent),
+            [
+                {
+                    "id": e.id,
+                    "type": e.type.value,
+                    "key": e.key,
+                    "payload": e.payload,
+                    "created_at": e.created_at,
+                }
+                for e in events
+            ],
+        )
+
+    async def take(self, limit: int) -> list[dto.Event]:
+        """Delete and return the oldest events. They come back if the transaction
+        rolls back, and concurrent relays skip them until it ends."""
+        oldest = (
+            select(OutboxEvent.position)
+            .order_by(OutboxEvent.position)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            delete(OutboxEvent)
+            .where(OutboxEvent.position.in_(oldest.scalar_subquery()))
+            .returning(
+                OutboxEvent.position,
+                OutboxEvent.id,
+                OutboxEvent.type,
+                OutboxEvent.key,
+                OutboxEvent.payload,
+                OutboxEvent.created_at,
+            )
+        )
+        rows = sorted((await self.db.execute(stmt)).all())
+
+        return EVENTS.validate_python(
+            [
+                {
+                    "id": id,
+                    "type": type,
+                    "key": key,
+                    "payload": payload,
+                    "created_at": created_at,
+                }
+                for _, id, type, key, payload, created_at in rows
+            ]
+        )
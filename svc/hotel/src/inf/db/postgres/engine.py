@@ -1,21 +1,237 @@
+import asyncio
+import math
+import os
+import time
 from contextlib import asynccontextmanager
+from typing import Iterable
+from uuid import UUID
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.inf.metrics import Gauge, Histogram, current_request, registry
+
 from . import config
+from .routing import ReplicaRouter
+
+STATEMENT_SECONDS = registry.register(
+    Histogram(
+        "db_statement_duration_seconds", "SQL statement execution time.", ("engine",)
+    )
+)
+POOL_WAIT_SECONDS = registry.register(
+    Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time spent waiting for a pooled connection.",
+        ("engine",),
+    )
+)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(config.ALCHEMY_DB_URI, echo=False)
-smaker = async_sessionmaker(
-    engine, autocommit=False, autoflush=False, expire_on_commit=False
+def read_only_sessions(engine: AsyncEngine) -> async_sessionmaker:
+    # For engines made with read_only. Reads run in autocommit, so a lone SELECT
+    # costs no BEGIN/COMMIT round trips, and the server still refuses writes:
+    # the connections default every transaction, implicit ones included, to
+    # READ ONLY.
+    return async_sessionmaker(
+        engine.execution_options(isolation_level="AUTOCOMMIT"),
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool recording how long each checkout waited, under its logging name."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            POOL_WAIT_SECONDS.observe(waited, self.logging_name)
+
+            if (stats := current_request.get()) is not None:
+                stats.pool_wait_seconds += waited
+
+    @property
+    def capacity(self) -> float:
+        return self.size() + self._max_overflow if self._max_overflow >= 0 else math.inf
+
+
+def instrument(engine: AsyncEngine, name: str) -> AsyncEngine:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def started(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def finished(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["statement_start"].pop()
+        STATEMENT_SECONDS.observe(elapsed, name)
+
+        if (stats := current_request.get()) is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def failed(context):
+        if context.connection is not None and context.connection.info.get(
+            "statement_start"
+        ):
+            context.connection.info["statement_start"].pop()
+
+    return engine
+
+
+def create_engine(uri: str, name: str, read_only: bool = False) -> AsyncEngine:
+    settings = {"default_transaction_read_only": "on"} if read_only else {}
+
+    return instrument(
+        create_async_engine(
+            uri,
+            echo=False,
+            connect_args={"server_settings": settings},
+            poolclass=TimedQueuePool,
+            pool_logging_name=name,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_pre_ping=config.DB_POOL_PRE_PING,
+        ),
+        name,
+    )
+
+
+async def fill(engine: AsyncEngine, connections: int) -> None:
+    """Open the connections at once and hand them back, the pool keeps them."""
+    conns = [engine.connect() for _ in range(min(connections, engine.pool.size()))]
+    try:
+        await asyncio.gather(*(c.start() for c in conns))
+    finally:
+        await asyncio.gather(*(c.close() for c in conns if c.sync_connection))
+
+
+class Database:
+    """The engines of this process and the replica router over them.
+
+    `open` makes them: the web app's lifespan in each worker, scripts on first
+    use. Pools never cross a fork, a process finding its parent's engines drops
+    them without closing the parent's connections and makes its own.
+    """
+
+    def __init__(self):
+        self.engines: list[AsyncEngine] = []
+        self.__router: ReplicaRouter | None = None
+        self.__pid: int | None = None
+
+    def open(self) -> ReplicaRouter:
+        if self.__router is not None and self.__pid == os.getpid():
+            return self.__router
+
+        for inherited in self.engines:
+            inherited.sync_engine.dispose(close=False)
+
+        primary = create_engine(config.ALCHEMY_DB_URI, "primary")
+        primary_read_only = create_engine(
+            config.ALCHEMY_DB_URI, "primary_read_only", read_only=True
+        )
+        replicas = [
+            create_engine(uri, f"replica{n}", read_only=True)
+            for n, uri in enumerate(config.DB_REPLICA_URIS)
+        ]
+
+        self.engines = [primary, primary_read_only, *replicas]
+        self.__router = ReplicaRouter(
+            async_sessionmaker(
+                primary, autocommit=False, autoflush=False, expire_on_commit=False
+            ),
+            read_only_sessions(primary_read_only),
+            [(replica, read_only_sessions(replica)) for replica in replicas],
+            check_interval=config.DB_REPLICA_CHECK_INTERVAL,
+            sticky_window=config.DB_STICKY_WINDOW,
+        )
+        self.__pid = os.getpid()
+
+        return self.__router
+
+    async def warm(self, connections: int) -> None:
+        # an unreachable replica must not keep the app from starting, the
+        # router's probe takes it out of rotation
+        self.open()
+        primary, primary_read_only, *replicas = self.engines
+
+        await asyncio.gather(
+            fill(primary, connections), fill(primary_read_only, connections)
+        )
+        await asyncio.gather(
+            *(fill(r, connections) for r in replicas), return_exceptions=True
+        )
+
+    async def close(self) -> None:
+        if self.__router is None or self.__pid != os.getpid():
+            return
+
+        await self.__router.close()
+        await asyncio.gather(*(e.dispose() for e in self.engines))
+
+        self.engines, self.__router, self.__pid = [], None, None
+
+    def session(self, read_only: bool, affinity: Iterable[UUID] = ()) -> AsyncSession:
+        return self.open().session(read_only, affinity)
+
+    def primary_read_only(self) -> AsyncSession:
+        return self.open().primary_read_only()
+
+    def mark_written(self, affinity: Iterable[UUID]) -> None:
+        self.open().mark_written(affinity)
+
+
+database = Database()
+
+
+def pool_connections() -> Iterable[tuple[tuple[str, ...], float]]:
+    for e in database.engines:
+        name = e.pool.logging_name
+        yield (name, "checked_out"), e.pool.checkedout()
+        yield (name, "idle"), e.pool.checkedin()
+
+
+def pool_saturation() -> Iterable[tuple[tuple[str, ...], float]]:
+    for e in database.engines:
+        yield (e.pool.logging_name,), e.pool.checkedout() / e.pool.capacity
+
+
+registry.register(
+    Gauge(
+        "db_pool_connections",
+        "Pooled connections by state.",
+        ("engine", "state"),
+        pool_connections,
+    )
+)
+registry.register(
+    Gauge(
+        "db_pool_saturation",
+        "Checked out connections over the pool's capacity.",
+        ("engine",),
+        pool_saturation,
+    )
 )
 
 
 @asynccontextmanager
 async def get_db():
-    async with smaker() as session:
+    async with database.open().primary() as session:
         yield session
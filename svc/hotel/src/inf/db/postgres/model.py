@@ -1,13 +1,56 @@
-from datetime import date
+from datetime import date, datetime
+from typing import Any
 from uuid import UUID, uuid4
-from sqlalchemy import ARRAY, ForeignKey, Integer
+from sqlalchemy import (
+    ARRAY,
+    BigInteger,
+    CheckConstraint,
+    Computed,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Identity,
+    Index,
+    Integer,
+    func,
+)
+from sqlalchemy.dialects.postgresql import (
+    DATERANGE,
+    JSONB,
+    TSVECTOR,
+    ExcludeConstraint,
+    Range,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
+from src.app.enum import CountryCode, CurrencyCode
+
 from .engine import Base
 
 
+def enum_values(enum: type) -> list[str]:
+    return [member.value for member in enum]
+
+
+# native postgres enums; SQLAlchemy maps result values back to members through
+# a precomputed value -> member table instead of calling the Enum class per row
+COUNTRY_CODE = Enum(CountryCode, name="country_code", values_callable=enum_values)
+CURRENCY_CODE = Enum(CurrencyCode, name="currency_code", values_callable=enum_values)
+
+
 class Hotel(Base):
     __tablename__ = "hotel"
+    __table_args__ = (
+        Index("ix_hotel_owner_id_id", "owner_id", "id"),
+        Index(
+            "ix_hotel_location_country_code_rating_average_id",
+            "location_country_code",
+            "rating_average",
+            "id",
+        ),
+        Index("ix_hotel_rating_average_id", "rating_average", "id"),
+        Index("ix_hotel_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     owner_id: Mapped[UUID]
@@ -15,15 +58,39 @@ class Hotel(Base):
     name: Mapped[str]
     description: Mapped[str]
 
-    location_country_code: Mapped[str]
+    location_country_code: Mapped[CountryCode] = mapped_column(COUNTRY_CODE)
     location_address: Mapped[str]
 
     rating_average: Mapped[float]
     rating_num_votes: Mapped[int]
 
+    # bumped by triggers on every write to the hotel or its rooms, review writes
+    # bump HotelRatingStats.review_version instead
+    version: Mapped[int] = mapped_column(BigInteger, server_default="1")
+
+    # the 'simple' configuration does not stem, hotels are named in many languages
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple'::regconfig, name), 'A')"
+            " || setweight(to_tsvector('simple'::regconfig, description), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
 
 class HotelRoom(Base):
     __tablename__ = "hotel_room"
+    __table_args__ = (
+        Index("ix_hotel_room_hotel_id_id", "hotel_id", "id"),
+        Index(
+            "ix_hotel_room_hotel_id_price_per_night_base",
+            "hotel_id",
+            "price_per_night_base",
+        ),
+        Index("ix_hotel_room_price_per_night_base_id", "price_per_night_base", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
 
@@ -32,14 +99,29 @@ class HotelRoom(Base):
     name: Mapped[str]
     description: Mapped[str]
 
-    price_per_night_currency_code: Mapped[str]
+    price_per_night_currency_code: Mapped[CurrencyCode] = mapped_column(CURRENCY_CODE)
     price_per_night: Mapped[float]
+    # price in the fx base currency, kept by a trigger on write and by
+    # FxRateDao.set_rates when rates change; null while the currency has no rate
+    price_per_night_base: Mapped[float | None] = mapped_column(deferred=True)
 
     numbers: Mapped[list[int]] = mapped_column(ARRAY(Integer))
 
 
 class HotelReview(Base):
     __tablename__ = "hotel_review"
+    __table_args__ = (
+        Index(
+            "ix_hotel_review_hotel_id_date_created_id", "hotel_id", "date_created", "id"
+        ),
+        Index(
+            "ix_hotel_review_author_id_date_created_id",
+            "author_id",
+            "date_created",
+            "id",
+        ),
+        CheckConstraint("rating BETWEEN 1 AND 5", name="ck_hotel_review_rating"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     author_id: Mapped[UUID]
@@ -50,3 +132,92 @@ class HotelReview(Base):
     comment: Mapped[str]
 
     date_created: Mapped[date]
+
+
+# the two tables below are kept by statement triggers on hotel_review, in the
+# transaction of the write, and never written by the application
+
+
+class HotelRatingStats(Base):
+    __tablename__ = "hotel_rating_stats"
+
+    hotel_id: Mapped[UUID] = mapped_column(
+        ForeignKey("hotel.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    # number of reviews rating the hotel 1 to 5 stars
+    stars_1: Mapped[int] = mapped_column(server_default="0")
+    stars_2: Mapped[int] = mapped_column(server_default="0")
+    stars_3: Mapped[int] = mapped_column(server_default="0")
+    stars_4: Mapped[int] = mapped_column(server_default="0")
+    stars_5: Mapped[int] = mapped_column(server_default="0")
+
+    # bumped with the counts by every review write
+    review_version: Mapped[int] = mapped_column(BigInteger, server_default="0")
+
+
+class HotelReviewDaily(Base):
+    __tablename__ = "hotel_review_daily"
+
+    hotel_id: Mapped[UUID] = mapped_column(
+        ForeignKey("hotel.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(primary_key=True)
+
+    reviews: Mapped[int] = mapped_column(server_default="0")
+    rating_total: Mapped[int] = mapped_column(server_default="0")
+
+
+class HotelReservation(Base):
+    __tablename__ = "hotel_reservation"
+    __table_args__ = (
+        # one physical room number can not be booked twice for the same night;
+        # numbers belong to the hotel, room types may share them
+        ExcludeConstraint(
+            ("hotel_id", "="),
+            ("number", "="),
+            ("stay", "&&"),
+            name="ex_hotel_reservation_hotel_id_number_stay",
+            using="gist",
+        ),
+        Index(
+            "ix_hotel_reservation_hotel_id_stay",
+            "hotel_id",
+            "stay",
+            postgresql_using="gist",
+        ),
+    )
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    guest_id: Mapped[UUID]
+
+    hotel_id: Mapped[UUID] = mapped_column(ForeignKey("hotel.id"))
+    room_id: Mapped[UUID] = mapped_column(ForeignKey("hotel_room.id"))
+    number: Mapped[int]
+
+    stay: Mapped[Range[date]] = mapped_column(DATERANGE)
+
+
+class FxRate(Base):
+    __tablename__ = "fx_rate"
+
+    currency_code: Mapped[CurrencyCode] = mapped_column(CURRENCY_CODE, primary_key=True)
+
+    # value of one unit of the currency in the base currency
+    rate: Mapped[float]
+
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_event"
+
+    # insertion order of the events, the relay publishes in this order
+    position: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+
+    id: Mapped[UUID]
+    type: Mapped[str]
+    key: Mapped[UUID]
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,95 @@
+import asyncio
+import itertools
+import time
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+
+class ReplicaRouter:
+    """Hands out sessions on the primary or on a healthy replica.
+
+    Read-only work is spread round-robin over replicas that passed the last
+    health probe. Keys written on this process (users, hotels) stay pinned to
+    the primary for `sticky_window` seconds so their readers see the write
+    despite replication lag.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        primary_read_only: async_sessionmaker[AsyncSession],
+        replicas: list[tuple[AsyncEngine, async_sessionmaker[AsyncSession]]],
+        check_interval: float,
+        sticky_window: float,
+    ):
+        self.primary = primary
+        self.primary_read_only = primary_read_only
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self.sticky_window = sticky_window
+
+        self.__healthy = [False] * len(replicas)
+        self.__turn = itertools.count()
+        self.__written: dict[UUID, float] = {}
+        self.__probe: asyncio.Task | None = None
+
+    def session(self, read_only: bool, affinity: Iterable[UUID] = ()) -> AsyncSession:
+        if not read_only:
+            return self.primary()
+
+        if not self.replicas or self.__is_sticky(affinity):
+            return self.primary_read_only()
+
+        self.__ensure_probing()
+
+        healthy = [r for r, ok in zip(self.replicas, self.__healthy) if ok]
+        if not healthy:
+            return self.primary_read_only()
+
+        _, smaker = healthy[next(self.__turn) % len(healthy)]
+        return smaker()
+
+    async def close(self) -> None:
+        if self.__probe is not None:
+            self.__probe.cancel()
+            self.__probe = None
+
+    def mark_written(self, affinity: Iterable[UUID]) -> None:
+        now = time.monotonic()
+
+        if len(self.__written) > 100_000:
+            self.__written = {k: t for k, t in self.__written.items() if t > now}
+
+        for key in affinity:
+            self.__written[key] = now + self.sticky_window
+
+    def __is_sticky(self, affinity: Iterable[UUID]) -> bool:
+        now = time.monotonic()
+        return any(self.__written.get(key, 0) > now for key in affinity)
+
+    def __ensure_probing(self) -> None:
+        if self.__probe is None or self.__probe.done():
+            self.__probe = asyncio.create_task(self.__probe_forever())
+
+    async def __probe_forever(self) -> None:
+        while True:
+            await asyncio.gather(
+                *(
+                    self.__check(n, engine)
+                    for n, (engine, _) in enumerate(self.replicas)
+                )
+            )
+            await asyncio.sleep(self.check_interval)
+
+    async def __check(self, n: int, engine: AsyncEngine) -> None:
+        try:
+            async with asyncio.timeout(self.check_interval):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except Exception:
+            self.__healthy[n] = False
+        else:
+            self.__healthy[n] = True
@@ -0,0 +1,511 @@
+import asyncio
+import contextlib
+from bisect import bisect_right, insort
+from typing import Any, Callable, Iterable, Sequence
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import src.app.dto as dto
+import src.app.interface as i
+from src.app.enum import CountryCode, CurrencyCode
+
+from .postgres.dao import (
+    HOTEL_ROOMS,
+    HOTELS,
+    ReadModelDao,
+    hotel_room_values,
+    hotel_values,
+)
+
+# sent by the read_model_notify trigger as "<table>:<id>", or "<table>:*" on
+# TRUNCATE, and as "hotel:<id>" when a review write bumps a hotel's version
+CHANNEL = "read_model"
+
+
+class HotelRecord:
+    __slots__ = (
+        "id",
+        "owner_id",
+        "name",
+        "description",
+        "country_code",
+        "address",
+        "rating_average",
+        "rating_num_votes",
+        "version",
+    )
+
+    def __init__(self, row: Sequence[Any]):
+        (
+            self.id,
+            self.owner_id,
+            self.name,
+            self.description,
+            self.country_code,
+            self.address,
+            self.rating_average,
+            self.rating_num_votes,
+            self.version,
+        ) = row
+
+    def values(self) -> dict[str, Any]:
+        return hotel_values([getattr(self, s) for s in HotelRecord.__slots__[:-1]])
+
+
+class RoomRecord:
+    __slots__ = (
+        "id",
+        "hotel_id",
+        "name",
+        "description",
+        "currency_code",
+        "amount",
+        "numbers",
+    )
+
+    def __init__(self, row: Sequence[Any]):
+        (
+            self.id,
+            self.hotel_id,
+            self.name,
+            self.description,
+            self.currency_code,
+            self.amount,
+            numbers,
+        ) = row
+        self.numbers = tuple(numbers)
+
+    def values(self) -> dict[str, Any]:
+        return hotel_room_values([getattr(self, s) for s in RoomRecord.__slots__])
+
+
+class ReadModelState:
+    """Every hotel and room type, with ids kept sorted per owner and per hotel
+    so keyset pages are a bisect and a slice."""
+
+    def __init__(self):
+        self.hotels: dict[UUID, HotelRecord] = {}
+        self.rooms: dict[UUID, RoomRecord] = {}
+        self.by_owner: dict[UUID, list[UUID]] = {}
+        self.by_country: dict[CountryCode, set[UUID]] = {}
+        self.rooms_by_hotel: dict[UUID, list[UUID]] = {}
+
+    def put_hotel(self, record: HotelRecord) -> None:
+        self.drop_hotel(record.id)
+
+        self.hotels[record.id] = record
+        insort(self.by_owner.setdefault(record.owner_id, []), record.id)
+        self.by_country.setdefault(record.country_code, set()).add(record.id)
+
+    def drop_hotel(self, hotel_id: UUID) -> None:
+        old = self.hotels.pop(hotel_id, None)
+
+        if old is not None:
+            _remove(self.by_owner, old.owner_id, old.id)
+            self.by_country[old.country_code].discard(old.id)
+
+    def put_room(self, record: RoomRecord) -> None:
+        self.drop_room(record.id)
+
+        self.rooms[record.id] = record
+        insort(self.rooms_by_hotel.setdefault(record.hotel_id, []), record.id)
+
+    def drop_room(self, room_id: UUID) -> None:
+        old = self.rooms.pop(room_id, None)
+
+        if old is not None:
+            _remove(self.rooms_by_hotel, old.hotel_id, old.id)
+
+
+def _remove(index: dict[UUID, list[UUID]], key: UUID, id: UUID) -> None:
+    ids = index[key]
+    n = bisect_right(ids, id) - 1
+    if n >= 0 and ids[n] == id:
+        del ids[n]
+    if not ids:
+        del index[key]
+
+
+def _page(ids: list[UUID], limit: int, after: UUID | None) -> list[UUID]:
+    start = 0 if after is None else bisect_right(ids, after)
+    return ids[start : start + limit]
+
+
+class ReadModel:
+    """All hotels and room types of the database, held in this process.
+
+    A listener connection receives a notification for every changed row and
+    re-reads the rows from the primary in batches; use cases refresh the rows
+    they wrote once committed, so their own writes are visible at once. While
+    loading, or when the tables outgrow the size bounds, `ready` is False and
+    the DAOs read from the database instead.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        sessions: Callable[[], AsyncSession],
+        max_hotels: int,
+        max_rooms: int,
+        batch_size: int = 10_000,
+    ):
+        self.dsn = dsn
+        self.sessions = sessions
+        self.max_hotels = max_hotels
+        self.max_rooms = max_rooms
+        self.batch_size = batch_size
+
+        self.state = ReadModelState()
+        self.ready = False
+
+        self.__pending: dict[str, set[UUID]] = {"hotel": set(), "hotel_room": set()}
+        self.__reload = True
+        self.__changed = asyncio.Event()
+        self.__task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self.__task is None or self.__task.done():
+            self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        if self.__task is not None:
+            self.__task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.__task
+            self.__task = None
+
+        self.ready = False
+
+    def hotel(self, hotel_id: UUID) -> dto.HotelWithID | None:
+        record = self.state.hotels.get(hotel_id)
+        return None if record is None else HOTELS.validate_python([record.values()])[0]
+
+    def hotels(self, hotel_ids: Iterable[UUID]) -> list[dto.HotelWithID]:
+        records = [self.state.hotels.get(h) for h in hotel_ids]
+        return HOTELS.validate_python([r.values() for r in records if r is not None])
+
+    def version(self, hotel_id: UUID) -> int | None:
+        record = self.state.hotels.get(hotel_id)
+        return None if record is None else record.version
+
+    def by_owner(
+        self, owner_id: UUID, limit: int, after: UUID | None
+    ) -> list[dto.HotelWithID]:
+        ids = _page(self.state.by_owner.get(owner_id, []), limit, after)
+        return HOTELS.validate_python([self.state.hotels[h].values() for h in ids])
+
+    def in_country(self, country_code: CountryCode) -> set[UUID]:
+        return self.state.by_country.get(country_code, set())
+
+    def room(self, room_id: UUID) -> dto.HotelRoomWithID | None:
+        record = self.state.rooms.get(room_id)
+        return (
+            None
+            if record is None
+            else HOTEL_ROOMS.validate_python([record.values()])[0]
+        )
+
+    def rooms(self, room_ids: Iterable[UUID]) -> list[dto.HotelRoomWithID]:
+        records = [self.state.rooms.get(r) for r in room_ids]
+        return HOTEL_ROOMS.validate_python(
+            [r.values() for r in records if r is not None]
+        )
+
+    def rooms_of(
+        self, hotel_id: UUID, limit: int, after: UUID | None
+    ) -> list[dto.HotelRoomWithID]:
+        ids = _page(self.state.rooms_by_hotel.get(hotel_id, []), limit, after)
+        return HOTEL_ROOMS.validate_python([self.state.rooms[r].values() for r in ids])
+
+    async def refresh_hotels(self, hotel_ids: Iterable[UUID]) -> None:
+        hotel_ids = set(hotel_ids)
+        if not hotel_ids:
+            return
+
+        async with self.sessions() as session:
+            await self.__apply_hotels(ReadModelDao(session), hotel_ids)
+
+    async def refresh_rooms_of(self, hotel_id: UUID) -> None:
+        async with self.sessions() as session:
+            rows = await ReadModelDao(session).rooms_of(hotel_id)
+
+        for room_id in list(self.state.rooms_by_hotel.get(hotel_id, [])):
+            self.state.drop_room(room_id)
+        for row in rows:
+            self.state.put_room(RoomRecord(row))
+
+    async def __run(self) -> None:
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+            except Exception:
+                await asyncio.sleep(1)
+                continue
+
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda _: lost.set())
+
+            try:
+                # listen before loading, so no change between the two is missed
+                await conn.add_listener(CHANNEL, self.__notified)
+                self.__reload = True
+
+                while not lost.is_set():
+                    # cleared first, a notification during the refresh wakes the
+                    # next round
+                    self.__changed.clear()
+
+                    if self.__reload:
+                        await self.__load()
+                    await self.__apply_pending()
+
+                    waits = [
+                        asyncio.ensure_future(e.wait()) for e in (self.__changed, lost)
+                    ]
+                    await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+                    for w in waits:
+                        w.cancel()
+            except Exception:
+                await asyncio.sleep(1)
+            finally:
+                # notifications were missed while disconnected
+                self.ready = False
+                conn.terminate()
+
+    def __notified(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        table, _, id = payload.partition(":")
+
+        if id == "*":
+            self.__reload = True
+        else:
+            self.__pending[table].add(UUID(id))
+
+        self.__changed.set()
+
+    async def __load(self) -> None:
+        self.__reload = False
+        state = ReadModelState()
+
+        async with self.sessions() as session:
+            dao = ReadModelDao(session)
+
+            for fetch, put, bound in (
+                (
+                    dao.hotels,
+                    lambda r: state.put_hotel(HotelRecord(r)),
+                    self.max_hotels,
+                ),
+                (dao.rooms, lambda r: state.put_room(RoomRecord(r)), self.max_rooms),
+            ):
+                after, count = None, 0
+                while True:
+                    rows = await fetch(after, self.batch_size)
+                    count += len(rows)
+                    if count > bound:
+                        self.ready = False
+                        self.state = ReadModelState()
+                        return
+
+                    for row in rows:
+                        put(row)
+                    if len(rows) < self.batch_size:
+                        break
+                    after = rows[-1][0]
+
+        self.state = state
+        self.ready = True
+
+    async def __apply_pending(self) -> None:
+        hotel_ids, self.__pending["hotel"] = self.__pending["hotel"], set()
+        room_ids, self.__pending["hotel_room"] = self.__pending["hotel_room"], set()
+
+        if not (hotel_ids or room_ids) or not self.ready:
+            return
+
+        async with self.sessions() as session:
+            dao = ReadModelDao(session)
+
+            # rooms before hotels: a version served ahead of the rooms would tag
+            # stale rooms as current, one lagging behind only costs a full response
+            rows = await dao.rooms_by_id(list(room_ids)) if room_ids else []
+            for row in rows:
+                self.state.put_room(RoomRecord(row))
+            for room_id in room_ids - {row[0] for row in rows}:
+                self.state.drop_room(room_id)
+
+            await self.__apply_hotels(dao, hotel_ids)
+
+        if (
+            len(self.state.hotels) > self.max_hotels
+            or len(self.state.rooms) > self.max_rooms
+        ):
+            self.ready = False
+            self.state = ReadModelState()
+
+    async def __apply_hotels(self, dao: ReadModelDao, hotel_ids: set[UUID]) -> None:
+        if not hotel_ids:
+            return
+
+        rows = await dao.hotels_by_id(list(hotel_ids))
+        for row in rows:
+            self.state.put_hotel(HotelRecord(row))
+        for hotel_id in hotel_ids - {row[0] for row in rows}:
+            self.state.drop_hotel(hotel_id)
+
+
+class ReadModelHotelDao(i.HotelDao):
+    def __init__(self, dao: i.HotelDao, model: ReadModel):
+        self.dao = dao
+        self.model = model
+
+    async def get(self, hotel_id: UUID) -> dto.HotelWithID | None:
+        if self.model.ready and (hotel := self.model.hotel(hotel_id)) is not None:
+            return hotel
+
+        # a hotel created moments ago by another process may not be loaded yet
+        return await self.dao.get(hotel_id)
+
+    async def get_many(self, hotel_ids: list[UUID]) -> list[dto.HotelWithID]:
+        if not self.model.ready:
+            return await self.dao.get_many(hotel_ids)
+
+        found = self.model.hotels(hotel_ids)
+        missed = set(hotel_ids) - {h.id for h in found}
+
+        return found + await self.dao.get_many(list(missed)) if missed else found
+
+    async def get_with_version(
+        self, hotel_id: UUID
+    ) -> tuple[dto.HotelWithID, int] | None:
+        if self.model.ready and (hotel := self.model.hotel(hotel_id)) is not None:
+            return hotel, self.model.version(hotel_id)
+
+        return await self.dao.get_with_version(hotel_id)
+
+    async def get_version(self, hotel_id: UUID) -> int | None:
+        if self.model.ready and (version := self.model.version(hotel_id)) is not None:
+            return version
+
+        return await self.dao.get_version(hotel_id)
+
+    async def get_page(self, hotel_id: UUID, room_limit: int, review_limit: int) -> (
+        tuple[
+            dto.HotelWithID,
+            list[dto.HotelRoomWithID],
+            list[dto.HotelReviewWithID],
+            int,
+        ]
+        | None
+    ):
+        return await self.dao.get_page(hotel_id, room_limit, review_limit)
+
+    async def add(self, hotel: dto.Hotel) -> dto.HotelWithID:
+        return await self.dao.add(hotel)
+
+    async def update(self, hotel: dto.HotelWithID) -> dto.HotelWithID:
+        return await self.dao.update(hotel)
+
+    async def update_if_owned(
+        self, patch: dto.HotelPatch, owner_id: UUID
+    ) -> dto.HotelWithID:
+        return await self.dao.update_if_owned(patch, owner_id)
+
+    async def delete(self, hotel_id: UUID) -> None:
+        await self.dao.delete(hotel_id)
+
+    async def by_owner(
+        self, owner_id: UUID, limit: int, after: UUID | None = None
+    ) -> list[dto.HotelWithID]:
+        if self.model.ready:
+            return self.model.by_owner(owner_id, limit, after)
+
+        return await self.dao.by_owner(owner_id, limit, after)
+
+    async def owned_ids(self, owner_id: UUID, hotel_ids: list[UUID]) -> set[UUID]:
+        return await self.dao.owned_ids(owner_id, hotel_ids)
+
+    async def add_many(self, hotels: list[dto.Hotel]) -> list[dto.HotelWithID]:
+        return await self.dao.add_many(hotels)
+
+    async def upsert_many(self, hotels: list[dto.HotelUpsert]) -> list[dto.HotelWithID]:
+        return await self.dao.upsert_many(hotels)
+
+    async def evict(self, hotel_id: UUID) -> None:
+        if self.model.ready:
+            await self.model.refresh_hotels([hotel_id])
+
+    async def evict_many(self, hotel_ids: Iterable[UUID]) -> None:
+        if self.model.ready:
+            await self.model.refresh_hotels(hotel_ids)
+
+
+class ReadModelRoomDao(i.HotelRoomDao):
+    def __init__(self, dao: i.HotelRoomDao, model: ReadModel):
+        self.dao = dao
+        self.model = model
+
+    async def get(self, room_id: UUID) -> dto.HotelRoomWithID | None:
+        if self.model.ready and (room := self.model.room(room_id)) is not None:
+            return room
+
+        return await self.dao.get(room_id)
+
+    async def get_many(self, room_ids: list[UUID]) -> list[dto.HotelRoomWithID]:
+        if not self.model.ready:
+            return await self.dao.get_many(room_ids)
+
+        found = self.model.rooms(room_ids)
+        missed = set(room_ids) - {r.id for r in found}
+
+        return found + await self.dao.get_many(list(missed)) if missed else found
+
+    async def add(self, room: dto.HotelRoom) -> dto.HotelRoomWithID:
+        return await self.dao.add(room)
+
+    async def update(self, room: dto.HotelRoomWithID) -> dto.HotelRoomWithID:
+        return await self.dao.update(room)
+
+    async def delete(self, room_id: UUID) -> None:
+        await self.dao.delete(room_id)
+
+    async def by_hotel(
+        self, hotel_id: UUID, limit: int, after: UUID | None = None
+    ) -> list[dto.HotelRoomWithID]:
+        if self.model.ready:
+            return self.model.rooms_of(hotel_id, limit, after)
+
+        return await self.dao.by_hotel(hotel_id, limit, after)
+
+    async def by_hotels(
+        self, hotel_ids: list[UUID], limit: int
+    ) -> list[dto.HotelRoomWithID]:
+        if self.model.ready:
+            return [r for h in hotel_ids for r in self.model.rooms_of(h, limit, None)]
+
+        return await self.dao.by_hotels(hotel_ids, limit)
+
+    async def by_price(
+        self,
+        currency_code: CurrencyCode,
+        min_price: float | None,
+        max_price: float | None,
+        limit: int,
+        after: tuple[float, UUID] | None = None,
+    ) -> list[dto.HotelRoomSearchResult]:
+        return await self.dao.by_price(
+            currency_code, min_price, max_price, limit, after
+        )
+
+    async def add_many(self, rooms: list[dto.HotelRoom]) -> list[dto.HotelRoomWithID]:
+        return await self.dao.add_many(rooms)
+
+    async def upsert_many(
+        self, rooms: list[dto.HotelRoomWithID]
+    ) -> list[dto.HotelRoomWithID]:
+        return await self.dao.upsert_many(rooms)
+
+    async def evict(self, hotel_id: UUID) -> None:
+        if self.model.ready:
+            await self.model.refresh_rooms_of(hotel_id)
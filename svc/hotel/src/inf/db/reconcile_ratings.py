@@ -0,0 +1,42 @@
+"""Recompute hotel ratings from their reviews and fix the ones that drifted.
+
+    python -m src.inf.db.reconcile_ratings
+
+Walks the hotels by id in batches, each in its own transaction, so it can run
+next to live traffic and the outbox relay.
+"""
+
+import argparse
+import asyncio
+
+from .postgres.dao import HotelRatingDao
+from .postgres.engine import database as pg_db
+
+
+async def reconcile(batch_size: int) -> int:
+    after, fixed = None, 0
+
+    try:
+        while True:
+            async with pg_db.session(read_only=False) as session:
+                last, n = await HotelRatingDao(session).reconcile(after, batch_size)
+                await session.commit()
+
+            if last is None:
+                return fixed
+
+            after, fixed = last, fixed + n
+    finally:
+        await pg_db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"fixed {asyncio.run(reconcile(args.batch))} hotel ratings")
+
+
+if __name__ == "__main__":
+    main()
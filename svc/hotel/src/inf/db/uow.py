@@ -1,32 +1,166 @@
+import datetime
+import functools
 from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import src.app.dto as dto
 import src.app.interface as i
+from src.app.loader import Loader
+from src.inf.metrics import Counter, Gauge, registry
+
+from . import config
+from .cache import CachedHotelDao, HotelCache, LocalCacheBackend
+from .fx import CachedFxRateDao, FxRateCache
+from .occupancy import IndexedReservationDao, OccupancyIndex
+from .postgres import config as pg_config
+from .postgres.dao import (
+    FxRateDao,
+    HotelDao,
+    HotelRatingStatsDao,
+    HotelRoomDao,
+    HotelReviewDao,
+    HotelReservationDao,
+    HotelSearchDao,
+    OutboxDao,
+)
+from .postgres.engine import database as pg_db
+from .read_model import ReadModel, ReadModelHotelDao, ReadModelRoomDao
+
+hotel_cache = HotelCache(
+    maxsize=config.HOTEL_CACHE_SIZE,
+    ttl=config.HOTEL_CACHE_TTL,
+    stale_ttl=config.HOTEL_CACHE_STALE_TTL,
+    refresh_timeout=config.HOTEL_CACHE_REFRESH_TIMEOUT,
+    backend=LocalCacheBackend() if config.HOTEL_CACHE_BACKEND == "local" else None,
+)
+
+occupancy_index = OccupancyIndex(
+    maxsize=config.OCCUPANCY_INDEX_SIZE,
+    ttl=config.OCCUPANCY_INDEX_TTL,
+    horizon=config.OCCUPANCY_INDEX_HORIZON,
+)
+
+fx_rate_cache = FxRateCache(ttl=config.FX_RATES_TTL)
+
+read_model = ReadModel(
+    dsn=pg_config.ALCHEMY_DB_URI.replace("+asyncpg", ""),
+    # the primary, a replica may not have replayed the notified change yet
+    sessions=pg_db.primary_read_only,
+    max_hotels=config.READ_MODEL_MAX_HOTELS,
+    max_rooms=config.READ_MODEL_MAX_ROOMS,
+)
+
+registry.register(
+    Gauge(
+        "read_model_rows",
+        "Rows held by the in-process read model, 0 while it is not serving.",
+        ("table",),
+        lambda: [
+            (("hotel",), len(read_model.state.hotels) if read_model.ready else 0),
+            (("hotel_room",), len(read_model.state.rooms) if read_model.ready else 0),
+        ],
+    )
+)
+
+UOW_COMMITS = registry.register(
+    Counter("uow_commits_total", "Units of work committed.")
+)
+UOW_ROLLBACKS = registry.register(
+    Counter("uow_rollbacks_total", "Units of work rolled back.")
+)
+
+
+async def load_occupancy(
+    session: AsyncSession, hotel_id: UUID, start: datetime.date, end: datetime.date
+) -> tuple[list[dto.HotelRoomWithID], list[dto.ReservationWithID]]:
+    # on the caller's session: a second checkout while it holds one can drain
+    # the pool under load
+    room_dao = HotelRoomDao(session)
+    rooms: list[dto.HotelRoomWithID] = []
+
+    while True:
+        page = await room_dao.by_hotel(hotel_id, 1000, rooms[-1].id if rooms else None)
+        rooms += page
+        if len(page) < 1000:
+            break
 
-from .postgres.dao import HotelDao, HotelRoomDao, HotelReviewDao
-from .postgres.engine import smaker as pg_session_factory
+    reservations = await HotelReservationDao(session).by_hotel(hotel_id, start, end)
+
+    return rooms, reservations
+
+
+async def startup() -> None:
+    """Open this process's pools and start its read model, ahead of traffic."""
+    await pg_db.warm(pg_config.DB_POOL_WARM)
+
+    if config.READ_MODEL_MAX_HOTELS > 0:
+        read_model.start()
+
+
+async def shutdown() -> None:
+    await read_model.stop()
+    await pg_db.close()
 
 
 class UnitOfWork(i.UnitOfWork):
     async def __aenter__(self) -> "UnitOfWork":
-        self.__pg_session = pg_session_factory()
+        self.__pg_session = pg_db.session(self.read_only, self.affinity)
 
         self.hotel_dao = HotelDao(self.__pg_session)
+        self.hotel_search_dao = HotelSearchDao(self.__pg_session)
         self.hotel_room_dao = HotelRoomDao(self.__pg_session)
-        self.hotel_review_dao = HotelReviewDao(self.__pg_session)
+        self.hotel_review_dao = HotelReviewDao(
+            self.__pg_session, rate_hotels=config.RATING_MODE == "sync"
+        )
+        self.hotel_rating_stats_dao = HotelRatingStatsDao(self.__pg_session)
+        self.hotel_reservation_dao = HotelReservationDao(self.__pg_session)
+        self.fx_rate_dao = CachedFxRateDao(FxRateDao(self.__pg_session), fx_rate_cache)
+
+        if config.READ_MODEL_MAX_HOTELS > 0:
+            read_model.start()
+            self.hotel_dao = ReadModelHotelDao(self.hotel_dao, read_model)
+            self.hotel_room_dao = ReadModelRoomDao(self.hotel_room_dao, read_model)
+        elif config.HOTEL_CACHE_SIZE > 0:
+            self.hotel_dao = CachedHotelDao(self.hotel_dao, hotel_cache)
+
+        if config.OCCUPANCY_INDEX_SIZE > 0:
+            self.hotel_reservation_dao = IndexedReservationDao(
+                self.hotel_reservation_dao,
+                occupancy_index,
+                functools.partial(load_occupancy, self.__pg_session),
+            )
+
+        self.hotels = Loader(self.hotel_dao.get_many, lambda h: h.id)
+        self.rooms = Loader(self.hotel_room_dao.get_many, lambda r: r.id)
 
         return self
 
     async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any):
-        if exc_type:
-            await self.rollback()
-        else:
-            await self.commit()
+        # read-only work has nothing to commit, closing hands the connection back
+        if not self.read_only:
+            if exc_type:
+                await self.rollback()
+            else:
+                await self.commit()
         await self.__pg_session.close()
         pass
 
     async def commit(self):
+        # the events commit or roll back together with the writes they describe
+        if config.OUTBOX_ENABLED:
+            await OutboxDao(self.__pg_session).add_many(self.events)
+        self.events.clear()
+
         await self.__pg_session.commit()
-        pass
+        UOW_COMMITS.inc()
+
+        if not self.read_only:
+            pg_db.mark_written(self.affinity)
 
     async def rollback(self):
+        self.events.clear()
         await self.__pg_session.rollback()
+        UOW_ROLLBACKS.inc()
         pass
@@ -0,0 +1,77 @@
+"""Relay outbox events to the configured broker.
+
+python -m src.inf.mq
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+import src.inf.db.config as db_config
+from src.inf.db.postgres.engine import database as pg_db
+
+from . import config
+from .broker import Broker, FileBroker, MemoryBroker
+from .relay import OutboxRelay
+
+logger = logging.getLogger(__name__)
+
+
+def make_broker() -> Broker:
+    if config.MQ_BROKER == "memory":
+        return MemoryBroker()
+
+    return FileBroker(config.MQ_FILE_PATH)
+
+
+async def report(relay: OutboxRelay, stop: asyncio.Event, interval: float) -> None:
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+        m = relay.metrics
+        logger.info(
+            "published %d in %d batches  failures %d  %.0f events/s"
+            "  rated %d hotels",
+            m.published,
+            m.batches,
+            m.failures,
+            m.throughput,
+            m.rated_hotels,
+        )
+
+
+async def run(interval: float) -> None:
+    relay = OutboxRelay(
+        make_broker(),
+        config.OUTBOX_BATCH_SIZE,
+        config.OUTBOX_POLL_INTERVAL,
+        rate_hotels=db_config.RATING_MODE == "async",
+        max_backoff=config.OUTBOX_MAX_BACKOFF,
+    )
+    stop = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await asyncio.gather(relay.run(stop), report(relay, stop, interval))
+    finally:
+        await pg_db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--report", type=float, default=10, help="seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.report))
+
+
+if __name__ == "__main__":
+    main()
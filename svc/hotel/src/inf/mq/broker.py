@@ -0,0 +1,40 @@
+import asyncio
+from abc import ABC, abstractmethod
+
+import src.app.dto as dto
+
+
+class Broker(ABC):
+    @abstractmethod
+    async def publish(self, events: list[dto.Event]) -> None:
+        """Publish the batch in order, raising if any event was not accepted."""
+
+
+class MemoryBroker(Broker):
+    """In-process stand-in for a message queue, for tests and local runs."""
+
+    def __init__(self):
+        self.events: list[dto.Event] = []
+
+    async def publish(self, events: list[dto.Event]) -> None:
+        self.events += events
+
+
+class FileBroker(Broker):
+    """Appends events to a newline delimited JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    async def publish(self, events: list[dto.Event]) -> None:
+        await asyncio.to_thread(self.__write, events)
+
+    def __write(self, events: list[dto.Event]) -> None:
+        lines = b"".join(e.model_dump_json().encode() + b"\n" for e in events)
+
+        with open(self.path, "ab") as f:
+            f.write(lines)
+
+    def read(self) -> list[dto.Event]:
+        with open(self.path, "rb") as f:
+            return [dto.Event.model_validate_json(line) for line in f if line.strip()]
@@ -0,0 +1,13 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# memory | file, a message queue client plugs in as another Broker
+MQ_BROKER = os.getenv("MQ_BROKER", "file")
+MQ_FILE_PATH = os.getenv("MQ_FILE_PATH", "events.ndjson")
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))
+# failed batches are retried after the poll interval, doubled per failure in a row
+OUTBOX_MAX_BACKOFF = float(os.getenv("OUTBOX_MAX_BACKOFF", "30"))
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from uuid import UUID
+
+import src.app.dto as dto
+from src.app.enum import EventType
+from src.inf.db.postgres.dao import HotelRatingDao, OutboxDao
+from src.inf.db.postgres.engine import database as pg_db
+
+from .broker import Broker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RelayMetrics:
+    published: int = 0
+    batches: int = 0
+    failures: int = 0
+    rated_hotels: int = 0
+    publish_seconds: float = 0
+
+    @property
+    def throughput(self) -> float:
+        """Events per second spent publishing."""
+        return self.published / self.publish_seconds if self.publish_seconds else 0
+
+
+def rating_deltas(events: list[dto.Event]) -> dict[UUID, tuple[int, int]]:
+    """Coalesce review events into (votes, rating total) per hotel."""
+    deltas: dict[UUID, tuple[int, int]] = {}
+
+    for event in events:
+        if event.type is EventType.REVIEW_CREATED:
+            sign = 1
+        elif event.type is EventType.REVIEW_DELETED:
+            sign = -1
+        else:
+            continue
+
+        votes, total = deltas.get(event.key, (0, 0))
+        deltas[event.key] = (votes + sign, total + sign * event.payload["rating"])
+
+    return {hotel_id: d for hotel_id, d in deltas.items() if d != (0, 0)}
+
+
+class OutboxRelay:
+    """Moves committed outbox events to the broker, oldest first.
+
+    A batch is deleted from the outbox in the same transaction that is committed
+    after the broker accepted it, so a crash or a failed publish leaves it in
+    place to be sent again: delivery is at least once, consumers dedupe on id.
+    Relays running side by side take disjoint batches.
+
+    With rate_hotels the review events of a batch are also applied to hotel
+    ratings in that transaction, one UPDATE per hotel, so every review counts
+    exactly once. A batch holds what was committed since the last poll, which
+    makes the poll interval the coalescing window.
+    """
+
+    def __init__(
+        self,
+        broker: Broker,
+        batch_size: int,
+        poll_interval: float,
+        rate_hotels: bool = False,
+        max_backoff: float = 30,
+    ):
+        self.broker = broker
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.rate_hotels = rate_hotels
+        self.metrics = RelayMetrics()
+
+    async def relay_once(self) -> int:
+        async with pg_db.session(read_only=False) as session:
+            events = await OutboxDao(session).take(self.batch_size)
+            if not events:
+                await session.rollback()
+                return 0
+
+            deltas = rating_deltas(events) if self.rate_hotels else {}
+            await HotelRatingDao(session).apply(deltas)
+
+            start = time.perf_counter()
+            try:
+                await self.broker.publish(events)
+            except Exception:
+                await session.rollback()
+                raise
+
+            await session.commit()
+
+            self.metrics.publish_seconds += time.perf_counter() - start
+            self.metrics.published += len(events)
+            self.metrics.batches += 1
+            self.metrics.rated_hotels += len(deltas)
+
+            return len(events)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        failures = 0
+
+        while not stop.is_set():
+            delay = self.poll_interval
+
+            try:
+                relayed = await self.relay_once()
+                failures = 0
+            except Exception:
+                self.metrics.failures += 1
+                failures += 1
+                relayed = 0
+                delay = min(self.poll_interval * 2 ** (failures - 1), self.max_backoff)
+                logger.exception(
+                    "relaying outbox events failed, retry in %.1f s", delay
+                )
+
+            # a full batch means more are waiting, keep draining
+            if relayed < self.batch_size:
+                try:
+                    await asyncio.wait_for(stop.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
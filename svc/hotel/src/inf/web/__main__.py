@@ -0,0 +1,52 @@
+"""Serve the web app from one or more worker processes.
+
+    python -m src.inf.web --workers 4
+
+Each worker builds the app with create_app and opens its own database pools in
+the lifespan, so size DB_POOL_SIZE and DB_MAX_OVERFLOW per worker: the service
+holds up to workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections per engine,
+and the primary has two, one for writes and one for reads.
+
+Everything else in memory is per worker too, and a write only reaches the
+worker that served it:
+
+- /metrics reports the worker that answered the scrape, not the service.
+- Another worker's hotel cache serves the old hotel, and its ETag version, for
+  up to HOTEL_CACHE_TTL; with the read model on, until its LISTEN connection
+  hears of the change.
+- Another worker's occupancy index misses a booking or cancellation for up to
+  OCCUPANCY_INDEX_TTL. The database still rejects a double booking, and a
+  booking that finds no free number checks the database itself.
+- Coalesced reads are only forgotten in the writing worker, so another worker
+  may answer with a read that started before the write committed.
+- The DB_STICKY_WINDOW that keeps a writer's reads on the primary lives in the
+  writing worker, so their next request may land on a replica that has not yet
+  replayed the write.
+"""
+
+import argparse
+
+import uvicorn
+
+from . import config
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=config.WEB_HOST)
+    parser.add_argument("--port", type=int, default=config.WEB_PORT)
+    parser.add_argument("--workers", type=int, default=config.WEB_WORKERS)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        "src.inf.web.app:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        access_log=config.WEB_ACCESS_LOG,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,394 @@
-from typing import Annotated
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Annotated, AsyncIterator
 from uuid import UUID
-from fastapi import FastAPI, HTTPException, Header, status
+from fastapi import (
+    APIRouter,
+    Body,
+    FastAPI,
+    HTTPException,
+    Header,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import TypeAdapter
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from src.app import dto, usecase, exception as exc
-from src.inf.db.uow import UnitOfWork
+from src.app.enum import CountryCode, CurrencyCode
+from src.inf.db.uow import UnitOfWork, shutdown, startup
+from src.inf.metrics import (
+    COUNT_BUCKETS,
+    CallbackCounter,
+    Counter,
+    Gauge,
+    Histogram,
+    RequestStats,
+    current_request,
+    registry,
+)
+
+REQUESTS = registry.register(
+    Counter("http_requests_total", "Requests served.", ("method", "route", "status"))
+)
+REQUEST_SECONDS = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time to serve a request, body included.",
+        ("method", "route"),
+    )
+)
+REQUEST_STATEMENTS = registry.register(
+    Histogram(
+        "http_request_db_statements",
+        "SQL statements executed per request.",
+        ("method", "route"),
+        buckets=COUNT_BUCKETS,
+    )
+)
+REQUEST_DB_SECONDS = registry.register(
+    Histogram(
+        "http_request_db_seconds",
+        "Time per request spent executing SQL.",
+        ("method", "route"),
+    )
+)
+REQUEST_POOL_WAIT_SECONDS = registry.register(
+    Histogram(
+        "http_request_pool_wait_seconds",
+        "Time per request spent waiting for pooled connections.",
+        ("method", "route"),
+    )
+)
+
+registry.register(
+    CallbackCounter(
+        "singleflight_reads_total",
+        "Hot reads that led a database call, joined one in flight, or bypassed"
+        " coalescing because the in-flight table was full.",
+        ("outcome",),
+        lambda: [
+            (("led",), usecase.reads.led),
+            (("joined",), usecase.reads.joined),
+            (("bypassed",), usecase.reads.bypassed),
+        ],
+    )
+)
+registry.register(
+    Gauge(
+        "singleflight_inflight",
+        "Coalesced reads currently in flight.",
+        (),
+        lambda: [((), usecase.reads.inflight)],
+    )
+)
+
+
+class MetricsMiddleware:
+    """Times every request and its database work, labelled by route template.
+
+    A plain ASGI middleware, so it adds no task or response wrapping of its own.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats, code = RequestStats(), 500
+        token = current_request.set(stats)
+
+        async def send_status(message: Message) -> None:
+            nonlocal code
+            if message["type"] == "http.response.start":
+                code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+
+            # routing fills in the matched route, unmatched paths share one label
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route else "unmatched")
+
+            REQUESTS.inc(*labels, str(code))
+            REQUEST_SECONDS.observe(elapsed, *labels)
+            REQUEST_STATEMENTS.observe(stats.statements, *labels)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, *labels)
+            REQUEST_POOL_WAIT_SECONDS.observe(stats.pool_wait_seconds, *labels)
 
-app = FastAPI()
 
+router = APIRouter()
 
-@app.get("/hotels/{hotel_id}")
-async def get_hotel(hotel_id: UUID) -> dto.HotelWithID:
-    return await usecase.GetHotelUseCase(UnitOfWork).execute(hotel_id)
+PageLimit = Annotated[int, Query(ge=1, le=100)]
 
+MAX_BULK_ITEMS = 10_000
 
-@app.get("/hotels/{hotel_id}/rooms")
-async def get_hotel_rooms(hotel_id: UUID) -> list[dto.HotelRoomWithID]:
-    return await usecase.ListHotelRoomsUseCase(UnitOfWork).execute(hotel_id)
+MAX_SEARCH_HOTELS = 100
 
+MAX_BATCH_IDS = 100
 
-@app.get("/hotels/{hotel_id}/reviews")
-async def get_hotel_reviews(hotel_id: UUID) -> list[dto.HotelReviewWithID]:
-    return await usecase.ListHotelReviewsUseCase(UnitOfWork).execute(hotel_id)
+BatchIds = Annotated[list[UUID], Query(min_length=1, max_length=MAX_BATCH_IDS)]
 
+ActivityDays = Annotated[int, Query(ge=1, le=365)]
+
+CheckIn = Annotated[date, Query(alias="from")]
+CheckOut = Annotated[date, Query(alias="to")]
+
+NDJSON = "application/x-ndjson"
+
+reviews_json = TypeAdapter(list[dto.HotelReviewWithID])
+
+# caches may store the responses but must revalidate them on every use
+CACHE_CONTROL = "public, no-cache"
+
+
+def etag_key(request: Request) -> str:
+    """What selects a representation of the hotel besides its version."""
+    ndjson = NDJSON in request.headers.get("accept", "")
+    raw = f"{request.url.path}?{request.url.query}:{ndjson}".encode()
+
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+def known_versions(request: Request) -> set[int]:
+    """Versions of the hotel the client holds this representation of, read from
+    the "<version>-<key>" strong ETags in If-None-Match."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return set()
+
+    key, versions = etag_key(request), set()
+    for tag in header.split(","):
+        version, _, tag_key = tag.strip().removeprefix("W/").strip('"').partition("-")
+        if tag_key == key and version.isdigit():
+            versions.add(int(version))
+
+    return versions
+
+
+def cache_headers(request: Request, version: int) -> dict[str, str]:
+    return {
+        "ETag": f'"{version}-{etag_key(request)}"',
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept",
+    }
+
+
+async def revalidate(request: Request, response: Response, hotel_id: UUID) -> int:
+    """Tag the response with the hotel version, read before the body so a write in
+    between only makes the tag older than the body. A client already holding the
+    version gets a 304 through NotModifiedError instead.
+
+    For bodies read apart from the hotel row; the hotel and its page carry the
+    version they were read at. The body's read must be keyed by the version
+    returned, so it joins no read that began before the version was read."""
+    version = await usecase.GetHotelVersionUseCase(UnitOfWork).execute(
+        hotel_id, known_versions(request)
+    )
+    response.headers.update(cache_headers(request, version))
+
+    return version
+
+
+async def ndjson_chunks(
+    chunks: AsyncIterator[list[dto.HotelReviewWithID]],
+) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        yield b"".join(r.__pydantic_serializer__.to_json(r) + b"\n" for r in chunk)
+
+
+async def json_array_chunks(
+    chunks: AsyncIterator[list[dto.HotelReviewWithID]],
+) -> AsyncIterator[bytes]:
+    yield b"["
+    separator = b""
+    async for chunk in chunks:
+        if chunk:
+            # strip the brackets of each serialized chunk to splice them into one array
+            yield separator + reviews_json.dump_json(chunk)[1:-1]
+            separator = b","
+    yield b"]"
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+# declared before /hotels/{hotel_id}, which would otherwise capture "search"
+@router.get("/hotels/search")
+async def search_hotels(
+    q: str | None = None,
+    country_code: CountryCode | None = None,
+    min_rating: float | None = None,
+    currency_code: CurrencyCode | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    limit: PageLimit = 20,
+    cursor: str | None = None,
+) -> dto.Page[dto.HotelSearchResult]:
+    query = dto.HotelSearchQuery(
+        q=q,
+        country_code=country_code,
+        min_rating=min_rating,
+        currency_code=currency_code,
+        min_price=min_price,
+        max_price=max_price,
+    )
+
+    return await usecase.SearchHotelsUseCase(UnitOfWork).execute(query, limit, cursor)
+
+
+@router.get("/hotels")
+async def get_hotels(ids: BatchIds) -> dto.Batch[dto.HotelWithID]:
+    return await usecase.GetHotelsUseCase(UnitOfWork).execute(ids)
+
+
+# declared before /hotels/{hotel_id} too
+@router.get("/hotels/rooms")
+async def get_rooms_of_hotels(
+    hotel_ids: BatchIds, limit: PageLimit = 20
+) -> list[dto.HotelRooms]:
+    return await usecase.ListRoomsOfHotelsUseCase(UnitOfWork).execute(hotel_ids, limit)
+
+
+@router.get("/hotels/{hotel_id}")
+async def get_hotel(
+    hotel_id: UUID, request: Request, response: Response
+) -> dto.HotelWithID:
+    hotel, version = await usecase.GetHotelUseCase(UnitOfWork).execute(
+        hotel_id, known_versions(request)
+    )
+    response.headers.update(cache_headers(request, version))
+
+    return hotel
+
+
+@router.get("/hotels/{hotel_id}/page")
+async def get_hotel_page(
+    hotel_id: UUID,
+    request: Request,
+    response: Response,
+    rooms: PageLimit = 20,
+    reviews: PageLimit = 10,
+    currency: CurrencyCode | None = None,
+) -> dto.HotelPage:
+    # converted prices follow the fx rates, which hotel versions do not track
+    known = known_versions(request) if currency is None else ()
+
+    page, version = await usecase.GetHotelPageUseCase(UnitOfWork).execute(
+        hotel_id, rooms, reviews, currency, known
+    )
+    if currency is None:
+        response.headers.update(cache_headers(request, version))
+
+    return page
+
+
+@router.get("/hotels/{hotel_id}/rooms")
+async def get_hotel_rooms(
+    hotel_id: UUID,
+    request: Request,
+    response: Response,
+    limit: PageLimit = 20,
+    cursor: str | None = None,
+    currency: CurrencyCode | None = None,
+) -> dto.Page[dto.HotelRoomWithID]:
+    version = None
+    if currency is None:
+        version = await revalidate(request, response, hotel_id)
+
+    return await usecase.ListHotelRoomsUseCase(UnitOfWork).execute(
+        hotel_id, limit, cursor, currency, version
+    )
+
+
+@router.get("/rooms")
+async def get_rooms(ids: BatchIds) -> dto.Batch[dto.HotelRoomWithID]:
+    return await usecase.GetRoomsUseCase(UnitOfWork).execute(ids)
+
+
+@router.get("/rooms/search")
+async def search_rooms(
+    currency: CurrencyCode,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    limit: PageLimit = 20,
+    cursor: str | None = None,
+) -> dto.Page[dto.HotelRoomSearchResult]:
+    return await usecase.SearchRoomsUseCase(UnitOfWork).execute(
+        currency, min_price, max_price, limit, cursor
+    )
 
-@app.post("/my_hotels")
+
+@router.get("/hotels/{hotel_id}/rating-stats")
+async def get_hotel_rating_stats(hotel_id: UUID) -> dto.HotelRatingStats:
+    return await usecase.GetHotelRatingStatsUseCase(UnitOfWork).execute(hotel_id)
+
+
+@router.get("/hotels/{hotel_id}/reviews")
+async def get_hotel_reviews(
+    hotel_id: UUID,
+    request: Request,
+    response: Response,
+    limit: PageLimit = 20,
+    cursor: str | None = None,
+    stream: bool = False,
+    accept: Annotated[str, Header()] = "",
+) -> dto.Page[dto.HotelReviewWithID]:
+    version = await revalidate(request, response, hotel_id)
+    headers = cache_headers(request, version)
+
+    if stream or NDJSON in accept:
+        chunks = usecase.StreamHotelReviewsUseCase(UnitOfWork).execute(hotel_id)
+
+        if NDJSON in accept:
+            return StreamingResponse(
+                ndjson_chunks(chunks), media_type=NDJSON, headers=headers
+            )
+
+        return StreamingResponse(
+            json_array_chunks(chunks), media_type="application/json", headers=headers
+        )
+
+    return await usecase.ListHotelReviewsUseCase(UnitOfWork).execute(
+        hotel_id, limit, cursor, version
+    )
+
+
+@router.get("/hotels/{hotel_id}/availability")
+async def get_hotel_availability(
+    hotel_id: UUID, check_in: CheckIn, check_out: CheckOut
+) -> dto.HotelAvailability:
+    return await usecase.GetHotelAvailabilityUseCase(UnitOfWork).execute(
+        hotel_id, check_in, check_out
+    )
+
+
+@router.get("/availability")
+async def search_availability(
+    hotel_ids: Annotated[list[UUID], Query(max_length=MAX_SEARCH_HOTELS)],
+    check_in: CheckIn,
+    check_out: CheckOut,
+) -> list[dto.HotelAvailability]:
+    return await usecase.SearchAvailabilityUseCase(UnitOfWork).execute(
+        hotel_ids, check_in, check_out
+    )
+
+
+@router.post("/my_hotels")
 async def create_owned_hotel(
     x_auth_request_user: Annotated[UUID, Header()], hotel: dto.HotelNew
 ) -> dto.HotelWithID:
@@ -32,7 +397,7 @@ async def create_owned_hotel(
     )
 
 
-@app.patch("/my_hotels")
+@router.patch("/my_hotels")
 async def update_owned_hotel(
     x_auth_request_user: Annotated[UUID, Header()], hotel: dto.HotelPatch
 ) -> dto.HotelWithID:
@@ -41,16 +406,80 @@ async def update_owned_hotel(
     )
 
 
-@app.get("/my_hotels")
+@router.post("/my_hotels/bulk")
+async def create_owned_hotels(
+    x_auth_request_user: Annotated[UUID, Header()],
+    hotels: Annotated[list[dto.HotelNew], Body(max_length=MAX_BULK_ITEMS)],
+) -> dto.BulkResult[dto.HotelWithID]:
+    return await usecase.HotelierBulkCreateHotelsUseCase(UnitOfWork).execute(
+        x_auth_request_user, hotels
+    )
+
+
+@router.put("/my_hotels/bulk")
+async def upsert_owned_hotels(
+    x_auth_request_user: Annotated[UUID, Header()],
+    hotels: Annotated[list[dto.HotelUpsert], Body(max_length=MAX_BULK_ITEMS)],
+) -> dto.BulkResult[dto.HotelWithID]:
+    return await usecase.HotelierBulkUpsertHotelsUseCase(UnitOfWork).execute(
+        x_auth_request_user, hotels
+    )
+
+
+@router.post("/my_hotels/rooms/bulk")
+async def create_owned_hotel_rooms(
+    x_auth_request_user: Annotated[UUID, Header()],
+    rooms: Annotated[list[dto.HotelRoomNew], Body(max_length=MAX_BULK_ITEMS)],
+) -> dto.BulkResult[dto.HotelRoomWithID]:
+    return await usecase.HotelierBulkCreateRoomsUseCase(UnitOfWork).execute(
+        x_auth_request_user, rooms
+    )
+
+
+@router.put("/my_hotels/rooms/bulk")
+async def upsert_owned_hotel_rooms(
+    x_auth_request_user: Annotated[UUID, Header()],
+    rooms: Annotated[list[dto.HotelRoomWithID], Body(max_length=MAX_BULK_ITEMS)],
+) -> dto.BulkResult[dto.HotelRoomWithID]:
+    return await usecase.HotelierBulkUpsertRoomsUseCase(UnitOfWork).execute(
+        x_auth_request_user, rooms
+    )
+
+
+@router.get("/my_hotels")
 async def get_owned_hotels(
     x_auth_request_user: Annotated[UUID, Header()],
-) -> list[dto.HotelWithID]:
+    limit: PageLimit = 20,
+    cursor: str | None = None,
+) -> dto.Page[dto.HotelWithID]:
     return await usecase.HotelierListOwnedHotelsUseCase(UnitOfWork).execute(
-        x_auth_request_user
+        x_auth_request_user, limit, cursor
+    )
+
+
+@router.get("/my_hotels/rating-stats")
+async def get_owned_rating_stats(
+    x_auth_request_user: Annotated[UUID, Header()],
+    limit: PageLimit = 20,
+    cursor: str | None = None,
+) -> dto.Page[dto.HotelRatingStats]:
+    return await usecase.HotelierListRatingStatsUseCase(UnitOfWork).execute(
+        x_auth_request_user, limit, cursor
     )
 
 
-@app.post("/reviews")
+@router.get("/my_hotels/{hotel_id}/review-activity")
+async def get_owned_review_activity(
+    x_auth_request_user: Annotated[UUID, Header()],
+    hotel_id: UUID,
+    days: ActivityDays = 30,
+) -> list[dto.HotelReviewDay]:
+    return await usecase.HotelierGetReviewActivityUseCase(UnitOfWork).execute(
+        x_auth_request_user, hotel_id, days
+    )
+
+
+@router.post("/reviews")
 async def create_review(
     x_auth_request_user: Annotated[UUID, Header()], review: dto.HotelReviewNew
 ) -> dto.HotelReviewWithID:
@@ -59,7 +488,7 @@ async def create_review(
     )
 
 
-@app.delete("/reviews")
+@router.delete("/reviews")
 async def delete_review(
     x_auth_request_user: Annotated[UUID, Header()], review_id: UUID
 ) -> None:
@@ -68,11 +497,88 @@ async def delete_review(
     )
 
 
-@app.exception_handler(exc.ResourceNotFoundError)
+@router.post("/reservations")
+async def create_reservation(
+    x_auth_request_user: Annotated[UUID, Header()], reservation: dto.ReservationNew
+) -> dto.ReservationWithID:
+    return await usecase.UserCreateReservationUseCase(UnitOfWork).execute(
+        x_auth_request_user, reservation
+    )
+
+
+@router.delete("/reservations")
+async def cancel_reservation(
+    x_auth_request_user: Annotated[UUID, Header()], reservation_id: UUID
+) -> None:
+    return await usecase.UserCancelReservationUseCase(UnitOfWork).execute(
+        x_auth_request_user, reservation_id
+    )
+
+
 async def not_found_handler(req, exc):
     raise HTTPException(status.HTTP_404_NOT_FOUND)
 
 
-@app.exception_handler(exc.NotOwnedError)
+async def not_modified_handler(req, exc):
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=cache_headers(req, exc.version),
+    )
+
+
 async def not_owned_handler(req, exc):
     raise HTTPException(status.HTTP_403_FORBIDDEN)
+
+
+async def invalid_cursor_handler(req, exc):
+    raise HTTPException(status.HTTP_400_BAD_REQUEST)
+
+
+async def invalid_search_handler(req, exc):
+    raise HTTPException(status.HTTP_400_BAD_REQUEST)
+
+
+async def unknown_currency_handler(req, exc):
+    raise HTTPException(status.HTTP_400_BAD_REQUEST)
+
+
+async def invalid_stay_handler(req, exc):
+    raise HTTPException(status.HTTP_400_BAD_REQUEST)
+
+
+async def not_available_handler(req, exc):
+    raise HTTPException(status.HTTP_409_CONFLICT)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # runs in each worker once the server has started it, so every process
+    # makes its own pools
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(
+        lifespan=lifespan,
+        exception_handlers={
+            exc.ResourceNotFoundError: not_found_handler,
+            exc.NotModifiedError: not_modified_handler,
+            exc.NotOwnedError: not_owned_handler,
+            exc.InvalidCursorError: invalid_cursor_handler,
+            exc.InvalidSearchError: invalid_search_handler,
+            exc.UnknownCurrencyError: unknown_currency_handler,
+            exc.InvalidStayError: invalid_stay_handler,
+            exc.NotAvailableError: not_available_handler,
+        },
+    )
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(router)
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,11 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WEB_HOST = os.getenv("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.getenv("WEB_PORT", "8000"))
+# one process by default: /metrics and the in-process caches are per worker,
+# see __main__ before raising it
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))
+WEB_ACCESS_LOG = os.getenv("WEB_ACCESS_LOG", "false").lower() == "true"
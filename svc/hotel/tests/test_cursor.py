@@ -0,0 +1,38 @@
+import base64
+import json
+from uuid import uuid4
+
+import pytest
+
+import src.app.exception as exc
+import src.app.service as svc
+
+
+def raw_cursor(key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def test_round_trip():
+    key = 12.5, uuid4()
+
+    assert svc.decode_search_cursor(svc.encode_cursor(*key)) == key
+    assert svc.decode_search_cursor(None) is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        raw_cursor({"a": 1}),
+        raw_cursor(["1.5"]),
+        raw_cursor(["1.5", str(uuid4()), "x"]),
+        raw_cursor(["cheap", str(uuid4())]),
+        raw_cursor(["1.5", "not-a-uuid"]),
+        raw_cursor([1.5, 1]),
+        raw_cursor(["nan", str(uuid4())]),
+        raw_cursor(["-inf", str(uuid4())]),
+    ],
+)
+def test_invalid_cursor(cursor: str):
+    with pytest.raises(exc.InvalidCursorError):
+        svc.decode_search_cursor(cursor)
@@ -0,0 +1,132 @@
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.app.dto as dto
+import src.app.interface as i
+import src.inf.web.app as web
+from src.inf.db.cache import CachedHotelDao, HotelCache
+
+
+class Store:
+    def __init__(self):
+        self.hotels: dict[UUID, tuple[dto.HotelWithID, int]] = {}
+        self.rooms: dict[UUID, dto.HotelRoomWithID] = {}
+
+
+class FakeHotelDao:
+    def __init__(self, store: Store):
+        self.store = store
+
+    async def get_with_version(self, hotel_id: UUID):
+        return self.store.hotels.get(hotel_id)
+
+    async def get_many(self, hotel_ids: list[UUID]):
+        return [self.store.hotels[h][0] for h in hotel_ids if h in self.store.hotels]
+
+    async def owned_ids(self, owner_id: UUID, hotel_ids: list[UUID]) -> set[UUID]:
+        return {
+            h
+            for h in hotel_ids
+            if h in self.store.hotels and self.store.hotels[h][0].owner_id == owner_id
+        }
+
+
+class FakeRoomDao:
+    def __init__(self, store: Store):
+        self.store = store
+
+    async def by_hotel(self, hotel_id: UUID, limit: int, after: UUID | None = None):
+        rooms = sorted(
+            (r for r in self.store.rooms.values() if r.hotel_id == hotel_id),
+            key=lambda r: r.id,
+        )
+        return [r for r in rooms if after is None or r.id > after][:limit]
+
+    async def upsert_many(self, rooms: list[dto.HotelRoomWithID]):
+        for room in rooms:
+            self.store.rooms[room.id] = room
+
+            # what the hotel_room version trigger does
+            hotel, version = self.store.hotels[room.hotel_id]
+            self.store.hotels[room.hotel_id] = hotel, version + 1
+
+        return rooms
+
+    async def evict(self, hotel_id: UUID) -> None:
+        pass
+
+
+class FakeReservationDao:
+    async def evict(self, hotel_id: UUID) -> None:
+        pass
+
+
+def make_uow(store: Store, cache: HotelCache) -> type[i.UnitOfWork]:
+    class FakeUnitOfWork(i.UnitOfWork):
+        async def __aenter__(self):
+            self.hotel_dao = CachedHotelDao(FakeHotelDao(store), cache)
+            self.hotel_room_dao = FakeRoomDao(store)
+            self.hotel_reservation_dao = FakeReservationDao()
+            return self
+
+        async def __aexit__(self, exc_type, exc_val, exc_tb):
+            pass
+
+        async def commit(self):
+            pass
+
+        async def rollback(self):
+            pass
+
+    return FakeUnitOfWork
+
+
+@pytest.fixture
+def store(monkeypatch) -> Store:
+    store = Store()
+    cache = HotelCache(100, ttl=60, stale_ttl=60, refresh_timeout=1)
+    monkeypatch.setattr(web, "UnitOfWork", make_uow(store, cache))
+
+    return store
+
+
+def test_room_upsert_changes_rooms_etag(store: Store):
+    owner_id, hotel_id = uuid4(), uuid4()
+    hotel = dto.HotelWithID(
+        id=hotel_id,
+        owner_id=owner_id,
+        name="Hotel",
+        description="",
+        location=dto.Location(country_code="US", address="1 Main St"),
+        rating=dto.Rating(average=0, num_votes=0),
+    )
+    room = dto.HotelRoomWithID(
+        id=uuid4(),
+        hotel_id=hotel_id,
+        name="Double",
+        description="",
+        price_per_night=dto.Price(currency_code="USD", amount=100),
+        numbers=[1, 2],
+    )
+    store.hotels[hotel_id] = hotel, 1
+    client = TestClient(web.create_app())
+
+    first = client.get(f"/hotels/{hotel_id}/rooms")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    cached = client.get(f"/hotels/{hotel_id}/rooms", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    upserted = client.put(
+        "/my_hotels/rooms/bulk",
+        headers={"X-Auth-Request-User": str(owner_id)},
+        json=[room.model_dump(mode="json")],
+    )
+    assert upserted.status_code == 200
+
+    second = client.get(f"/hotels/{hotel_id}/rooms", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+    assert [r["id"] for r in second.json()["items"]] == [str(room.id)]
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from src.app.loader import Loader
+
+
+class Fetch:
+    def __init__(self, values: dict[int, str], error: Exception | None = None):
+        self.values = values
+        self.error = error
+        self.batches: list[list[int]] = []
+
+    async def __call__(self, keys: list[int]) -> list[tuple[int, str]]:
+        self.batches.append(keys)
+        if self.error is not None:
+            raise self.error
+
+        return [(k, self.values[k]) for k in keys if k in self.values]
+
+
+def test_loads_are_batched_and_remembered():
+    fetch = Fetch({1: "a", 2: "b"})
+
+    async def run():
+        loader = Loader(fetch, key=lambda v: v[0])
+        first = await asyncio.gather(loader.load(1), loader.load_many([2, 3, 1]))
+        again = await loader.load_many([1, 2, 3])
+        return first, again
+
+    (one, many), again = asyncio.run(run())
+
+    assert one == (1, "a")
+    assert many == [(2, "b"), None, (1, "a")]
+    assert again == many[2:] + many[:2]
+    assert fetch.batches == [[1, 2, 3]]
+
+
+def test_failed_keys_are_forgotten():
+    fetch = Fetch({1: "a"}, error=RuntimeError("down"))
+
+    async def run():
+        loader = Loader(fetch, key=lambda v: v[0])
+        with pytest.raises(RuntimeError):
+            await loader.load_many([1, 2])
+
+        fetch.error = None
+        return await loader.load(1)
+
+    assert asyncio.run(run()) == (1, "a")
+    assert fetch.batches == [[1, 2], [1]]
@@ -0,0 +1,36 @@
+from src.inf.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_render():
+    registry = Registry()
+    requests = registry.register(
+        Counter("requests_total", "Requests served.", ("method",))
+    )
+    registry.register(
+        Gauge("pool_size", "Connections.", ("pool",), lambda: [(("primary",), 5)])
+    )
+    latency = registry.register(
+        Histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    )
+
+    requests.inc("GET")
+    requests.inc("GET", amount=2)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    assert registry.render() == (
+        "# HELP requests_total Requests served.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{method="GET"} 3\n'
+        "# HELP pool_size Connections.\n"
+        "# TYPE pool_size gauge\n"
+        'pool_size{pool="primary"} 5\n'
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="0.1"} 1\n'
+        'latency_seconds_bucket{le="1"} 2\n'
+        'latency_seconds_bucket{le="+Inf"} 3\n'
+        "latency_seconds_sum 5.55\n"
+        "latency_seconds_count 3\n"
+    )
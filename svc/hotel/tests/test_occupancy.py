@@ -0,0 +1,77 @@
+import datetime
+from uuid import uuid4
+
+import src.app.dto as dto
+from src.inf.db.occupancy import HotelOccupancy
+
+FIRST = datetime.date(2026, 1, 1)
+
+
+def room(*numbers: int) -> dto.HotelRoomWithID:
+    return dto.HotelRoomWithID(
+        id=uuid4(),
+        hotel_id=uuid4(),
+        name="Room",
+        description="",
+        price_per_night=dto.Price(currency_code="USD", amount=100),
+        numbers=list(numbers),
+    )
+
+
+def reservation(
+    room: dto.HotelRoomWithID, number: int, nights: tuple[int, int]
+) -> dto.ReservationWithID:
+    return dto.ReservationWithID(
+        id=uuid4(),
+        guest_id=uuid4(),
+        hotel_id=room.hotel_id,
+        room_id=room.id,
+        number=number,
+        check_in=FIRST + datetime.timedelta(days=nights[0]),
+        check_out=FIRST + datetime.timedelta(days=nights[1]),
+    )
+
+
+def free(entry: HotelOccupancy, first: int, last: int) -> dict:
+    start = FIRST.toordinal()
+    return {a.room_id: a.numbers for a in entry.available(start + first, start + last)}
+
+
+def test_occupy_and_release():
+    double = room(1, 2)
+    entry = HotelOccupancy(0, FIRST.toordinal(), FIRST.toordinal() + 10, [double])
+    booked = reservation(double, 1, (2, 4))
+
+    entry.occupy(booked)
+
+    assert free(entry, 0, 2) == {double.id: [1, 2]}
+    assert free(entry, 3, 5) == {double.id: [2]}
+    assert free(entry, 4, 6) == {double.id: [1, 2]}
+
+    entry.release(booked)
+
+    assert free(entry, 0, 10) == {double.id: [1, 2]}
+
+
+def test_numbers_are_shared_across_room_types():
+    double, suite = room(1, 2), room(2, 3)
+    entry = HotelOccupancy(
+        0, FIRST.toordinal(), FIRST.toordinal() + 10, [double, suite]
+    )
+
+    entry.occupy(reservation(suite, 2, (0, 3)))
+
+    assert free(entry, 1, 2) == {double.id: [1], suite.id: [3]}
+
+
+def test_stays_are_clipped_to_the_window():
+    double = room(1)
+    entry = HotelOccupancy(0, FIRST.toordinal(), FIRST.toordinal() + 10, [double])
+
+    entry.occupy(reservation(double, 1, (-3, 1)))
+    entry.occupy(reservation(double, 1, (9, 20)))
+    entry.occupy(reservation(double, 7, (0, 10)))
+
+    assert free(entry, 0, 1) == {double.id: []}
+    assert free(entry, 1, 9) == {double.id: [1]}
+    assert free(entry, 9, 10) == {double.id: []}
@@ -0,0 +1,92 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from src.app.usecase import SingleFlight
+
+
+def test_concurrent_reads_share_one_call():
+    async def run():
+        flight, group, calls = SingleFlight(10), uuid4(), []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return len(calls)
+
+        results = await asyncio.gather(*(flight.do(group, "k", call) for _ in range(3)))
+        return results, calls, flight
+
+    results, calls, flight = asyncio.run(run())
+
+    assert results == [1, 1, 1]
+    assert len(calls) == 1
+    assert (flight.led, flight.joined, flight.inflight) == (1, 2, 0)
+
+
+def test_exception_is_shared_then_retried():
+    async def run():
+        flight, group, calls = SingleFlight(10), uuid4(), []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(flight.do(group, "k", call) for _ in range(2)), return_exceptions=True
+        )
+        with pytest.raises(ValueError):
+            await flight.do(group, "k", call)
+
+        return results, calls
+
+    results, calls = asyncio.run(run())
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(calls) == 2
+
+
+def test_forget_starts_a_fresh_call():
+    async def run():
+        flight, group, release = SingleFlight(10), uuid4(), asyncio.Event()
+        versions = iter([1, 2])
+
+        async def call():
+            version = next(versions)
+            await release.wait()
+            return version
+
+        before = asyncio.ensure_future(flight.do(group, "k", call))
+        await asyncio.sleep(0)
+        flight.forget(group)
+        after = asyncio.ensure_future(flight.do(group, "k", call))
+        await asyncio.sleep(0)
+        release.set()
+
+        return await before, await after, flight
+
+    before, after, flight = asyncio.run(run())
+
+    assert (before, after) == (1, 2)
+    assert flight.led == 2 and flight.inflight == 0
+
+
+def test_reads_beyond_max_inflight_bypass():
+    async def run():
+        flight, calls = SingleFlight(1), []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0)
+
+        await asyncio.gather(
+            flight.do(uuid4(), "k", call), flight.do(uuid4(), "k", call)
+        )
+        return calls, flight
+
+    calls, flight = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert (flight.led, flight.bypassed) == (1, 1)